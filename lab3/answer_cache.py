@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from text_utils import normalize
+
+logger = logging.getLogger(__name__)
+
+# Кеш відповідей ChatGPT на однакові запитання.
+# Ключ — нормалізований текст запиту (регістр, пробіли та розділові знаки речення не враховуються).
+# Записи витісняються за LRU при перевищенні ANSWER_CACHE_MAX_BYTES і застарівають через
+# ANSWER_CACHE_TTL секунд. З ANSWER_CACHE_PATH кеш зберігається в SQLite і переживає
+# перезапуск. Однакові запити, що надійшли одночасно, чекають на один запит до ChatGPT.
+
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'True').lower() == 'true'
+ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', 6 * 3600))
+ANSWER_CACHE_MAX_BYTES = int(os.getenv('ANSWER_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+ANSWER_CACHE_PATH = os.getenv('ANSWER_CACHE_PATH', '')
+
+class _Flight:
+    """Запит до ChatGPT, що виконується; інші однакові запити підписуються на нього"""
+    __slots__ = ('future', 'latest', 'subscribers')
+
+    def __init__(self, loop):
+        self.future = loop.create_future()
+        self.latest = ''
+        self.subscribers = []
+
+    def subscribe(self, on_chunk):
+        if on_chunk:
+            self.subscribers.append(on_chunk)
+            if self.latest:
+                on_chunk(self.latest)
+
+    def unsubscribe(self, on_chunk):
+        if on_chunk in self.subscribers:
+            self.subscribers.remove(on_chunk)
+
+    def broadcast(self, text):
+        self.latest = text
+        for on_chunk in list(self.subscribers):
+            on_chunk(text)
+
+
+class AnswerCache:
+    """LRU/TTL кеш відповідей з обмеженням пам'яті та необов'язковим збереженням у SQLite"""
+
+    def __init__(self, max_bytes=ANSWER_CACHE_MAX_BYTES, ttl=ANSWER_CACHE_TTL, path=ANSWER_CACHE_PATH):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path:
+            self._open(path)
+
+    def _open(self, path):
+        """Відкрити файл кешу та завантажити актуальні записи (найновіші першими)"""
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, answer TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        now = time.time()
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM answers WHERE expires_at <= ?", (now,))
+            rows = self._db.execute("SELECT key, answer, expires_at FROM answers ORDER BY expires_at DESC").fetchall()
+
+        evicted = []
+        for key, answer, expires_at in rows:
+            size = _size(key, answer)
+            if self._size + size > self.max_bytes:
+                evicted.append((key,))
+                continue
+            # Найновіші записи мають опинитися в кінці LRU
+            self._entries[key] = (answer, expires_at)
+            self._entries.move_to_end(key, last=False)
+            self._size += size
+        if evicted:
+            with self._db_lock, self._db:
+                self._db.executemany("DELETE FROM answers WHERE key = ?", evicted)
+        logger.info(f"Answer cache loaded {len(self._entries)} entries from {path}")
+
+    def get(self, prompt):
+        """Відповідь з кешу або None (знайдена відповідь рахується як влучання)"""
+        key = normalize(prompt)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        answer, expires_at = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def set(self, prompt, answer):
+        """Зберегти відповідь"""
+        key = normalize(prompt)
+        size = _size(key, answer)
+        if not key or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key, persist=False)
+        expires_at = time.time() + self.ttl
+        self._entries[key] = (answer, expires_at)
+        self._size += size
+        evicted = []
+        while self._size > self.max_bytes:
+            evicted.append(next(iter(self._entries)))
+            self._remove(evicted[-1], persist=False)
+
+        if self._db is not None:
+            with self._db_lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers (key, answer, expires_at) VALUES (?, ?, ?)",
+                    (key, answer, expires_at)
+                )
+                self._db.executemany("DELETE FROM answers WHERE key = ?", [(key,) for key in evicted])
+
+    def _remove(self, key, persist=True):
+        answer, _ = self._entries.pop(key)
+        self._size -= _size(key, answer)
+        if persist and self._db is not None:
+            with self._db_lock, self._db:
+                self._db.execute("DELETE FROM answers WHERE key = ?", (key,))
+
+    async def get_or_compute(self, prompt, compute, on_chunk=None, retry_on=()):
+        """Відповідь з кешу, спільного запиту, що вже виконується, або compute(on_chunk).
+
+        Повертає (відповідь, джерело), де джерело — 'hit', 'coalesced' або 'miss'.
+        Якщо спільний запит завершився винятком з retry_on (наприклад, його скасував
+        автор), очікувачі повторюють спробу самостійно.
+        """
+        key = normalize(prompt)
+        while True:
+            answer = self.get(prompt)
+            if answer is not None:
+                return answer, 'hit'
+
+            flight = self._inflight.get(key)
+            if flight is None:
+                break
+
+            self.coalesced += 1
+            flight.subscribe(on_chunk)
+            try:
+                return await asyncio.shield(flight.future), 'coalesced'
+            except asyncio.CancelledError:
+                if not flight.future.cancelled():
+                    # Скасовано сам очікувач, а не спільний запит
+                    raise
+            finally:
+                flight.unsubscribe(on_chunk)
+
+        self.misses += 1
+        flight = _Flight(asyncio.get_running_loop())
+        flight.subscribe(on_chunk)
+        self._inflight[key] = flight
+        try:
+            answer = await compute(flight.broadcast)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError) or isinstance(e, retry_on):
+                flight.future.cancel()
+            else:
+                flight.future.set_exception(e)
+                # Очікувачів може не бути: виняток вважається обробленим
+                flight.future.exception()
+            raise
+        else:
+            if answer:
+                self.set(prompt, answer)
+            flight.future.set_result(answer)
+            return answer, 'miss'
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_ratio': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            'persistent': self._db is not None
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _size(key, answer):
+    return len(key.encode()) + len(answer.encode())
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Порівняння пошуку відповіді в базі знань: автомат Ахо-Корасик (knowledge_base.py)
+# проти попереднього підходу — перебору ключових слів з перевіркою `keyword in message`.
+# Час автомата має майже не залежати від кількості ключових слів, перебору — лінійно.
+#
+#   cd lab3
+#   python -m benchmarks.bench_knowledge_base --keywords 100 1000 10000 --queries 2000
+
+LAB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, LAB_DIR)
+
+from knowledge_base import KnowledgeBase  # noqa: E402
+
+LETTERS = "abcdefghijklmnopqrstuvwxyzабвгдежзиклмнопрстуфхцчшщюяіїє"
+
+
+def random_word(rng):
+    return ''.join(rng.choice(LETTERS) for _ in range(rng.randint(5, 12)))
+
+
+def make_knowledge_base(path, keywords, rng):
+    """Файл бази знань з keywords ключовими словами (по 2 на запис)"""
+    words = set()
+    while len(words) < keywords:
+        words.add(random_word(rng))
+    words = sorted(words)
+    entries = [
+        {'keywords': words[index:index + 2], 'answer': f"Відповідь {index // 2}"}
+        for index in range(0, keywords, 2)
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'fallback': '', 'entries': entries}, f, ensure_ascii=False)
+    return words
+
+
+def make_queries(words, count, rng):
+    """Повідомлення по ~20 слів, половина з них містить одне ключове слово"""
+    queries = []
+    for index in range(count):
+        text = [random_word(rng) for _ in range(20)]
+        if index % 2 == 0:
+            text[rng.randrange(len(text))] = rng.choice(words)
+        queries.append(' '.join(text))
+    return queries
+
+
+def linear_answer(responses, message):
+    """Попередня реалізація generate_local_response"""
+    for keyword, response in responses.items():
+        if keyword in message:
+            return response
+    return None
+
+
+def measure(function, queries, rounds=3):
+    """Середній час одного пошуку (найкращий з rounds проходів), мкс"""
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for query in queries:
+            function(query)
+        best = min(best, time.perf_counter() - started)
+    return best / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the knowledge base matcher")
+    parser.add_argument('--keywords', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'keywords':>9} {'compile, ms':>12} {'automaton, us':>14} {'linear, us':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for keywords in args.keywords:
+            path = os.path.join(directory, f'kb_{keywords}.json')
+            words = make_knowledge_base(path, keywords, rng)
+            queries = make_queries(words, args.queries, rng)
+
+            started = time.perf_counter()
+            knowledge_base = KnowledgeBase(path, reload_interval=3600)
+            compile_ms = (time.perf_counter() - started) * 1000
+
+            responses = {
+                keyword: entry['answer'] for entry in knowledge_base.entries for keyword in entry['keywords']
+            }
+            # Обидва підходи мають знаходити відповідь для повідомлень з ключовим словом
+            found = sum(knowledge_base.match(query) is not None for query in queries)
+            assert found >= args.queries // 2, found
+
+            automaton = measure(knowledge_base.match, queries)
+            linear = measure(lambda query: linear_answer(responses, query), queries)
+            print(f"{keywords:>9} {compile_ms:>12.1f} {automaton:>14.1f} {linear:>11.1f} {linear / automaton:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
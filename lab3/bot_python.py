@@ -1,9 +1,17 @@
 import os
+import asyncio
 import logging
 from dotenv import load_dotenv
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 from revChatGPT.V1 import Chatbot
+from llm_pool import LLMWorkerPool, UserBusyError, QueueFullError, JobCancelled
+from streaming import StreamingReply
+from answer_cache import AnswerCache, ANSWER_CACHE_ENABLED
+from state_store import create_state_store
+from send_queue import SendRateLimiter
+from webhook import WEBHOOK_URL, serve
+from knowledge_base import KnowledgeBase
 
 # Завантаження змінних середовища
 load_dotenv()
@@ -29,8 +37,20 @@ if token:
 else:
     logger.warning("CHATGPT_ACCESS_TOKEN not found in environment variables")
 
-# Стани користувачів
-user_states = {}
+# Пул потоків для запитів до ChatGPT: chatbot.ask блокує потік на весь час відповіді
+llm_workers = LLMWorkerPool(chatbot.ask) if chatbot else None
+
+# Кеш відповідей: однакові запитання не надсилаються до ChatGPT повторно
+answer_cache = AnswerCache() if chatbot and ANSWER_CACHE_ENABLED else None
+
+# База знань для локальних відповідей, коли ChatGPT недоступний
+knowledge_base = KnowledgeBase()
+
+# Фонові задачі з відповідями ChatGPT: не більше однієї на користувача
+chatgpt_tasks = {}
+
+# Стани користувачів (режим меню та вікно розмови з ChatGPT)
+state_store = create_state_store()
 
 # Клавіатури
 main_menu_keyboard = ReplyKeyboardMarkup([
@@ -104,7 +124,8 @@ async def handle_contacts(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def handle_chatgpt_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Активація режиму ChatGPT"""
     user_id = update.effective_user.id
-    user_states[user_id] = 'chatgpt'
+    state_store.set_mode(user_id, 'chatgpt')
+    state_store.clear_history(user_id)
     
     if chatbot:
         message = """
@@ -134,64 +155,128 @@ async def handle_chatgpt_message(update: Update, context: ContextTypes.DEFAULT_T
     user_message = update.message.text
     logger.info(f"Processing ChatGPT request: {user_message[:50]}...")
     
+    if not chatbot:
+        # Локальні відповіді якщо ChatGPT недоступний
+        logger.warning("ChatGPT not available, using local responses")
+        response = generate_local_response(user_message.lower())
+        await update.message.reply_markdown(
+            f"🤖 *AI асистент відповідає:*\n\n{response}",
+            reply_markup=back_keyboard
+        )
+        return
+    
+    user_id = update.effective_user.id
+    task = chatgpt_tasks.get(user_id)
+    if task and not task.done():
+        await update.message.reply_text(
+            "⏳ Попередній запит ще обробляється, зачекайте на відповідь.",
+            reply_markup=back_keyboard
+        )
+        return
+    
+    # Відповідь очікується у фоновій задачі, щоб бот одразу обробляв інші повідомлення
+    # (зокрема "🔙 Назад", яке скасовує запит)
+    task = context.application.create_task(answer_with_chatgpt(update, context), update=update)
+    chatgpt_tasks[user_id] = task
+    task.add_done_callback(lambda done: forget_chatgpt_task(user_id, done))
+
+def forget_chatgpt_task(user_id, task):
+    """Прибрати завершену задачу користувача"""
+    if chatgpt_tasks.get(user_id) is task:
+        del chatgpt_tasks[user_id]
+
+async def answer_with_chatgpt(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Запит до ChatGPT через пул потоків; відповідь з'являється поступово"""
+    user_id = update.effective_user.id
+    user_message = update.message.text
+    history = state_store.history(user_id)
+    prompt = build_prompt(history, user_message)
+    # Відповідь у контексті попередньої розмови не підходить іншим користувачам
+    cache = answer_cache if not history else None
+    
+    reply = StreamingReply(
+        update.message,
+        header="🤖 ChatGPT відповідає:",
+        header_markdown="🤖 *ChatGPT відповідає:*",
+        placeholder="🤖 ChatGPT думає...",
+        reply_markup=back_keyboard
+    )
+    
+    cached = cache.get(user_message) if cache else None
+    if cached:
+        logger.info("ChatGPT response served from cache")
+        state_store.append_turn(user_id, user_message, cached)
+        await reply.send(cached)
+        return
+    
     # Показати індикатор набору
     await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
     
+    async def notify_queued(position):
+        await reply.status(f"⏳ Ваш запит у черзі: {position}. Відповідь надійде автоматично.")
+    
+    async def ask(on_chunk):
+        return await llm_workers.submit(
+            user_id, prompt, on_queued=notify_queued, on_chunk=on_chunk
+        )
+    
+    await reply.start()
     try:
-        if chatbot:
-            # Використання revChatGPT
-            logger.info("Sending request to ChatGPT...")
-            response = ""
-            for data in chatbot.ask(user_message):
-                response = data.get("message", "")
-                logger.debug(f"Received data from ChatGPT: {data}")
-            
-            if not response:
-                raise Exception("Empty response from ChatGPT")
-            
-            logger.info(f"ChatGPT response received: {response[:100]}...")
-            await update.message.reply_markdown(
-                f"🤖 *ChatGPT відповідає:*\n\n{response}",
-                reply_markup=back_keyboard
+        logger.info("Sending request to ChatGPT...")
+        if cache:
+            # Однакові одночасні запити чекають на відповідь одного з них
+            response, source = await cache.get_or_compute(
+                user_message, ask, on_chunk=reply.feed, retry_on=(JobCancelled,)
             )
         else:
-            # Локальні відповіді якщо ChatGPT недоступний
-            logger.warning("ChatGPT not available, using local responses")
-            response = generate_local_response(user_message.lower())
-            await update.message.reply_markdown(
-                f"🤖 *AI асистент відповідає:*\n\n{response}",
-                reply_markup=back_keyboard
-            )
-            
+            response, source = await ask(reply.feed), 'miss'
+        
+        if not response:
+            raise Exception("Empty response from ChatGPT")
+        
+        logger.info(f"ChatGPT response received ({source}): {response[:100]}...")
+        state_store.append_turn(user_id, user_message, response)
+        await reply.finish(response)
+    except (JobCancelled, asyncio.CancelledError):
+        logger.info("ChatGPT request cancelled by user")
+        await reply.abort("🛑 Запит скасовано.")
+    except UserBusyError:
+        await reply.abort("⏳ Попередній запит ще обробляється, зачекайте на відповідь.")
+    except QueueFullError:
+        await reply.abort("🚦 Зараз забагато запитів до ChatGPT. Спробуйте трохи пізніше.")
+    except asyncio.TimeoutError:
+        logger.error("ChatGPT request timed out")
+        await reply.abort("⌛ ChatGPT не відповів вчасно. Спробуйте ще раз.")
     except Exception as e:
         logger.error(f"ChatGPT Error: {e}")
-        await update.message.reply_text(
-            "❌ Вибачте, виникла помилка при зверненні до ChatGPT.",
-            reply_markup=back_keyboard
-        )
+        await reply.abort("❌ Вибачте, виникла помилка при зверненні до ChatGPT.")
+
+def build_prompt(history, message):
+    """Запит до ChatGPT разом з вікном попередньої розмови"""
+    if not history:
+        return message
+    lines = ["Попередня розмова:"]
+    for previous, answer in history:
+        lines.append(f"Користувач: {previous}")
+        lines.append(f"ChatGPT: {answer}")
+    lines.append("")
+    lines.append(f"Нове запитання: {message}")
+    return "\n".join(lines)
 
 def generate_local_response(message):
-    """Генерація локальних відповідей"""
-    responses = {
-        'веб': 'Веб-технології включають HTML, CSS, JavaScript для фронтенду та Node.js, Python для бекенду.',
-        'html': 'HTML - це мова розмітки для створення структури веб-сторінок.',
-        'css': 'CSS відповідає за стилізацію та візуальне оформлення веб-сторінок.',
-        'javascript': 'JavaScript - мова програмування для створення інтерактивних веб-додатків.',
-        'react': 'React - JavaScript бібліотека для створення користувацьких інтерфейсів.',
-        'node': 'Node.js дозволяє виконувати JavaScript на сервері.',
-        'python': 'Python - універсальна мова програмування, популярна для веб-розробки та AI.',
-    }
-    
-    for keyword, response in responses.items():
-        if keyword in message:
-            return response
-    
-    return "Дякую за повідомлення! Я можу розповісти про веб-технології, HTML, CSS, JavaScript, React, Node.js та Python."
+    """Генерація локальних відповідей з бази знань"""
+    return knowledge_base.answer(message)
 
 async def handle_back(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Повернення до головного меню"""
     user_id = update.effective_user.id
-    user_states[user_id] = None
+    state_store.set_mode(user_id, None)
+    state_store.clear_history(user_id)
+    
+    # Незавершений запит до ChatGPT більше не потрібен
+    task = chatgpt_tasks.get(user_id)
+    if task and not task.done():
+        task.cancel()
     
     await update.message.reply_text(
         "Виберіть відповідну команду",
@@ -213,7 +298,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await handle_chatgpt_prompt(update, context)
     elif text == "🔙 Назад":
         await handle_back(update, context)
-    elif user_states.get(user_id) == 'chatgpt':
+    elif state_store.get_mode(user_id) == 'chatgpt':
         await handle_chatgpt_message(update, context)
     else:
         await update.message.reply_text(
@@ -221,51 +306,43 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             reply_markup=main_menu_keyboard
         )
 
+async def shutdown_workers(application: Application) -> None:
+    """Зупинка пулу запитів до ChatGPT і збереження станів разом з ботом"""
+    if llm_workers:
+        llm_workers.shutdown()
+    if answer_cache:
+        answer_cache.close()
+    state_store.close()
+
+def health_status() -> dict:
+    """Стан бота для /health і /metrics"""
+    return {
+        'status': 'Bot is running!',
+        'timestamp': str(os.times()),
+        'chatgpt_available': chatbot is not None,
+        'llm': llm_workers.status() if llm_workers else None,
+        'answer_cache': answer_cache.stats() if answer_cache else None,
+        'state_store': state_store.stats(),
+        'knowledge_base': knowledge_base.stats(),
+        'chatgpt_token_set': bool(os.getenv('CHATGPT_ACCESS_TOKEN')),
+        'telegram_token_set': bool(os.getenv('TELEGRAM_TOKEN'))
+    }
+
 def main() -> None:
     """Запуск бота"""
-    # Створення додатку
-    application = Application.builder().token(os.getenv('TELEGRAM_TOKEN')).build()
+    # Створення додатку; усі вихідні запити проходять через чергу з обмеженням частоти
+    builder = Application.builder().token(os.getenv('TELEGRAM_TOKEN')).rate_limiter(SendRateLimiter())
+    if os.getenv('TELEGRAM_API_URL'):
+        # Наприклад, fake_telegram.py для навантажувального тестування
+        builder = builder.base_url(os.getenv('TELEGRAM_API_URL'))
+    if WEBHOOK_URL:
+        builder = builder.updater(None)
+    application = builder.post_shutdown(shutdown_workers).build()
     
     # Додавання обробників
     application.add_handler(CommandHandler("start", start))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     
-    # Health check сервер для Render
-    if os.getenv('NODE_ENV') == 'production' or os.getenv('RENDER'):
-        import threading
-        from http.server import HTTPServer, BaseHTTPRequestHandler
-        import json
-        
-        class HealthHandler(BaseHTTPRequestHandler):
-            def do_GET(self):
-                if self.path == '/' or self.path == '/health':
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/json')
-                    self.end_headers()
-                    response = {
-                        'status': 'Bot is running!',
-                        'timestamp': str(os.times()),
-                        'chatgpt_available': chatbot is not None,
-                        'chatgpt_token_set': bool(os.getenv('CHATGPT_ACCESS_TOKEN')),
-                        'telegram_token_set': bool(os.getenv('TELEGRAM_TOKEN'))
-                    }
-                    self.wfile.write(json.dumps(response).encode())
-                else:
-                    self.send_response(404)
-                    self.end_headers()
-                    
-            def log_message(self, format, *args):
-                pass  # Suppress HTTP logs
-        
-        def run_health_server():
-            port = int(os.getenv('PORT', 8000))
-            server = HTTPServer(('0.0.0.0', port), HealthHandler)
-            print(f"🌐 Health check server running on port {port}")
-            server.serve_forever()
-        
-        health_thread = threading.Thread(target=run_health_server, daemon=True)
-        health_thread.start()
-    
     # Запуск бота
     print("🤖 Telegram bot started successfully!")
     if chatbot:
@@ -273,7 +350,11 @@ def main() -> None:
     else:
         print("⚠️ ChatGPT not available, using local responses")
     
-    application.run_polling()
+    # Webhook або health check сервер для Render: один HTTP-сервер у циклі подій бота
+    if WEBHOOK_URL or os.getenv('NODE_ENV') == 'production' or os.getenv('RENDER'):
+        asyncio.run(serve(application, health_status, int(os.getenv('PORT', 8000))))
+    else:
+        application.run_polling()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
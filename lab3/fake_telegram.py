@@ -0,0 +1,246 @@
+"""Локальна заміна Telegram Bot API для навантажувального тестування webhook-режиму.
+
+Сервер відповідає на запити бота (getMe, setWebhook, sendMessage, editMessageText...)
+і, як справжній Telegram, повертає 429 з retry_after при перевищенні лімітів
+(глобального та на чат, ковзне вікно 1 с). Генератор навантаження надсилає боту
+оновлення через webhook і вимірює час до відповіді та порядок відповідей у кожному чаті.
+
+Запуск (спершу fake API, потім бот):
+
+    python fake_telegram.py --chats 200 --messages 8
+    TELEGRAM_TOKEN=123:TEST TELEGRAM_API_URL=http://127.0.0.1:8081/bot \\
+        WEBHOOK_URL=http://127.0.0.1:8000 python bot_python.py
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import statistics
+import time
+from collections import Counter, defaultdict, deque
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# Повідомлення користувача по колу; кожне дає рівно одну відповідь sendMessage
+LOAD_MESSAGES = ["👨‍🎓 Студент", "💻 IT-технології", "📞 Контакти", "🔙 Назад"]
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Load Test Bot', 'username': 'load_test_bot'}
+
+
+class FakeTelegramAPI:
+    """Мінімальний Bot API з лімітами частоти та журналом відповідей"""
+
+    def __init__(self, global_limit=30, chat_limit=3, latency=0.0):
+        self.global_limit = global_limit
+        self.chat_limit = chat_limit
+        self.latency = latency
+        self.calls = Counter()
+        self.rate_limited = 0
+        self.replies = defaultdict(list)
+        self.replied = asyncio.Event()
+        self.expected_replies = 0
+        self._sent = 0
+        self._global_window = deque()
+        self._chat_windows = defaultdict(deque)
+        self._message_ids = itertools.count(1)
+
+    def _retry_after(self, chat_id, now):
+        """Секунди до дозволу надіслати ще одне повідомлення або 0"""
+        windows = [(self._global_window, self.global_limit), (self._chat_windows[chat_id], self.chat_limit)]
+        for window, limit in windows:
+            while window and window[0] <= now - 1:
+                window.popleft()
+        for window, limit in windows:
+            if len(window) >= limit:
+                return max(1, math.ceil(window[0] + 1 - now))
+        for window, limit in windows:
+            window.append(now)
+        return 0
+
+    def _message(self, chat_id, text, message_id=None):
+        return {
+            'message_id': message_id or next(self._message_ids),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+            'from': BOT_USER,
+            'text': text
+        }
+
+    async def endpoint(self, request: Request):
+        method = request.path_params['method']
+        form = await request.form()
+        params = dict(form)
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == 'getMe':
+            return _ok(BOT_USER)
+        if method == 'getUpdates':
+            # Режим polling: оновлення надходять лише через webhook
+            await asyncio.sleep(1)
+            return _ok([])
+        if method not in ('sendMessage', 'editMessageText'):
+            # setWebhook, deleteWebhook, sendChatAction тощо
+            return _ok(True)
+
+        chat_id = int(params['chat_id'])
+        retry_after = self._retry_after(chat_id, time.monotonic())
+        if retry_after:
+            self.rate_limited += 1
+            return JSONResponse({
+                'ok': False,
+                'error_code': 429,
+                'description': f'Too Many Requests: retry after {retry_after}',
+                'parameters': {'retry_after': retry_after}
+            }, status_code=429)
+
+        if method == 'editMessageText':
+            return _ok(self._message(chat_id, params['text'], int(params['message_id'])))
+
+        self.replies[chat_id].append((time.perf_counter(), params['text']))
+        self._sent += 1
+        if self.expected_replies and self._sent >= self.expected_replies:
+            self.replied.set()
+        return _ok(self._message(chat_id, params['text']))
+
+    def app(self):
+        return Starlette(routes=[Route('/bot{token}/{method}', self.endpoint, methods=['GET', 'POST'])])
+
+
+def _ok(result):
+    return JSONResponse({'ok': True, 'result': result})
+
+
+def _update(update_id, chat_id, text):
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private', 'first_name': 'Load'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Load'},
+            'text': text
+        }
+    }
+
+
+async def wait_for_bot(client, bot_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"{bot_url}/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"❌ Bot is not reachable at {bot_url}")
+
+
+async def run_load(api, args):
+    """Надіслати оновлення як Telegram і дочекатися відповідей.
+
+    Оновлення різних чатів доставляються паралельно кількома з'єднаннями, а оновлення
+    одного чату — по черзі: наступне лише після підтвердження попереднього.
+    """
+    chats = [1000 + index for index in range(args.chats)]
+    api.expected_replies = args.chats * args.messages
+    update_ids = itertools.count(1)
+    posted = {}
+    rejected = 0
+    headers = {'X-Telegram-Bot-Api-Secret-Token': args.secret} if args.secret else {}
+
+    async with httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=args.connections)) as client:
+        await wait_for_bot(client, args.bot_url)
+        print(f"🚀 Sending {api.expected_replies} updates from {args.chats} chats over {args.connections} connections")
+        # Чати, готові до доставки наступного оновлення, та номер цього оновлення
+        ready = deque((chat_id, 0) for chat_id in chats)
+
+        async def connection():
+            nonlocal rejected
+            while ready:
+                chat_id, step = ready.popleft()
+                payload = _update(next(update_ids), chat_id, LOAD_MESSAGES[step % len(LOAD_MESSAGES)])
+                while True:
+                    posted[(chat_id, step)] = time.perf_counter()
+                    response = await client.post(args.bot_url + args.webhook_path, json=payload, headers=headers)
+                    if response.status_code == 200:
+                        break
+                    # Як і Telegram, повторюємо доставку, якщо бот перевантажений
+                    rejected += 1
+                    await asyncio.sleep(0.5)
+                if step + 1 < args.messages:
+                    ready.append((chat_id, step + 1))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(connection() for _ in range(min(args.connections, args.chats))))
+        delivered = time.perf_counter() - started
+        try:
+            await asyncio.wait_for(api.replied.wait(), args.timeout)
+        except asyncio.TimeoutError:
+            pass
+        total = time.perf_counter() - started
+
+    latencies = []
+    for chat_id in chats:
+        for step, (replied_at, _) in enumerate(api.replies[chat_id]):
+            if (chat_id, step) in posted:
+                latencies.append(replied_at - posted[(chat_id, step)])
+    received = sum(len(api.replies[chat_id]) for chat_id in chats)
+
+    # Усі чати надсилали однакову послідовність, тож і відповіді мають збігатися
+    sequences = Counter(tuple(text for _, text in api.replies[chat_id]) for chat_id in chats)
+    reference = sequences.most_common(1)[0][0] if sequences else ()
+    out_of_order = sum(count for sequence, count in sequences.items() if sequence != reference)
+
+    print(f"📨 Replies: {received}/{api.expected_replies} in {total:.2f}s (updates delivered in {delivered:.2f}s)")
+    if latencies:
+        latencies.sort()
+        print(
+            f"⏱  Update → reply: p50 {statistics.median(latencies) * 1000:.0f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms"
+        )
+    print(f"📈 Throughput: {received / total:.1f} replies/s")
+    print(f"🚦 429 responses: {api.rate_limited}, webhook 503 retries: {rejected}")
+    print(f"🔢 Chats with unexpected reply order: {out_of_order}")
+    print(f"📊 API calls: {dict(api.calls)}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API and webhook load generator")
+    parser.add_argument('--port', type=int, default=8081, help="port of the fake API")
+    parser.add_argument('--bot-url', default='http://127.0.0.1:8000', help="base URL of the bot HTTP server")
+    parser.add_argument('--webhook-path', default='/telegram')
+    parser.add_argument('--secret', default='', help="WEBHOOK_SECRET of the bot")
+    parser.add_argument('--chats', type=int, default=100)
+    parser.add_argument('--messages', type=int, default=8, help="messages per chat")
+    parser.add_argument('--connections', type=int, default=40, help="parallel webhook deliveries")
+    parser.add_argument('--latency', type=float, default=0.02, help="simulated API latency, s")
+    parser.add_argument('--global-limit', type=int, default=30, help="messages per second for the bot")
+    parser.add_argument('--chat-limit', type=int, default=3, help="messages per second per chat")
+    parser.add_argument('--timeout', type=float, default=300, help="time to wait for all replies, s")
+    parser.add_argument('--serve-only', action='store_true', help="run the fake API without load")
+    args = parser.parse_args()
+
+    api = FakeTelegramAPI(args.global_limit, args.chat_limit, args.latency)
+    server = uvicorn.Server(uvicorn.Config(api.app(), host='127.0.0.1', port=args.port, log_level='warning'))
+    server_task = asyncio.create_task(server.serve())
+    print(f"🧪 Fake Telegram API on http://127.0.0.1:{args.port}/bot")
+
+    if args.serve_only:
+        await server_task
+        return
+    try:
+        await run_load(api, args)
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import time
+
+from text_utils import normalize
+
+logger = logging.getLogger(__name__)
+
+# База знань для локальних відповідей, коли ChatGPT недоступний.
+# Записи (ключові слова + відповідь) завантажуються з JSON-файлу і компілюються в автомат
+# Ахо-Корасик над словами: пошук усіх ключових слів займає один прохід по словах тексту
+# незалежно від їх кількості. Ключове слово збігається лише цілими словами ("java" не знаходиться в
+# "javascript"); "*" в кінці дозволяє довші слова ("веб*" — "вебсайт").
+# Перемагає запис з найбільшою сумарною довжиною знайдених ключових слів, тож
+# конкретніший збіг ("node js") важить більше за загальний ("js").
+# Файл перечитується, якщо змінився (перевірка не частіше ніж раз на KB_RELOAD_INTERVAL с).
+
+KB_PATH = os.getenv('KB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base.json'))
+KB_RELOAD_INTERVAL = float(os.getenv('KB_RELOAD_INTERVAL', 5))
+
+
+class KeywordMatcher:
+    """Автомат Ахо-Корасик над словами нормалізованого тексту.
+
+    Ключове слово — послідовність слів, тому збіг завжди охоплює слова цілком, а крок
+    автомата — один пошук у словнику на слово тексту. Для ключових слів з "*" останнє
+    слово порівнюється як префікс: стан зберігає таблиці таких префіксів за довжиною.
+    """
+
+    def __init__(self, keywords):
+        """keywords — пари (ключове слово, значення), значення повертається при збігу"""
+        self._goto = [{}]
+        self._fail = [0]
+        # Для кожного стану: (довжина, значення) ключових слів, що в ньому закінчуються
+        self._out = [[]]
+        # Для кожного стану: {довжина префікса: {префікс: [(довжина, значення)]}}
+        self._prefixes = [{}]
+        self.size = 0
+        for keyword, value in keywords:
+            prefix = keyword.endswith('*')
+            words = normalize(keyword.rstrip('*')).split()
+            if not words:
+                continue
+            output = (len(' '.join(words)), value)
+            if prefix:
+                state = self._add(words[:-1])
+                last = words[-1]
+                self._prefixes[state].setdefault(len(last), {}).setdefault(last, []).append(output)
+            else:
+                self._out[self._add(words)].append(output)
+            self.size += 1
+        self._link()
+
+    def _add(self, words):
+        state = 0
+        for word in words:
+            next_state = self._goto[state].get(word)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][word] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._prefixes.append({})
+            state = next_state
+        return state
+
+    def _link(self):
+        """Суфіксні посилання обходом у ширину; виходи стану доповнюються виходами суфікса"""
+        # Стани ланцюжка суфіксних посилань, які мають префіксні ключові слова
+        self._prefix_chain = [[0] if self._prefixes[0] else []] + [None] * (len(self._goto) - 1)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._prefix_chain[state] = ([state] if self._prefixes[state] else []) + self._prefix_chain[self._fail[state]]
+            for word, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(word, 0)
+                self._fail[next_state] = fail
+                self._out[next_state] = self._out[next_state] + self._out[fail]
+
+    def find(self, text):
+        """Значення та довжини ключових слів, знайдених у нормалізованому text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        prefixes, prefix_chain = self._prefixes, self._prefix_chain
+        state = 0
+        for word in text.split():
+            for owner in prefix_chain[state]:
+                for length, table in prefixes[owner].items():
+                    for output in table.get(word[:length], ()):
+                        yield output[1], output[0]
+            next_state = goto[state].get(word)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(word)
+            state = next_state or 0
+            for length, value in out[state]:
+                yield value, length
+
+
+class KnowledgeBase:
+    """Записи бази знань з файлу та автомат для пошуку найкращої відповіді"""
+
+    def __init__(self, path=KB_PATH, reload_interval=KB_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.entries = []
+        self.fallback = ''
+        self._matcher = KeywordMatcher([])
+        self._mtime = None
+        self._checked = 0.0
+        self.reload()
+
+    def reload(self):
+        """Прочитати файл і замінити автомат; за помилки лишається попередня версія"""
+        mtime = os.stat(self.path).st_mtime
+        started = time.perf_counter()
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data['entries']
+        # Значення збігу — (номер запису, номер ключового слова в записі)
+        matcher = KeywordMatcher(
+            (keyword, (index, number))
+            for index, entry in enumerate(entries)
+            for number, keyword in enumerate(entry['keywords'])
+        )
+        # Заміна одним присвоєнням: паралельний пошук бачить або стару, або нову версію
+        self.entries, self.fallback, self._matcher = entries, data.get('fallback', ''), matcher
+        self._mtime = mtime
+        logger.info(
+            f"Knowledge base loaded: {len(entries)} entries, {matcher.size} keywords "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            logger.error(f"Knowledge base file unavailable, keeping previous version: {e}")
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            self.reload()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Knowledge base reload failed, keeping previous version: {e}")
+            # Ту саму зіпсовану версію файлу не перечитуємо повторно
+            self._mtime = mtime
+
+    def match(self, message):
+        """Найкращий запис для повідомлення або None"""
+        self._maybe_reload()
+        entries, matcher = self.entries, self._matcher
+        scores = {}
+        seen = set()
+        for value, length in matcher.find(normalize(message)):
+            # Повторення того самого ключового слова не підвищує рахунок
+            if value not in seen:
+                seen.add(value)
+                scores[value[0]] = scores.get(value[0], 0) + length
+        if not scores:
+            return None
+        # За рівного рахунку — запис, що стоїть у файлі раніше
+        best = max(scores, key=lambda index: (scores[index], -index))
+        return entries[best]
+
+    def answer(self, message) -> str:
+        entry = self.match(message)
+        return entry['answer'] if entry else self.fallback
+
+    def stats(self) -> dict:
+        return {'entries': len(self.entries), 'keywords': self._matcher.size}
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Запити до LLM виконуються в пулі потоків, а не в циклі подій бота:
+# chatbot.ask — синхронний генератор, що читає відповідь з мережі.
+# Кожен користувач має не більше одного запиту в роботі; глобально одночасно
+# виконується не більше LLM_MAX_CONCURRENCY запитів, решта чекає в черзі FIFO.
+
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', 100))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 120))
+
+
+class UserBusyError(Exception):
+    """Попередній запит користувача ще виконується"""
+
+
+class QueueFullError(Exception):
+    """Черга запитів до LLM заповнена"""
+
+
+class JobCancelled(Exception):
+    """Запит скасовано користувачем"""
+
+
+class _Job:
+    __slots__ = ('user_id', 'cancelled', 'ready')
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        # Прапорець перевіряється потоком між фрагментами відповіді
+        self.cancelled = threading.Event()
+        self.ready = loop.create_future()
+
+
+class LLMWorkerPool:
+    """Пул потоків для запитів до LLM з чергою та обмеженням паралельності"""
+
+    def __init__(self, ask, max_concurrency=LLM_MAX_CONCURRENCY, max_queue=LLM_MAX_QUEUE, timeout=LLM_TIMEOUT):
+        self._ask = ask
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+        self._jobs = {}
+        self._waiting = deque()
+        self._active = 0
+
+    def is_busy(self, user_id) -> bool:
+        return user_id in self._jobs
+
+    def position(self, user_id) -> int:
+        """Позиція запиту користувача в черзі (0 — виконується або відсутній)"""
+        for index, job in enumerate(self._waiting, 1):
+            if job.user_id == user_id:
+                return index
+        return 0
+
+    async def submit(self, user_id, prompt, on_queued=None, on_chunk=None) -> str:
+        """Виконати запит у пулі та повернути повну відповідь.
+
+        on_queued(position) викликається, якщо запит мусить чекати в черзі;
+        on_chunk(text) — у циклі подій для кожного нового накопиченого тексту відповіді.
+        """
+        if user_id in self._jobs:
+            raise UserBusyError()
+        if len(self._waiting) >= self.max_queue:
+            raise QueueFullError()
+
+        loop = asyncio.get_running_loop()
+        job = _Job(user_id, loop)
+        self._jobs[user_id] = job
+        future = None
+        try:
+            if self._active < self.max_concurrency and not self._waiting:
+                self._active += 1
+                job.ready.set_result(True)
+            else:
+                self._waiting.append(job)
+                if on_queued:
+                    await on_queued(len(self._waiting))
+                await job.ready
+
+            if job.cancelled.is_set():
+                raise JobCancelled()
+
+            future = loop.run_in_executor(self._executor, self._run, job, prompt, loop, on_chunk)
+            # Слот звільняється, коли потік справді завершився, а не при тайм-ауті
+            future.add_done_callback(self._on_done)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                job.cancelled.set()
+                raise
+        except asyncio.CancelledError:
+            job.cancelled.set()
+            raise
+        finally:
+            if job in self._waiting:
+                self._waiting.remove(job)
+            if future is None and self._granted(job):
+                # Слот отримано, але потік не запускався
+                self._release()
+            self._jobs.pop(user_id, None)
+
+    @staticmethod
+    def _granted(job) -> bool:
+        ready = job.ready
+        return ready.done() and not ready.cancelled() and ready.exception() is None
+
+    def _on_done(self, future):
+        if not future.cancelled():
+            # Після тайм-ауту чи скасування результат нікому не потрібен
+            future.exception()
+        self._release()
+
+    def _release(self):
+        """Звільнити слот і запустити наступний запит з черги"""
+        self._active -= 1
+        while self._waiting and self._active < self.max_concurrency:
+            job = self._waiting.popleft()
+            if job.ready.done():
+                # Очікування скасовано разом із задачею запиту
+                continue
+            self._active += 1
+            job.ready.set_result(True)
+
+    def _run(self, job, prompt, loop, on_chunk) -> str:
+        """Виконується в потоці пулу: читає відповідь до кінця або до скасування"""
+        response = ""
+        generator = self._ask(prompt)
+        try:
+            for data in generator:
+                if job.cancelled.is_set():
+                    raise JobCancelled()
+                message = data.get("message", "")
+                if on_chunk and message != response:
+                    loop.call_soon_threadsafe(on_chunk, message)
+                response = message
+        finally:
+            # Закриття генератора обриває потокове HTTP-з'єднання
+            generator.close()
+        return response
+
+    def status(self) -> dict:
+        return {
+            'active': self._active,
+            'queued': len(self._waiting),
+            'max_concurrency': self.max_concurrency
+        }
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
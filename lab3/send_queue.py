@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+import time
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Черга вихідних запитів до Telegram: усі reply_*/edit_* проходять через token bucket.
+# Telegram обмежує бота приблизно 30 повідомленнями на секунду загалом, 1 на секунду
+# в особистому чаті (короткі сплески допускаються) і 20 на хвилину в групі.
+# Запит спершу чекає на токен свого чату, потім — на глобальний токен. Відповідь 429
+# (RetryAfter) призупиняє відповідний bucket і запит повторюється, а не падає.
+# За замовчуванням у будь-якому вікні 1 с — не більше RATE + BURST повідомлень:
+# 30 загалом і 3 в одному чаті.
+
+SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', 25))
+SEND_GLOBAL_BURST = int(os.getenv('SEND_GLOBAL_BURST', 5))
+SEND_CHAT_RATE = float(os.getenv('SEND_CHAT_RATE', 1))
+SEND_CHAT_BURST = int(os.getenv('SEND_CHAT_BURST', 2))
+SEND_GROUP_RATE = float(os.getenv('SEND_GROUP_RATE', 20 / 60))
+SEND_MAX_RETRIES = int(os.getenv('SEND_MAX_RETRIES', 5))
+
+# Понад стільки bucket'ів чатів повністю відновлені (неактивні) видаляються
+MAX_CHAT_BUCKETS = 10000
+
+# Службові дії не є повідомленнями і не витрачають ліміт чату
+CHAT_EXEMPT_ENDPOINTS = {'sendChatAction'}
+
+
+class TokenBucket:
+    """Token bucket з резервуванням: кожен виклик займає токен і дізнається, скільки чекати.
+
+    Токенів може стати менше нуля — це черга запитів, що вже зарезервували своє місце,
+    тому запити отримують дозвіл у порядку надходження без окремого замка.
+    """
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Зайняти токен; повертає затримку в секундах"""
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def pause(self, seconds):
+        """Не видавати токенів щонайменше seconds секунд (після відповіді 429)"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def is_idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+    async def acquire(self) -> float:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class SendRateLimiter(BaseRateLimiter):
+    """Обмеження частоти запитів бота до Telegram з повтором після RetryAfter"""
+
+    def __init__(self, global_rate=SEND_GLOBAL_RATE, global_burst=SEND_GLOBAL_BURST,
+                 chat_rate=SEND_CHAT_RATE, chat_burst=SEND_CHAT_BURST,
+                 group_rate=SEND_GROUP_RATE, max_retries=SEND_MAX_RETRIES):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, global_burst)
+        self._chats = {}
+        self.requests = 0
+        self.delayed = 0
+        self.waiting = 0
+        self.wait_seconds = 0.0
+        self.retries = 0
+        self.failures = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= MAX_CHAT_BUCKETS:
+                self._chats = {key: value for key, value in self._chats.items() if not value.is_idle()}
+            # Від'ємний або рядковий chat_id — група чи канал
+            group = isinstance(chat_id, str) or chat_id < 0
+            bucket = TokenBucket(self.group_rate, 1) if group else TokenBucket(self.chat_rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        """rate_limit_args — необов'язкова кількість повторів замість SEND_MAX_RETRIES"""
+        max_retries = self.max_retries if rate_limit_args is None else rate_limit_args
+        chat_id = data.get('chat_id')
+        try:
+            chat_id = int(chat_id)
+        except (TypeError, ValueError):
+            pass
+        chat = self._chat_bucket(chat_id) if chat_id is not None and endpoint not in CHAT_EXEMPT_ENDPOINTS else None
+
+        self.requests += 1
+        delayed = False
+        for attempt in range(max_retries + 1):
+            self.waiting += 1
+            try:
+                waited = (await chat.acquire() if chat else 0.0) + await self._global.acquire()
+            finally:
+                self.waiting -= 1
+            if waited:
+                self.delayed += not delayed
+                self.wait_seconds += waited
+                delayed = True
+
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                seconds = _seconds(e.retry_after)
+                if attempt == max_retries:
+                    self.failures += 1
+                    logger.error(f"{endpoint} to chat {chat_id} still rate limited after {max_retries} retries")
+                    raise
+                self.retries += 1
+                logger.warning(f"{endpoint} to chat {chat_id} rate limited, retrying in {seconds}s")
+                (chat or self._global).pause(seconds)
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'delayed': self.delayed,
+            'waiting': self.waiting,
+            'wait_seconds': round(self.wait_seconds, 3),
+            'retries': self.retries,
+            'failures': self.failures,
+            'chats': len(self._chats)
+        }
+
+
+def _seconds(retry_after):
+    # retry_after — int або timedelta залежно від налаштувань python-telegram-bot
+    return retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else retry_after
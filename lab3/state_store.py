@@ -0,0 +1,309 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Стан користувачів бота: режим меню та коротке вікно розмови з ChatGPT.
+# MemoryStateStore тримає стани в пам'яті з обмеженням кількості користувачів (LRU)
+# і часу неактивності (STATE_TTL). SQLiteStateStore додатково зберігає стани у файл:
+# зміни накопичуються і записуються пакетами у фоновому потоці (write-behind).
+# Користувач у головному меню без історії розмови не займає місця взагалі.
+# За замовчуванням файлом користується один процес, і стан з пам'яті файл не перечитує.
+# З STATE_SHARED=True кілька процесів можуть ділити один файл: перед використанням стану
+# з пам'яті SQLiteStateStore звіряє його updated_at з файлом і перечитує змінений іншим
+# процесом. Зміни іншого процесу стають видимими після його запису (до STATE_FLUSH_INTERVAL с).
+
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'memory')
+STATE_DB_PATH = os.getenv('STATE_DB_PATH', 'bot_state.db')
+STATE_TTL = float(os.getenv('STATE_TTL', 24 * 3600))
+STATE_MAX_USERS = int(os.getenv('STATE_MAX_USERS', 10000))
+STATE_HISTORY_TURNS = int(os.getenv('STATE_HISTORY_TURNS', 6))
+STATE_HISTORY_CHARS = int(os.getenv('STATE_HISTORY_CHARS', 4000))
+STATE_FLUSH_INTERVAL = float(os.getenv('STATE_FLUSH_INTERVAL', 2))
+STATE_FLUSH_BATCH = int(os.getenv('STATE_FLUSH_BATCH', 200))
+STATE_SHARED = os.getenv('STATE_SHARED', 'False').lower() == 'true'
+
+
+class UserState:
+    __slots__ = ('mode', 'history', 'touched', 'saved_at')
+
+    def __init__(self, mode=None, history=None, touched=0.0, saved_at=None):
+        self.mode = mode
+        # Пари (запит, відповідь), найстаріші першими
+        self.history = history or []
+        self.touched = touched
+        # updated_at версії у файлі, з якою збігається стан (None — ще не записаний)
+        self.saved_at = saved_at
+
+    def is_empty(self) -> bool:
+        return not self.mode and not self.history
+
+
+class MemoryStateStore:
+    """Стани користувачів у пам'яті з витісненням за LRU та TTL"""
+
+    backend = 'memory'
+
+    def __init__(self, max_users=STATE_MAX_USERS, ttl=STATE_TTL,
+                 history_turns=STATE_HISTORY_TURNS, history_chars=STATE_HISTORY_CHARS):
+        self.max_users = max_users
+        self.ttl = ttl
+        self.history_turns = history_turns
+        self.history_chars = history_chars
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get_mode(self, user_id):
+        with self._lock:
+            state = self._get(user_id)
+            return state.mode if state else None
+
+    def set_mode(self, user_id, mode):
+        with self._lock:
+            state = self._get(user_id, create=bool(mode))
+            if state is not None and state.mode != mode:
+                state.mode = mode
+                self._changed(user_id, state)
+
+    def history(self, user_id) -> list:
+        """Вікно розмови користувача: список пар (запит, відповідь)"""
+        with self._lock:
+            state = self._get(user_id)
+            return list(state.history) if state else []
+
+    def append_turn(self, user_id, prompt, answer):
+        """Додати обмін до вікна розмови, відкинувши найстаріші понад ліміти"""
+        if self.history_turns < 1:
+            # STATE_HISTORY_TURNS=0 вимикає вікно розмови
+            return
+        with self._lock:
+            state = self._get(user_id, create=True)
+            history = state.history
+            history.append((prompt, answer))
+            del history[:-self.history_turns]
+            while len(history) > 1 and sum(len(p) + len(a) for p, a in history) > self.history_chars:
+                del history[0]
+            prompt, answer = history[0]
+            if len(prompt) + len(answer) > self.history_chars:
+                # Один обмін довший за ліміт: зберігаємо його початок
+                prompt = prompt[:self.history_chars]
+                history[0] = (prompt, answer[:self.history_chars - len(prompt)])
+            self._changed(user_id, state)
+
+    def clear_history(self, user_id):
+        with self._lock:
+            state = self._get(user_id)
+            if state is not None and state.history:
+                state.history = []
+                self._changed(user_id, state)
+
+    def _get(self, user_id, create=False):
+        """Стан користувача (викликається під self._lock)"""
+        now = time.time()
+        state = self._states.get(user_id)
+        if state is not None and now - state.touched > self.ttl:
+            del self._states[user_id]
+            self.evictions += 1
+            state = None
+        if state is not None and not self._is_current(user_id, state):
+            del self._states[user_id]
+            state = None
+        if state is None:
+            state = self._load(user_id, now)
+            if state is None and create:
+                state = UserState()
+            if state is None:
+                return None
+            self._states[user_id] = state
+        state.touched = now
+        self._states.move_to_end(user_id)
+        self._evict(now)
+        return state
+
+    def _evict(self, now):
+        # Найдавніше активні користувачі — на початку словника
+        while self._states:
+            user_id, state = next(iter(self._states.items()))
+            if len(self._states) <= self.max_users and now - state.touched <= self.ttl:
+                break
+            del self._states[user_id]
+            self.evictions += 1
+
+    def _changed(self, user_id, state):
+        if state.is_empty():
+            del self._states[user_id]
+        self._save(user_id, state)
+
+    def _load(self, user_id, now):
+        return None
+
+    def _is_current(self, user_id, state) -> bool:
+        return True
+
+    def _save(self, user_id, state):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            'backend': self.backend,
+            'users': len(self._states),
+            'evictions': self.evictions
+        }
+
+    def close(self):
+        pass
+
+
+class SQLiteStateStore(MemoryStateStore):
+    """Стани користувачів у SQLite; пам'ять — кеш перед файлом, запис пакетами у фоні"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path=STATE_DB_PATH, flush_interval=STATE_FLUSH_INTERVAL,
+                 flush_batch=STATE_FLUSH_BATCH, shared=STATE_SHARED, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        # Файл ділять кілька процесів: стан з пам'яті звіряється з файлом при кожному використанні
+        self.shared = shared
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        # user_id -> рядок для запису або None для видалення
+        self._pending = {}
+        # Зміни, які саме записуються у файл
+        self._flushing = {}
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.reloads = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS user_states ("
+            "user_id INTEGER PRIMARY KEY, mode TEXT, history TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        with self._db_lock:
+            deleted = self._db.execute(
+                "DELETE FROM user_states WHERE updated_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+        logger.info(f"State store {path}: {deleted} expired users removed")
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._flusher = threading.Thread(target=self._flush_loop, name='state-flush', daemon=True)
+        self._flusher.start()
+
+    def _load(self, user_id, now):
+        if user_id in self._pending:
+            row = self._pending[user_id]
+        elif user_id in self._flushing:
+            row = self._flushing[user_id]
+        else:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT user_id, mode, history, updated_at FROM user_states WHERE user_id = ?", (user_id,)
+                ).fetchone()
+        if row is None or now - row[3] > self.ttl:
+            return None
+        return UserState(row[1], [tuple(turn) for turn in json.loads(row[2])], saved_at=row[3])
+
+    def _is_current(self, user_id, state) -> bool:
+        """Чи не змінив стан інший процес після нашого читання або запису"""
+        if not self.shared:
+            # Єдиний процес: файл містить лише те, що записав він сам
+            return True
+        if user_id in self._pending or user_id in self._flushing:
+            # Незаписані зміни цього процесу новіші за файл
+            return True
+        with self._db_lock:
+            row = self._db.execute("SELECT updated_at FROM user_states WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None or row[0] != state.saved_at:
+            self.reloads += 1
+            return False
+        return True
+
+    def _save(self, user_id, state):
+        # Знімок стану: подальші зміни в пам'яті не впливають на рядок у черзі
+        state.saved_at = state.touched
+        self._pending[user_id] = None if state.is_empty() else (
+            user_id, state.mode, json.dumps(state.history, ensure_ascii=False), state.touched
+        )
+        if len(self._pending) >= self.flush_batch:
+            self._wakeup.set()
+
+    def _flush_loop(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"State store flush failed: {e}")
+
+    def flush(self):
+        """Записати накопичені зміни однією транзакцією"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._flushing = pending
+        started = time.perf_counter()
+        rows = [row for row in pending.values() if row is not None]
+        deleted = [(user_id,) for user_id, row in pending.items() if row is None]
+        try:
+            with self._db_lock:
+                try:
+                    self._db.execute("BEGIN")
+                    self._db.executemany(
+                        "INSERT INTO user_states (user_id, mode, history, updated_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(user_id) DO UPDATE SET mode = excluded.mode, "
+                        "history = excluded.history, updated_at = excluded.updated_at",
+                        rows
+                    )
+                    self._db.executemany("DELETE FROM user_states WHERE user_id = ?", deleted)
+                    self._db.execute("COMMIT")
+                except sqlite3.Error:
+                    if self._db.in_transaction:
+                        self._db.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            with self._lock:
+                # Новіші зміни, зроблені під час запису, мають пріоритет
+                self._pending = {**pending, **self._pending}
+                self._flushing = {}
+            raise
+        with self._lock:
+            self._flushing = {}
+        self.flushes += 1
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            'pending': len(self._pending),
+            'flushes': self.flushes,
+            'reloads': self.reloads,
+            'last_flush_ms': self.last_flush_ms
+        }
+
+    def close(self):
+        """Зупинити фоновий запис і зберегти решту змін"""
+        self._stopped = True
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        self._db.close()
+
+
+def create_state_store():
+    """Сховище станів за змінною STATE_BACKEND (memory або sqlite)"""
+    if STATE_BACKEND == 'sqlite':
+        return SQLiteStateStore()
+    if STATE_BACKEND != 'memory':
+        raise ValueError(f"Unknown STATE_BACKEND: {STATE_BACKEND}")
+    return MemoryStateStore()
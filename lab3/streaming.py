@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import time
+
+from telegram.constants import MessageLimit, ParseMode
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Поступове відображення відповіді LLM: бот одразу надсилає повідомлення-заглушку
+# і редагує його в міру надходження тексту. Редагування об'єднуються: не частіше
+# ніж раз на STREAM_EDIT_INTERVAL секунд і лише якщо текст виріс щонайменше на
+# STREAM_MIN_CHARS символів (Telegram обмежує частоту повідомлень і редагувань у чаті).
+# Текст довший за ліміт повідомлення продовжується в нових повідомленнях.
+
+STREAM_EDIT_INTERVAL = float(os.getenv('STREAM_EDIT_INTERVAL', 1.5))
+STREAM_MIN_CHARS = int(os.getenv('STREAM_MIN_CHARS', 40))
+
+# Запас під розмітку Markdown, яка при фінальному редагуванні може змінити довжину
+MESSAGE_LIMIT = MessageLimit.MAX_TEXT_LENGTH - 96
+
+
+def split_text(text, limit=MESSAGE_LIMIT):
+    """Поділ тексту на частини не довші за limit, переважно по рядках і пробілах"""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind('\n', limit // 2, limit)
+        if cut == -1:
+            cut = text.rfind(' ', limit // 2, limit)
+        if cut == -1:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip('\n ')
+    parts.append(text)
+    return parts
+
+
+class StreamingReply:
+    """Відповідь, що з'являється поступово редагуванням повідомлень"""
+
+    def __init__(self, message, header, placeholder, reply_markup=None, header_markdown=None,
+                 interval=STREAM_EDIT_INTERVAL, min_chars=STREAM_MIN_CHARS):
+        self._source = message
+        self.header = header
+        self.header_markdown = header_markdown
+        self.placeholder = placeholder
+        self.reply_markup = reply_markup
+        self.interval = interval
+        self.min_chars = min_chars
+        self._messages = []
+        self._shown = []
+        self._text = ''
+        self._changed = asyncio.Event()
+        self._flusher = None
+        self.started = None
+        self.first_chunk = None
+        self.edits = 0
+
+    async def start(self):
+        """Надіслати заглушку та запустити фонове оновлення"""
+        self.started = time.perf_counter()
+        message = await self._source.reply_text(self.placeholder, reply_markup=self.reply_markup)
+        self._messages.append(message)
+        self._shown.append(self.placeholder)
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def send(self, text):
+        """Надіслати готову відповідь одразу, без заглушки (наприклад, відповідь з кешу)"""
+        self.started = self.first_chunk = time.perf_counter()
+        self._text = text
+        await self._render(final=True)
+        self._log('sent')
+
+    async def status(self, text):
+        """Показати службовий стан (наприклад, позицію в черзі), поки немає тексту відповіді"""
+        if not self._text:
+            await self._edit(0, text)
+
+    def feed(self, text):
+        """Новий (накопичений) текст відповіді; викликається з циклу подій"""
+        if self.first_chunk is None and text:
+            self.first_chunk = time.perf_counter()
+        self._text = text
+        self._changed.set()
+
+    async def _flush_loop(self):
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            try:
+                await self._render(final=False)
+            except BadRequest as e:
+                # Проміжне редагування не вдалося (наприклад, повідомлення видалено):
+                # фінальне редагування спробує ще раз
+                logger.warning(f"Streaming edit failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _stop_flusher(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                # Помилка вже завершила фонове оновлення; відповідь завершує finish або abort
+                logger.warning(f"Streaming flusher failed: {type(e).__name__}: {e}")
+            finally:
+                self._flusher = None
+
+    async def finish(self, text):
+        """Показати повну відповідь (з Markdown, якщо розмітка коректна)"""
+        await self._stop_flusher()
+        self._text = text
+        await self._render(final=True)
+        self._log('finished')
+
+    async def abort(self, note):
+        """Завершити відповідь приміткою (скасування, тайм-аут, помилка)"""
+        await self._stop_flusher()
+        if self._text:
+            self._text = f"{self._text}\n\n{note}"
+            await self._render(final=True, markdown=False)
+        else:
+            await self._edit(0, note)
+        self._log('aborted')
+
+    async def _render(self, final, markdown=True):
+        parts = split_text(f"{self.header}\n\n{self._text}" if self._text else self.placeholder)
+        markdown = final and markdown
+        if markdown and self.header_markdown and self._text:
+            parts[0] = parts[0].replace(self.header, self.header_markdown, 1)
+        parse_mode = ParseMode.MARKDOWN if markdown else None
+        for index, part in enumerate(parts):
+            if index == len(self._messages):
+                # Попереднє повідомлення заповнене: продовження в новому
+                message = await self._send(part, parse_mode=parse_mode)
+                self._messages.append(message)
+                self._shown.append(part)
+                continue
+            shown = self._shown[index]
+            if part == shown and not final:
+                continue
+            last = index == len(parts) - 1
+            if not final and last and shown.startswith(self.header) and len(part) - len(shown) < self.min_chars:
+                # Мало нового тексту: чекаємо наступного оновлення
+                continue
+            await self._edit(index, part, parse_mode=parse_mode)
+
+    async def _send(self, text, parse_mode=None):
+        while True:
+            try:
+                return await self._source.reply_text(text, parse_mode=parse_mode, reply_markup=self.reply_markup)
+            except RetryAfter as e:
+                await asyncio.sleep(_seconds(e.retry_after))
+            except BadRequest:
+                if parse_mode is None:
+                    raise
+                parse_mode = None
+
+    async def _edit(self, index, text, parse_mode=None):
+        while True:
+            try:
+                await self._messages[index].edit_text(text, parse_mode=parse_mode)
+                self.edits += 1
+                break
+            except RetryAfter as e:
+                await asyncio.sleep(_seconds(e.retry_after))
+            except BadRequest as e:
+                if 'not modified' in str(e).lower():
+                    break
+                if parse_mode is None:
+                    raise
+                # Розмітка відповіді некоректна — показуємо звичайний текст
+                parse_mode = None
+        self._shown[index] = text
+
+    def _log(self, outcome):
+        total = time.perf_counter() - self.started
+        ttft = f"{self.first_chunk - self.started:.2f}s" if self.first_chunk else "-"
+        logger.info(
+            f"Streamed reply {outcome}: first chunk {ttft}, total {total:.2f}s, "
+            f"{len(self._text)} chars, {self.edits} edits, {len(self._messages)} messages"
+        )
+
+
+def _seconds(retry_after):
+    # retry_after — int або timedelta залежно від налаштувань python-telegram-bot
+    return retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else retry_after
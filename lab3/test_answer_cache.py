@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from answer_cache import AnswerCache, normalize
+
+
+class Upstream:
+    """Замість ChatGPT: рахує виклики й відповідає, коли тест дозволить"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def compute(self, on_chunk):
+        self.calls += 1
+        on_chunk('част')
+        await self.release.wait()
+        return 'відповідь'
+
+
+def test_normalize_ignores_case_spacing_and_punctuation():
+    assert normalize('  Що таке   Python?! ') == normalize('що таке python') == 'що таке python'
+
+
+def test_normalize_keeps_symbols_that_change_the_question():
+    keys = {normalize(prompt) for prompt in ('Що таке C++?', 'Що таке C#?', 'Що таке C?', 'Що таке C.')}
+    assert keys == {'що таке c++', 'що таке c#', 'що таке c'}
+    assert normalize('Що таке Node.js?') == 'що таке node.js'
+    assert normalize('Що таке .NET...') == 'що таке .net'
+    assert normalize('Python 3.11 чи 3.12?') == 'python 3.11 чи 3.12'
+
+
+def test_identical_prompts_make_one_upstream_call():
+    async def scenario():
+        cache = AnswerCache(path='')
+        upstream = Upstream()
+        prompts = ['Що таке Python?', 'що таке python', 'ЩО ТАКЕ PYTHON!!', ' що  таке python ', 'Що таке Python']
+        chunks = [[] for _ in prompts]
+        tasks = [
+            asyncio.create_task(cache.get_or_compute(prompt, upstream.compute, on_chunk=chunks[index].append))
+            for index, prompt in enumerate(prompts)
+        ]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert upstream.calls == 1
+        assert [answer for answer, _ in results] == ['відповідь'] * len(prompts)
+        assert sorted(source for _, source in results) == ['coalesced'] * 4 + ['miss']
+        # Очікувачі бачать проміжний текст спільного запиту
+        assert all(received == ['част'] for received in chunks)
+
+        assert await cache.get_or_compute('що таке PYTHON', upstream.compute) == ('відповідь', 'hit')
+        assert upstream.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_waiter_retries_when_leader_is_cancelled():
+    async def scenario():
+        cache = AnswerCache(path='')
+        upstream = Upstream()
+        leader = asyncio.create_task(cache.get_or_compute('питання', upstream.compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute('Питання', upstream.compute))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        upstream.release.set()
+
+        assert await waiter == ('відповідь', 'miss')
+        assert upstream.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_leader():
+    async def scenario():
+        cache = AnswerCache(path='')
+        upstream = Upstream()
+        leader = asyncio.create_task(cache.get_or_compute('питання', upstream.compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute('питання', upstream.compute))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        upstream.release.set()
+        assert await leader == ('відповідь', 'miss')
+
+    asyncio.run(scenario())
+
+
+def test_failed_compute_is_not_cached():
+    async def scenario():
+        cache = AnswerCache(path='')
+
+        async def failing(on_chunk):
+            raise RuntimeError('API error')
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute('питання', failing)
+        assert cache.get('питання') is None
+
+    asyncio.run(scenario())
+
+
+def test_entries_survive_reopen_and_expire(tmp_path):
+    path = str(tmp_path / 'answers.db')
+    cache = AnswerCache(path=path)
+    cache.set('Що таке Python?', 'мова програмування')
+    cache.close()
+
+    reopened = AnswerCache(path=path)
+    assert reopened.get('що таке python') == 'мова програмування'
+    reopened.close()
+
+    expired = AnswerCache(path=path, ttl=-1)
+    expired.set('інше', 'відповідь')
+    assert expired.get('інше') is None
+    expired.close()
+
+
+def test_lru_eviction_respects_byte_cap():
+    cache = AnswerCache(max_bytes=60, path='')
+    cache.set('перше', 'а' * 10)
+    cache.set('друге', 'б' * 10)
+    cache.get('перше')
+    cache.set('третє', 'в' * 10)
+    assert cache.get('друге') is None
+    assert cache.get('перше') is not None
+    assert cache.stats()['bytes'] <= 60
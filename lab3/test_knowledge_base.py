@@ -0,0 +1,63 @@
+import json
+import os
+
+from knowledge_base import KnowledgeBase
+
+
+def _write(path, entries, mtime):
+    path.write_text(json.dumps({'fallback': 'не знаю', 'entries': entries}, ensure_ascii=False), encoding='utf-8')
+    # Зміну файлу база помічає за mtime, тож у тестах він задається явно
+    os.utime(path, (mtime, mtime))
+
+
+def _knowledge_base(tmp_path, entries):
+    path = tmp_path / 'kb.json'
+    _write(path, entries, 1000)
+    return KnowledgeBase(path=str(path), reload_interval=0), path
+
+
+ENTRIES = [
+    {'keywords': ['js', 'javascript'], 'answer': 'js'},
+    {'keywords': ['node js', 'nodejs'], 'answer': 'node'},
+    {'keywords': ['java'], 'answer': 'java'},
+    {'keywords': ['веб*'], 'answer': 'веб'},
+    {'keywords': ['c++'], 'answer': 'c++'},
+    {'keywords': ['c#'], 'answer': 'c#'},
+]
+
+
+def test_keywords_match_whole_words_only(tmp_path):
+    kb, _ = _knowledge_base(tmp_path, ENTRIES)
+    assert kb.answer('Розкажи про Java!') == 'java'
+    assert kb.answer('Що таке JavaScript?') == 'js'
+    assert kb.answer('вебінар') == 'веб'
+    assert kb.answer('Веб-сайт') == 'веб'
+    assert kb.answer('павеб') == 'не знаю'
+
+
+def test_symbols_in_keywords(tmp_path):
+    kb, _ = _knowledge_base(tmp_path, ENTRIES)
+    assert kb.answer('Що таке C++?') == 'c++'
+    assert kb.answer('Що таке C#?') == 'c#'
+    assert kb.answer('Що таке C?') == 'не знаю'
+
+
+def test_more_specific_match_wins(tmp_path):
+    kb, _ = _knowledge_base(tmp_path, ENTRIES)
+    assert kb.answer('Як запустити js') == 'js'
+    assert kb.answer('Як запустити node js') == 'node'
+    # Повторення ключового слова не підвищує рахунок
+    assert kb.answer('js js js node js') == 'node'
+
+
+def test_reload_keeps_previous_version_on_broken_file(tmp_path):
+    kb, path = _knowledge_base(tmp_path, ENTRIES)
+
+    path.write_text('{"entries": [', encoding='utf-8')
+    os.utime(path, (2000, 2000))
+    assert kb.answer('java') == 'java'
+    assert kb.stats()['entries'] == len(ENTRIES)
+
+    _write(path, [{'keywords': ['java'], 'answer': 'нова відповідь'}], 3000)
+    assert kb.answer('java') == 'нова відповідь'
+    assert kb.stats() == {'entries': 1, 'keywords': 1}
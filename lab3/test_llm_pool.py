@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+from llm_pool import LLMWorkerPool
+
+
+def _blocking_ask(release):
+    def ask(prompt):
+        release.wait(5)
+        yield {"message": f"answer to {prompt}"}
+    return ask
+
+
+def test_cancelling_task_frees_queue_and_slot():
+    async def scenario():
+        release = threading.Event()
+        pool = LLMWorkerPool(_blocking_ask(release), max_concurrency=1)
+        running = asyncio.create_task(pool.submit(1, 'a'))
+        queued = asyncio.create_task(pool.submit(2, 'b'))
+        await asyncio.sleep(0.05)
+        assert pool.status() == {'active': 1, 'queued': 1, 'max_concurrency': 1}
+
+        # "🔙 Назад" скасовує задачу запиту; запит у черзі зникає одразу
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert not pool.is_busy(2)
+        assert pool.status()['queued'] == 0
+
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        assert not pool.is_busy(1)
+        # Слот звільняється, коли потік справді завершився
+        release.set()
+        for _ in range(100):
+            if pool.status()['active'] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert await pool.submit(3, 'c') == 'answer to c'
+        pool.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,100 @@
+from state_store import MemoryStateStore, SQLiteStateStore
+
+
+def _sqlite_store(tmp_path, **kwargs):
+    # Фоновий запис не встигає спрацювати під час тесту: flush викликається явно
+    return SQLiteStateStore(path=str(tmp_path / 'state.db'), flush_interval=3600, **kwargs)
+
+
+def test_state_survives_close_and_reopen(tmp_path):
+    store = _sqlite_store(tmp_path)
+    store.set_mode(1, 'chatgpt')
+    store.append_turn(1, 'питання', 'відповідь')
+    store.set_mode(2, 'student')
+    store.set_mode(2, None)
+    store.close()
+
+    reopened = _sqlite_store(tmp_path)
+    try:
+        assert reopened.get_mode(1) == 'chatgpt'
+        assert reopened.history(1) == [('питання', 'відповідь')]
+        assert reopened.get_mode(2) is None
+        assert reopened.stats()['users'] == 1
+    finally:
+        reopened.close()
+
+
+def test_processes_sharing_file_see_each_other_after_flush(tmp_path):
+    first, second = _sqlite_store(tmp_path, shared=True), _sqlite_store(tmp_path, shared=True)
+    try:
+        first.set_mode(1, 'chatgpt')
+        first.flush()
+        assert second.get_mode(1) == 'chatgpt'
+
+        # Стан, уже закешований у другому процесі, перечитується після запису першого
+        first.set_mode(1, 'student')
+        first.append_turn(1, 'питання', 'відповідь')
+        first.flush()
+        assert second.get_mode(1) == 'student'
+        assert second.history(1) == [('питання', 'відповідь')]
+
+        first.set_mode(1, None)
+        first.clear_history(1)
+        first.flush()
+        assert second.get_mode(1) is None
+    finally:
+        first.close()
+        second.close()
+
+
+def test_own_unflushed_changes_win_over_file(tmp_path):
+    first, second = _sqlite_store(tmp_path, shared=True), _sqlite_store(tmp_path, shared=True)
+    try:
+        first.set_mode(1, 'chatgpt')
+        first.flush()
+        second.set_mode(1, 'student')
+        assert second.get_mode(1) == 'student'
+    finally:
+        first.close()
+        second.close()
+
+
+def test_single_process_store_does_not_reread_file(tmp_path):
+    store = _sqlite_store(tmp_path)
+    try:
+        store.set_mode(1, 'chatgpt')
+        store.flush()
+        # Запис в обхід сховища: без STATE_SHARED стан у пам'яті з файлом не звіряється
+        store._db.execute("UPDATE user_states SET mode = 'student'")
+        assert store.get_mode(1) == 'chatgpt'
+        assert store.stats()['reloads'] == 0
+    finally:
+        store.close()
+
+
+def test_history_is_capped_by_turns_and_chars():
+    store = MemoryStateStore(history_turns=3, history_chars=100)
+    for index in range(5):
+        store.append_turn(1, f'q{index}', f'a{index}')
+    assert store.history(1) == [('q2', 'a2'), ('q3', 'a3'), ('q4', 'a4')]
+
+    store.append_turn(1, 'q' * 80, 'a' * 80)
+    history = store.history(1)
+    assert len(history) == 1
+    assert sum(len(prompt) + len(answer) for prompt, answer in history) == 100
+
+
+def test_zero_history_turns_keeps_no_history():
+    store = MemoryStateStore(history_turns=0)
+    store.append_turn(1, 'питання', 'відповідь')
+    assert store.history(1) == []
+    assert store.stats()['users'] == 0
+
+
+def test_least_recently_used_users_are_evicted():
+    store = MemoryStateStore(max_users=2)
+    for user_id in (1, 2, 3):
+        store.set_mode(user_id, 'chatgpt')
+    assert store.get_mode(1) is None
+    assert store.get_mode(3) == 'chatgpt'
+    assert store.evictions == 1
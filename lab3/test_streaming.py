@@ -0,0 +1,61 @@
+import asyncio
+
+from telegram.error import BadRequest, NetworkError
+
+from streaming import StreamingReply
+
+
+class Message:
+    """Замість повідомлення Telegram: запам'ятовує текст і може зламати редагування"""
+
+    def __init__(self, failures=()):
+        self.text = None
+        self.failures = list(failures)
+
+    async def reply_text(self, text, **kwargs):
+        self.text = text
+        return self
+
+    async def edit_text(self, text, **kwargs):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.text = text
+
+
+def _reply(message):
+    return StreamingReply(message, header='Відповідь:', placeholder='Думаю...', interval=0, min_chars=1)
+
+
+def test_failed_intermediate_edit_keeps_flusher_alive():
+    async def scenario():
+        message = Message([BadRequest('Message to edit not found')])
+        reply = _reply(message)
+        await reply.start()
+        reply.feed('перша частина')
+        await asyncio.sleep(0.01)
+        assert not reply._flusher.done()
+
+        reply.feed('перша частина і друга')
+        await asyncio.sleep(0.01)
+        assert message.text == 'Відповідь:\n\nперша частина і друга'
+
+        await reply.finish('повна відповідь')
+        assert message.text == 'Відповідь:\n\nповна відповідь'
+
+    asyncio.run(scenario())
+
+
+def test_abort_after_flusher_failure_does_not_raise():
+    async def scenario():
+        message = Message([NetworkError('connection reset')])
+        reply = _reply(message)
+        await reply.start()
+        reply.feed('частина')
+        await asyncio.sleep(0.01)
+        assert reply._flusher.done()
+
+        await reply.abort('❌ Помилка')
+        assert reply._flusher is None
+        assert message.text == 'Відповідь:\n\nчастина\n\n❌ Помилка'
+
+    asyncio.run(scenario())
@@ -0,0 +1,27 @@
+import unicodedata
+
+# Нормалізація тексту повідомлень: ключ кешу відповідей (answer_cache.py)
+# і ключові слова бази знань (knowledge_base.py) порівнюються в однаковій формі.
+
+# Розділові знаки, що входять у назви мов і технологій ("C#")
+_KEPT_PUNCTUATION = frozenset('#')
+
+
+def normalize(message):
+    """Текст без регістру, розділових знаків і зайвих пробілів.
+
+    Символи ("+" у "C++"), "#" і крапка перед літерою чи цифрою ("node.js", ".net")
+    зберігаються: "Що таке C++?" і "Що таке C?" — різні запитання.
+    """
+    text = unicodedata.normalize('NFKC', message).casefold()
+    chars = []
+    for index, char in enumerate(text):
+        if char == '.':
+            following = text[index + 1:index + 2]
+            previous = text[index - 1:index] if index else ''
+            if not (following.isalnum() and previous != '.'):
+                char = ' '
+        elif char not in _KEPT_PUNCTUATION and unicodedata.category(char).startswith('P'):
+            char = ' '
+        chars.append(char)
+    return ' '.join(''.join(chars).split())
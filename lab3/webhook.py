@@ -0,0 +1,231 @@
+import asyncio
+import bisect
+import hmac
+import logging
+import os
+import time
+from collections import deque
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+# Один asyncio HTTP-сервер для webhook Telegram, /health та /metrics.
+# Оновлення обробляються паралельно (не більше WEBHOOK_MAX_CONCURRENCY одночасно), але
+# оновлення одного чату — строго по черзі: кожен активний чат має власну чергу, яку
+# розбирає одна задача. Очікування своєї черги не займає слот паралельності.
+# Понад WEBHOOK_MAX_PENDING необроблених оновлень сервер відповідає 503, і Telegram
+# повторює доставку пізніше.
+
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv('WEBHOOK_MAX_CONCURRENCY', 32))
+WEBHOOK_MAX_PENDING = int(os.getenv('WEBHOOK_MAX_PENDING', 1000))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', 40))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Кумулятивна гістограма у стилі Prometheus"""
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{le="+Inf"}} {self.count}'
+        yield f'{name}_sum {self.sum:.6f}'
+        yield f'{name}_count {self.count}'
+
+
+class ChatOrderedDispatcher:
+    """Паралельна обробка оновлень зі збереженням порядку в межах чату"""
+
+    def __init__(self, process, max_concurrency=WEBHOOK_MAX_CONCURRENCY, max_pending=WEBHOOK_MAX_PENDING):
+        self._process = process
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._chats = {}
+        self._tasks = set()
+        self.pending = 0
+        self.received = 0
+        self.rejected = 0
+        self.failed = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+
+    def submit(self, update) -> bool:
+        """Поставити оновлення в чергу його чату; False — черга переповнена"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return False
+        self.received += 1
+        self.pending += 1
+
+        chat = update.effective_chat
+        user = update.effective_user
+        # Оновлення без чату та користувача не мають порядку, який треба зберігати
+        key = chat.id if chat else ('user', user.id) if user else object()
+        queue = self._chats.get(key)
+        if queue is not None:
+            queue.append((update, time.perf_counter()))
+            return True
+        self._chats[key] = deque([(update, time.perf_counter())])
+        task = asyncio.create_task(self._drain(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _drain(self, key):
+        queue = self._chats[key]
+        try:
+            while queue:
+                update, received = queue[0]
+                async with self._semaphore:
+                    try:
+                        await self._process(update)
+                    except Exception:
+                        self.failed += 1
+                        logger.exception(f"Failed to process update {update.update_id}")
+                self.latency.observe(time.perf_counter() - received)
+                queue.popleft()
+                self.pending -= 1
+        finally:
+            # Скасування при зупинці: решта черги не буде оброблена
+            self.pending -= len(queue)
+            del self._chats[key]
+
+    async def shutdown(self, timeout=10):
+        """Дочекатися обробки прийнятих оновлень (не довше timeout секунд)"""
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"{len(pending)} chats still had unprocessed updates at shutdown")
+            await asyncio.wait(pending)
+
+    def stats(self) -> dict:
+        return {
+            'received': self.received,
+            'pending': self.pending,
+            'rejected': self.rejected,
+            'failed': self.failed,
+            'active_chats': len(self._chats),
+            'max_concurrency': self.max_concurrency
+        }
+
+
+def _metric_lines(prefix, values):
+    """Числові значення (зокрема вкладені) як метрики Prometheus"""
+    for key, value in values.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            yield from _metric_lines(name, value)
+        elif isinstance(value, bool):
+            yield f"{name} {int(value)}"
+        elif isinstance(value, (int, float)):
+            yield f"{name} {value}"
+
+
+def render_metrics(health, dispatcher=None, rate_limiter=None) -> str:
+    """Метрики бота у текстовому форматі Prometheus"""
+    lines = list(_metric_lines('bot', {key: value for key, value in health.items() if isinstance(value, dict)}))
+    if rate_limiter is not None:
+        lines.extend(_metric_lines('bot_send', rate_limiter.stats()))
+    if dispatcher is not None:
+        lines.extend(_metric_lines('bot_updates', dispatcher.stats()))
+        lines.append("# HELP bot_update_duration_seconds Time from webhook delivery to processed update")
+        lines.append("# TYPE bot_update_duration_seconds histogram")
+        lines.extend(dispatcher.latency.lines('bot_update_duration_seconds'))
+    return "\n".join(lines) + "\n"
+
+
+def create_web_app(application, health, dispatcher=None, path=WEBHOOK_PATH, secret=WEBHOOK_SECRET):
+    """HTTP-застосунок: /health, /metrics і (з dispatcher) webhook для оновлень"""
+
+    async def health_endpoint(request: Request):
+        return JSONResponse(health())
+
+    async def metrics_endpoint(request: Request):
+        return PlainTextResponse(
+            render_metrics(health(), dispatcher, application.bot.rate_limiter),
+            media_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+    async def telegram_webhook(request: Request):
+        token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+        if secret and not hmac.compare_digest(token, secret):
+            return Response(status_code=403)
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except ValueError:
+            return Response(status_code=400)
+        if update is None or not dispatcher.submit(update):
+            return Response(status_code=503)
+        return Response()
+
+    routes = [
+        Route('/', health_endpoint),
+        Route('/health', health_endpoint),
+        Route('/metrics', metrics_endpoint)
+    ]
+    if dispatcher is not None:
+        routes.append(Route(path, telegram_webhook, methods=['POST']))
+    return Starlette(routes=routes)
+
+
+async def serve(application, health, port, webhook_url=WEBHOOK_URL):
+    """Запуск бота разом з HTTP-сервером: webhook, якщо заданий webhook_url, інакше polling"""
+    dispatcher = ChatOrderedDispatcher(application.process_update) if webhook_url else None
+    server = uvicorn.Server(uvicorn.Config(
+        create_web_app(application, health, dispatcher),
+        host='0.0.0.0', port=port, log_level='warning', lifespan='off'
+    ))
+
+    async with application:
+        if dispatcher:
+            await application.bot.set_webhook(
+                url=webhook_url.rstrip('/') + WEBHOOK_PATH,
+                secret_token=WEBHOOK_SECRET or None,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=WEBHOOK_MAX_CONNECTIONS
+            )
+            print(f"🔗 Webhook mode: {webhook_url.rstrip('/')}{WEBHOOK_PATH}")
+        else:
+            await application.updater.start_polling()
+        await application.start()
+        print(f"🌐 HTTP server running on port {port}")
+        try:
+            # Завершується за SIGINT/SIGTERM
+            await server.serve()
+        finally:
+            if dispatcher:
+                await dispatcher.shutdown()
+            elif application.updater.running:
+                await application.updater.stop()
+            await application.stop()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Literal, Union
+
+import models
+import schemas
+import crud_async
+import cache
+from database import get_async_db
+
+# Асинхронні версії основних endpoints (DB_ASYNC=true).
+# Роутер підключається в main.py перед синхронними маршрутами з тими самими шляхами,
+# тому запити обробляються тут і не займають потоки threadpool на час очікування БД.
+# {card_id:int} не перехоплює /technical-cards/filter, /export та інші синхронні шляхи.
+
+router = APIRouter()
+
+@router.get("/technical-cards", response_model=Union[List[schemas.TechnicalCard], schemas.TechnicalCardPage])
+async def read_technical_cards_async(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    processing_type: Optional[models.ProcessingType] = None,
+    min_duration: Optional[int] = Query(None, ge=0),
+    max_duration: Optional[int] = Query(None, ge=0),
+    detail_name_contains: Optional[str] = None,
+    sort_by: Literal["id", "processing_duration", "created_at", "relevance"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    envelope: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Отримати список технічних карт з можливістю фільтрації"""
+    filters = schemas.TechnicalCardFilter(
+        processing_type=processing_type,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        detail_name_contains=detail_name_contains
+    )
+
+    key = cache.make_key(
+        "technical-cards", **filters.model_dump(),
+        skip=skip, limit=limit, sort_by=sort_by, order=order, cursor=cursor,
+        with_total=with_total or None, envelope=envelope or None
+    )
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+
+    if cursor is not None:
+        try:
+            cards, next_cursor = await crud_async.get_technical_card_records_page(
+                db, cursor=cursor, limit=limit, filters=filters, sort_by=sort_by, order=order
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        cards = await crud_async.get_technical_card_records(
+            db, skip=skip, limit=limit, filters=filters, sort_by=sort_by, order=order
+        )
+        next_cursor = None
+
+    total = None
+    if with_total or envelope:
+        total = await crud_async.count_technical_cards(db, filters=filters)
+
+    if cursor is not None or envelope:
+        body = schemas.dump_technical_card_records_page(cards, next_cursor, total)
+    else:
+        body = schemas.dump_technical_card_records(cards)
+    return cache.store(key, body, schemas.total_headers(total))
+
+@router.get("/technical-cards/{card_id:int}", response_model=schemas.TechnicalCard)
+async def read_technical_card_async(card_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Отримати технічну карту за ID"""
+    db_card = await crud_async.get_technical_card(db, card_id=card_id)
+    if db_card is None:
+        raise HTTPException(status_code=404, detail="Технічна карта не знайдена")
+    return db_card
+
+@router.post("/technical-cards", response_model=schemas.TechnicalCard, status_code=201)
+async def create_technical_card_async(
+    card: schemas.TechnicalCardCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Створити нову технічну карту"""
+    return await crud_async.create_technical_card(db, card=card)
+
+@router.put("/technical-cards/{card_id:int}", response_model=schemas.TechnicalCard)
+async def update_technical_card_async(
+    card_id: int,
+    card: schemas.TechnicalCardUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Оновити технічну карту"""
+    db_card = await crud_async.update_technical_card(db, card_id=card_id, card_update=card)
+    if db_card is None:
+        raise HTTPException(status_code=404, detail="Технічна карта не знайдена")
+    return db_card
+
+@router.delete("/technical-cards/{card_id:int}")
+async def delete_technical_card_async(card_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Видалити технічну карту"""
+    db_card = await crud_async.delete_technical_card(db, card_id=card_id)
+    if db_card is None:
+        raise HTTPException(status_code=404, detail="Технічна карта не знайдена")
+    return {"message": "Технічна карта успішно видалена"}
+
+@router.get("/stats", response_model=schemas.GeneralStats)
+async def get_statistics_async(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Отримати загальну статистику по технічних картах"""
+    key = cache.make_key("stats")
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+
+    stats = schemas.GeneralStats.model_validate(await crud_async.get_general_stats(db))
+    return cache.store(key, stats.model_dump_json().encode())
+
+@router.get("/stats/processing-types", response_model=List[schemas.ProcessingStats])
+async def get_processing_statistics_async(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Отримати статистику по видах обробки"""
+    key = cache.make_key("stats/processing-types")
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+
+    stats = await crud_async.get_processing_stats(db)
+    return cache.store(key, schemas.dump_processing_stats(stats))
@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Порівняння двох шляхів формування сторінки GET /technical-cards:
+#   orm  — ORM-об'єкти -> schemas.TechnicalCard (from_attributes) -> JSON
+#   fast — Core select -> TechnicalCardRecord (__slots__) -> orjson
+# Обидва шляхи мають повертати однакові байти; це перевіряється перед вимірюванням.
+#
+#   cd lab6
+#   python -m benchmarks.bench_list_fastpath --cards 20000 --limit 1000
+
+LAB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def seed(crud, schemas, models, db, cards):
+    """Заповнення бази пачками через масову вставку"""
+    types = list(models.ProcessingType)
+    for start in range(0, cards, 5000):
+        crud.create_technical_cards_bulk(db, [
+            schemas.TechnicalCardCreate(
+                detail_name=f"Деталь {i}",
+                processing_type=random.choice(types),
+                processing_duration=random.randint(1, 480)
+            )
+            for i in range(start, min(start + 5000, cards))
+        ])
+
+def measure(build, rounds):
+    """Середній час одного виклику, мс"""
+    build()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        build()
+    return (time.perf_counter() - started) / rounds * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM vs Core fast path for list endpoints")
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir.name}/bench.db"
+    os.chdir(LAB_DIR)
+    sys.path.insert(0, LAB_DIR)
+    import crud
+    import models
+    import schemas
+    from database import init_db, SessionLocal, ReadSessionLocal
+
+    init_db()
+    with SessionLocal() as db:
+        seed(crud, schemas, models, db, args.cards)
+
+    with ReadSessionLocal() as db:
+        def orm_path():
+            cards = crud.get_technical_cards(db, limit=args.limit, sort_by="processing_duration")
+            db.expunge_all()
+            return schemas.dump_technical_cards(cards)
+
+        def fast_path():
+            records = crud.get_technical_card_records(db, limit=args.limit, sort_by="processing_duration")
+            return schemas.dump_technical_card_records(records)
+
+        if orm_path() != fast_path():
+            raise SystemExit("Outputs differ")
+
+        orm_ms = measure(orm_path, args.rounds)
+        fast_ms = measure(fast_path, args.rounds)
+
+    print(f"page of {args.limit} cards ({args.cards} in table)")
+    print(f"  orm:  {orm_ms:8.2f} ms")
+    print(f"  fast: {fast_ms:8.2f} ms")
+    print(f"speedup: {orm_ms / fast_ms:.2f}x")
+    workdir.cleanup()
+
+if __name__ == "__main__":
+    main()
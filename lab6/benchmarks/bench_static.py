@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+
+# Пропускна здатність GET / та GET /processing-types до і після попереднього формування
+# відповідей. "before" відтворює попередні обробники (читання index.html з диска та
+# побудова списку видів обробки на кожен запит), "after" — застосунок з main.py.
+#
+#   cd lab6
+#   python -m benchmarks.bench_static --requests 5000
+#
+# Запити йдуть через ASGITransport у тому ж процесі, тому вимірюється лише робота
+# застосунку без мережі та HTTP-парсера сервера.
+
+LAB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def baseline_app(models):
+    """Застосунок з обробниками у попередньому вигляді"""
+    app = FastAPI()
+
+    @app.get("/", response_class=HTMLResponse)
+    def read_root():
+        with open("static/index.html", "r", encoding="utf-8") as f:
+            return f.read()
+
+    @app.get("/processing-types")
+    def get_processing_types():
+        type_labels = {
+            "TURNING": "Токарна",
+            "MILLING": "Фрезерна",
+            "DRILLING": "Свердлільна",
+            "GRINDING": "Шліфувальна",
+            "WELDING": "Зварювальна",
+            "ASSEMBLY": "Складальна",
+            "PAINTING": "Фарбування",
+            "THERMAL": "Термічна"
+        }
+        return [{"value": pt.value, "label": type_labels[pt.value]} for pt in models.ProcessingType]
+
+    return app
+
+async def run_load(app, path, requests, concurrency, headers):
+    """Паралельні запити до одного шляху, повертає req/s"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        async def worker(count):
+            for _ in range(count):
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await worker(50)  # прогрів
+        started = time.perf_counter()
+        per_worker = requests // concurrency
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - started)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Precomputed static responses benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--accept-encoding", default="gzip, br")
+    args = parser.parse_args()
+
+    os.chdir(LAB_DIR)
+    sys.path.insert(0, LAB_DIR)
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    import main as application
+
+    headers = {"accept-encoding": args.accept_encoding}
+    apps = {"before": baseline_app(application.models), "after": application.app}
+    for path in ("/", "/processing-types"):
+        results = {}
+        for name, app in apps.items():
+            results[name] = await run_load(app, path, args.requests, args.concurrency, headers)
+        print(
+            f"{path:<18} before {results['before']:>8.1f} req/s  after {results['after']:>8.1f} req/s  "
+            f"speedup {results['after'] / results['before']:.2f}x"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
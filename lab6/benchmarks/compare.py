@@ -0,0 +1,69 @@
+import argparse
+import json
+import sys
+
+# Порівняння двох результатів benchmarks.loadtest (наприклад, до і після коміту).
+#
+#   python -m benchmarks.compare benchmarks/results/a1b2c3d-asgi-100000.json benchmarks/results/e4f5a6b-asgi-100000.json
+#
+# Код виходу 1, якщо p95 або req/s будь-якого сценарію погіршилися більше ніж на --threshold %.
+
+METRICS = (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def change(old, new):
+    """Зміна у відсотках"""
+    if not old:
+        return 0.0
+    return (new - old) / old * 100
+
+def compare(baseline, candidate, threshold):
+    """Рядки таблиці порівняння та список регресій"""
+    rows, regressions = [], []
+    names = list(baseline["scenarios"]) + ["overall"]
+    for name in names:
+        old = baseline["overall"] if name == "overall" else baseline["scenarios"].get(name)
+        new = candidate["overall"] if name == "overall" else candidate["scenarios"].get(name)
+        if old is None or new is None:
+            continue
+        cells = []
+        for metric, higher_is_better in METRICS:
+            delta = change(old[metric], new[metric])
+            worse = -delta if higher_is_better else delta
+            if metric in ("rps", "p95_ms") and worse > threshold:
+                regressions.append(f"{name} {metric}: {old[metric]} -> {new[metric]} ({delta:+.1f}%)")
+            cells.append(f"{new[metric]:>9} ({delta:+6.1f}%)")
+        rows.append(f"{name:<18}" + "".join(cells))
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two load test results")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="допустиме погіршення, %%")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    for label, result in (("baseline", baseline), ("candidate", candidate)):
+        meta = result["meta"]
+        print(f"{label:<10} {meta['commit']}{'+' if meta['dirty'] else ''}  {meta['target']}  "
+              f"{meta['cards']} cards  c={meta['concurrency']}  {meta['timestamp']}")
+    if (baseline["meta"]["target"], baseline["meta"]["cards"]) != (candidate["meta"]["target"], candidate["meta"]["cards"]):
+        print("⚠️  Results were collected with different targets or data sizes")
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    print(f"{'scenario':<18}" + "".join(f"{metric:>19}" for metric, _ in METRICS))
+    print("\n".join(rows))
+
+    if regressions:
+        print(f"❌ Regressions over {args.threshold:g}%:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+    print("✅ No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+# Генератор синтетичних технічних карт з реалістичним розподілом видів обробки,
+# назв деталей і тривалостей. Дані детерміновані для заданого seed і завантажуються
+# через потоковий масовий імпорт POST /technical-cards/bulk.
+#
+#   cd lab6
+#   python -m benchmarks.datagen --cards 100000 --url http://127.0.0.1:8000
+#   python -m benchmarks.datagen --cards 10 --print
+
+# Частка видів обробки та (медіана, розкид) тривалості в хвилинах
+PROCESSING_PROFILE = {
+    "TURNING": (0.24, 35, 0.6),
+    "MILLING": (0.22, 50, 0.6),
+    "DRILLING": (0.16, 15, 0.5),
+    "GRINDING": (0.10, 40, 0.5),
+    "WELDING": (0.09, 60, 0.7),
+    "ASSEMBLY": (0.10, 90, 0.8),
+    "PAINTING": (0.05, 120, 0.5),
+    "THERMAL": (0.04, 240, 0.4),
+}
+
+PARTS = [
+    "Вал", "Шестерня", "Корпус", "Кришка", "Втулка", "Фланець", "Кронштейн", "Шків",
+    "Муфта", "Гвинт", "Пластина", "Рама", "Палець", "Кільце", "Стакан", "Опора",
+]
+QUALIFIERS = [
+    "приводний", "проміжний", "вихідний", "ведений", "ведучий", "опорний", "напрямний",
+    "редуктора", "насоса", "підшипника", "коробки передач", "шпинделя", "",
+]
+SERIES = ["ВП", "КР", "ТМ", "ШС", "ФН", "РД"]
+
+MAX_DURATION = 480
+
+def generate(cards: int, seed: int = 42):
+    """Словники карт у форматі TechnicalCardCreate"""
+    rng = random.Random(seed)
+    types = list(PROCESSING_PROFILE)
+    weights = [profile[0] for profile in PROCESSING_PROFILE.values()]
+
+    for _ in range(cards):
+        processing_type = rng.choices(types, weights)[0]
+        _, median, spread = PROCESSING_PROFILE[processing_type]
+        duration = min(MAX_DURATION, max(1, round(rng.lognormvariate(0, spread) * median)))
+        qualifier = rng.choice(QUALIFIERS)
+        name = f"{rng.choice(PARTS)} {qualifier}".strip()
+        yield {
+            "detail_name": f"{name} {rng.choice(SERIES)}-{rng.randint(100, 9999)}",
+            "processing_type": processing_type,
+            "processing_duration": duration,
+        }
+
+async def _ndjson_chunks(cards, seed, chunk_size=2000):
+    """NDJSON частинами для потокового тіла запиту"""
+    lines = []
+    for card in generate(cards, seed):
+        lines.append(json.dumps(card, ensure_ascii=False))
+        if len(lines) >= chunk_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+async def seed(client: httpx.AsyncClient, cards: int, seed: int = 42):
+    """Завантажити карти через масовий імпорт; повертає результат імпорту"""
+    response = await client.post(
+        "/technical-cards/bulk",
+        content=_ndjson_chunks(cards, seed),
+        headers={"content-type": "application/x-ndjson"},
+        timeout=None
+    )
+    response.raise_for_status()
+    result = response.json()
+    if result["failed"]:
+        raise RuntimeError(f"Bulk import failed for {result['failed']} cards: {result['errors'][:3]}")
+    return result
+
+async def main():
+    parser = argparse.ArgumentParser(description="Synthetic technical cards generator")
+    parser.add_argument("--cards", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="адреса запущеного API")
+    parser.add_argument("--print", action="store_true", help="вивести NDJSON замість завантаження")
+    args = parser.parse_args()
+
+    if args.print:
+        for card in generate(args.cards, args.seed):
+            print(json.dumps(card, ensure_ascii=False))
+        return
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=args.url) as client:
+        result = await seed(client, args.cards, args.seed)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Imported {result['inserted']} cards in {elapsed:.1f} s ({result['inserted'] / elapsed:.0f} cards/s)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks import datagen, server
+
+# Навантажувальний тест зі змішаним читанням і записом.
+#
+#   cd lab6
+#   python -m benchmarks.loadtest --target asgi --cards 100000
+#   python -m benchmarks.loadtest --target uvicorn --cards 1000000 --concurrency 100
+#   python -m benchmarks.loadtest --target url --url http://127.0.0.1:8000 --no-seed
+#   python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+#
+# asgi    — застосунок у тому ж процесі через httpx.ASGITransport (без мережі);
+# uvicorn — локальний uvicorn в окремому процесі (з HTTP-стеком);
+# url     — уже запущений сервер.
+# Для asgi та uvicorn база — тимчасова SQLite, якщо не задано --database-url.
+# Результати (p50/p95/p99, req/s по сценаріях) зберігаються в JSON для порівняння між комітами.
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+TYPES = list(datagen.PROCESSING_PROFILE)
+
+DEFAULT_MIX = {
+    "list_filtered": 25,
+    "list_deep_offset": 10,
+    "list_cursor": 15,
+    "get_card": 10,
+    "stats": 20,
+    "create": 10,
+    "update": 10,
+}
+
+class Workload:
+    """Сценарії запитів; кожен віртуальний користувач має власний стан"""
+
+    def __init__(self, cards: int, seed: int):
+        self.cards = max(cards, 1)
+        self.seed = seed
+
+    def user(self, index: int):
+        return {"rng": random.Random(self.seed * 1000 + index), "cursor": ""}
+
+    def _card_id(self, state):
+        return state["rng"].randint(1, self.cards)
+
+    async def list_filtered(self, client, state):
+        rng = state["rng"]
+        low = rng.randint(1, 200)
+        params = {"processing_type": rng.choice(TYPES), "min_duration": low, "max_duration": low + rng.randint(10, 200)}
+        if rng.random() < 0.3:
+            params["detail_name_contains"] = rng.choice(datagen.PARTS).lower()[:4]
+        return await client.get("/technical-cards", params={**params, "limit": 50})
+
+    async def list_deep_offset(self, client, state):
+        skip = state["rng"].randint(self.cards // 2, max(self.cards - 100, self.cards // 2))
+        return await client.get("/technical-cards", params={"skip": skip, "limit": 100, "sort_by": "processing_duration"})
+
+    async def list_cursor(self, client, state):
+        # Послідовне гортання: кожен запит — наступна сторінка після попередньої
+        response = await client.get(
+            "/technical-cards", params={"cursor": state["cursor"], "limit": 100, "sort_by": "created_at"}
+        )
+        if response.status_code == 200:
+            state["cursor"] = response.json()["next_cursor"] or ""
+        return response
+
+    async def get_card(self, client, state):
+        return await client.get(f"/technical-cards/{self._card_id(state)}")
+
+    async def stats(self, client, state):
+        path = "/stats" if state["rng"].random() < 0.7 else "/stats/processing-types"
+        return await client.get(path)
+
+    async def create(self, client, state):
+        card = next(datagen.generate(1, state["rng"].randrange(1 << 30)))
+        return await client.post("/technical-cards", json=card)
+
+    async def update(self, client, state):
+        rng = state["rng"]
+        return await client.put(
+            f"/technical-cards/{self._card_id(state)}",
+            json={"processing_duration": rng.randint(1, 480), "processing_type": rng.choice(TYPES)}
+        )
+
+def percentile(sorted_values, percent):
+    """Перцентиль методом найближчого рангу"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(latencies, errors, duration):
+    """Підсумок латентностей у мс та пропускної здатності"""
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / duration, 1) if duration else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+async def run_load(client, workload, mix, requests, concurrency, record=True):
+    """Виконати requests запитів зі змішаного навантаження"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    remaining = requests
+
+    async def user(index):
+        nonlocal remaining
+        state = workload.user(index)
+        while remaining > 0:
+            remaining -= 1
+            name = state["rng"].choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await getattr(workload, name)(client, state)
+                failed = response.status_code >= 500 or response.status_code == 429
+            except httpx.TransportError:
+                failed = True
+            elapsed = time.perf_counter() - started
+            if failed:
+                errors[name] += 1
+            else:
+                latencies[name].append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    duration = time.perf_counter() - started
+    if not record:
+        return None
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "duration_s": round(duration, 3),
+        "overall": summarize(all_latencies, sum(errors.values()), duration),
+        "scenarios": {
+            name: summarize(latencies[name], errors[name], duration) for name in names if latencies[name] or errors[name]
+        },
+    }
+
+def parse_mix(value):
+    """"list_filtered=30,stats=10" -> {"list_filtered": 30, "stats": 10}"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def git_revision():
+    """Поточний коміт і ознака незакомічених змін"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=server.LAB_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--", "."], cwd=server.LAB_DIR, capture_output=True, text=True
+        ).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+async def benchmark(client, args, mix):
+    """Заповнення, прогрів і вимірювання на готовому клієнті"""
+    seed_seconds = None
+    if not args.no_seed:
+        started = time.perf_counter()
+        await datagen.seed(client, args.cards, args.seed)
+        seed_seconds = round(time.perf_counter() - started, 2)
+        print(f"🌱 Seeded {args.cards} cards in {seed_seconds} s")
+
+    workload = Workload(args.cards, args.seed)
+    if args.warmup:
+        await run_load(client, workload, mix, args.warmup, args.concurrency, record=False)
+    result = await run_load(client, workload, mix, args.requests, args.concurrency)
+    result["seed_seconds"] = seed_seconds
+    return result
+
+async def run(args, mix):
+    """Запуск бенчмарку для вибраної цілі"""
+    env = {"CACHE_ENABLED": args.cache}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.target == "url":
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+            return await benchmark(client, args, mix)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = args.database_url or f"sqlite:///{workdir}/loadtest.db"
+        if args.target == "asgi":
+            app = server.load_app(database_url, **env)
+            async with server.asgi_client(app, timeout=60) as client:
+                return await benchmark(client, args, mix)
+
+        port = server.free_port()
+        process = server.start_server(database_url, port, **env)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                await server.wait_ready(client)
+                return await benchmark(client, args, mix)
+        finally:
+            server.stop_server(process)
+
+def print_report(result):
+    print(f"{'scenario':<18}{'requests':>9}{'errors':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(result["scenarios"].items()) + [("overall", result["overall"])]
+    for name, stats in rows:
+        print(
+            f"{name:<18}{stats['requests']:>9}{stats['errors']:>7}{stats['rps']:>9}"
+            f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+        )
+
+async def main():
+    parser = argparse.ArgumentParser(description="Mixed read/write load test for the technical cards API")
+    parser.add_argument("--target", choices=["asgi", "uvicorn", "url"], default="asgi")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="адреса сервера для --target url")
+    parser.add_argument("--database-url", help="БД для asgi/uvicorn (за замовчуванням тимчасова SQLite)")
+    parser.add_argument("--cards", type=int, default=10000, help="кількість карт для заповнення (10000/100000/1000000)")
+    parser.add_argument("--no-seed", action="store_true", help="не заповнювати базу (--cards лише для вибору id)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="ваги сценаріїв, напр. list_filtered=3,stats=1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="увімкнути кеш відповідей (за замовчуванням вимкнено)")
+    parser.add_argument("--output", help="файл результатів (за замовчуванням benchmarks/results/<коміт>-<ціль>-<карти>.json)")
+    args = parser.parse_args()
+    if args.output:
+        # Ціль asgi змінює робочий каталог на lab6
+        args.output = os.path.abspath(args.output)
+
+    result = await run(args, args.mix)
+    commit, dirty = git_revision()
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "dirty": dirty,
+            "target": args.target,
+            "database": "url" if args.target == "url" else (args.database_url or "sqlite (temporary)").split("://")[0],
+            "cards": args.cards,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "seed": args.seed,
+            "cache": args.cache,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        **result,
+    }
+
+    print_report(result)
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'unknown'}-{args.target}-{args.cards}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"💾 Results saved to {output}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks import server
+from benchmarks.loadtest import RESULTS_DIR, git_revision
+
+# Профіль холодного старту сервісу.
+#
+#   cd lab6
+#   python -m benchmarks.profile_startup
+#   python -m benchmarks.profile_startup --baseline benchmarks/results/<до>-startup.json
+#
+# import   — python -X importtime -c "import main": час імпорту кожного модуля
+#            (власний і з урахуванням вкладених імпортів) та сума за пакетами;
+# schema   — створення схеми в порожній базі (manage.py migrate);
+# uvicorn  — один процес uvicorn main:app: час від запуску до першої відповіді /health
+#            і затримка першого та повторних запитів до кожного endpoint;
+# serve    — те саме для serve.py з одним процесом-обробником після прогріву.
+# Результати зберігаються в JSON; з --baseline код виходу 1, якщо час до готовності
+# або перший запит погіршилися більше ніж на --threshold %.
+
+FIRST_REQUEST_PATHS = (
+    "/technical-cards?limit=10",
+    "/technical-cards/filter?processing_type=MILLING",
+    "/stats",
+    "/stats/histogram",
+    "/openapi.json",
+)
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+def profile_imports(env):
+    """Час імпорту модулів main (мкс -> мс), найдовші першими"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=server.LAB_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_ms": round(int(self_us) / 1000, 2),
+                "cumulative_ms": round(int(cumulative_us) / 1000, 2),
+                "depth": len(indent) // 2,
+            })
+    packages = {}
+    for module in modules:
+        package = module["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + module["self_ms"]
+    total = next((module["cumulative_ms"] for module in modules if module["module"] == "main"), None)
+    return {
+        "total_ms": total,
+        "packages": dict(sorted(((name, round(ms, 2)) for name, ms in packages.items()), key=lambda item: -item[1])),
+        "modules": sorted(modules, key=lambda module: -module["self_ms"]),
+    }
+
+def profile_schema(workdir):
+    """Час створення схеми в порожній SQLite базі, мс"""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/schema.db")
+    code = "import time; import manage; t = time.perf_counter(); manage.init_db(); print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=server.LAB_DIR, env=env, capture_output=True, text=True, check=True)
+    return round(float(result.stdout.strip().splitlines()[-1]) * 1000, 2)
+
+def start_serve(database_url, port):
+    """Запуск serve.py з одним процесом-обробником"""
+    return subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1", "--port", str(port), "--log-level", "warning"],
+        cwd=server.LAB_DIR,
+        env=dict(os.environ, DATABASE_URL=database_url),
+        stdout=subprocess.DEVNULL
+    )
+
+def measure_cold_start(start, database_url, repeats):
+    """Час до першої відповіді та затримки першого і повторних запитів, мс"""
+    port = server.free_port()
+    started = time.perf_counter()
+    process = start(database_url, port)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while True:
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if process.poll() is not None or time.perf_counter() - started > 60:
+                    raise RuntimeError("Server did not start")
+                time.sleep(0.01)
+            ready_ms = (time.perf_counter() - started) * 1000
+
+            requests = {}
+            for path in FIRST_REQUEST_PATHS:
+                timings = []
+                for _ in range(repeats + 1):
+                    request_started = time.perf_counter()
+                    client.get(path).raise_for_status()
+                    timings.append((time.perf_counter() - request_started) * 1000)
+                requests[path] = {"first_ms": round(timings[0], 2), "warm_ms": round(statistics.median(timings[1:]), 2)}
+    finally:
+        server.stop_server(process)
+    return {"ready_ms": round(ready_ms, 2), "requests": requests}
+
+def median_run(runs):
+    """Медіана кількох запусків для кожного показника"""
+    return {
+        "ready_ms": round(statistics.median(run["ready_ms"] for run in runs), 2),
+        "requests": {
+            path: {
+                key: round(statistics.median(run["requests"][path][key] for run in runs), 2)
+                for key in ("first_ms", "warm_ms")
+            }
+            for path in FIRST_REQUEST_PATHS
+        },
+    }
+
+def change(old, new):
+    """Зміна у відсотках"""
+    if not old:
+        return 0.0
+    return (new - old) / old * 100
+
+def regressions(baseline, candidate, threshold):
+    """Показники холодного старту, що погіршилися більше ніж на threshold %"""
+    found = []
+    pairs = [("import total_ms", baseline["import"]["total_ms"], candidate["import"]["total_ms"])]
+    for mode in ("uvicorn", "serve"):
+        pairs.append((f"{mode} ready_ms", baseline[mode]["ready_ms"], candidate[mode]["ready_ms"]))
+        for path, stats in candidate[mode]["requests"].items():
+            old = baseline[mode]["requests"].get(path)
+            if old:
+                pairs.append((f"{mode} {path} first_ms", old["first_ms"], stats["first_ms"]))
+    for name, old, new in pairs:
+        if old is not None and new is not None and change(old, new) > threshold:
+            found.append(f"{name}: {old} -> {new} ({change(old, new):+.1f}%)")
+    return found
+
+def print_report(result, top):
+    imports = result["import"]
+    print(f"📦 import main: {imports['total_ms']} ms, schema creation: {result['schema_ms']} ms")
+    print(f"{'package':<28}{'self ms':>10}")
+    for package, ms in list(imports["packages"].items())[:top]:
+        print(f"{package:<28}{ms:>10}")
+    print(f"{'module':<44}{'self ms':>10}{'cumul. ms':>11}")
+    for module in imports["modules"][:top]:
+        print(f"{module['module']:<44}{module['self_ms']:>10}{module['cumulative_ms']:>11}")
+
+    for mode in ("uvicorn", "serve"):
+        stats = result[mode]
+        print(f"🚀 {mode}: ready in {stats['ready_ms']} ms")
+        print(f"   {'endpoint':<48}{'first ms':>10}{'warm ms':>10}")
+        for path, timings in stats["requests"].items():
+            print(f"   {path:<48}{timings['first_ms']:>10}{timings['warm_ms']:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start profile of the technical cards API")
+    parser.add_argument("--runs", type=int, default=3, help="кількість холодних запусків кожного режиму")
+    parser.add_argument("--repeats", type=int, default=5, help="повторні запити для порівняння з першим")
+    parser.add_argument("--top", type=int, default=15, help="скільки пакетів і модулів показати")
+    parser.add_argument("--baseline", help="попередній результат для перевірки регресій")
+    parser.add_argument("--threshold", type=float, default=20.0, help="допустиме погіршення, %%")
+    parser.add_argument("--output", help="файл результатів (за замовчуванням benchmarks/results/<коміт>-startup.json)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = f"sqlite:///{workdir}/startup.db"
+        subprocess.run(
+            [sys.executable, "manage.py", "migrate"], cwd=server.LAB_DIR, check=True,
+            env=dict(os.environ, DATABASE_URL=database_url), stdout=subprocess.DEVNULL
+        )
+        result = {
+            "import": profile_imports(dict(os.environ, DATABASE_URL=database_url, DB_INIT_ON_STARTUP="False")),
+            "schema_ms": profile_schema(workdir),
+            "uvicorn": median_run([measure_cold_start(server.start_server, database_url, args.repeats) for _ in range(args.runs)]),
+            "serve": median_run([measure_cold_start(start_serve, database_url, args.repeats) for _ in range(args.runs)]),
+        }
+
+    commit, dirty = git_revision()
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "dirty": dirty,
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        **result,
+    }
+    print_report(result, args.top)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'unknown'}-startup.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"💾 Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(json.load(f), result, args.threshold)
+        if found:
+            print(f"❌ Cold start regressions over {args.threshold:g}%:")
+            for regression in found:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("✅ No cold start regressions")
+
+if __name__ == "__main__":
+    main()
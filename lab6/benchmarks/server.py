@@ -0,0 +1,58 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+
+import httpx
+
+# Запуск застосунку для бенчмарків: локальний uvicorn в окремому процесі
+# або ASGI-застосунок у тому ж процесі (httpx.ASGITransport).
+
+LAB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    """Вільний TCP-порт на localhost"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(database_url, port, **env_overrides):
+    """Запуск uvicorn з main:app та заданими змінними середовища"""
+    env = dict(os.environ, DATABASE_URL=database_url, DEBUG="False")
+    env.update({key: str(value) for key, value in env_overrides.items()})
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=LAB_DIR,
+        env=env
+    )
+
+def stop_server(server):
+    """Зупинка процесу uvicorn"""
+    server.terminate()
+    server.wait()
+
+async def wait_ready(client):
+    """Очікування, доки сервер почне відповідати"""
+    for _ in range(100):
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+def load_app(database_url, **env_overrides):
+    """Імпорт main:app у поточному процесі з заданою БД"""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.update({key: str(value) for key, value in env_overrides.items()})
+    os.chdir(LAB_DIR)
+    if LAB_DIR not in sys.path:
+        sys.path.insert(0, LAB_DIR)
+    import main
+    return main.app
+
+def asgi_client(app, **kwargs):
+    """Клієнт, що надсилає запити безпосередньо в ASGI-застосунок"""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", **kwargs)
@@ -0,0 +1,180 @@
+import codecs
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from enum import Enum
+
+from pydantic import ValidationError
+import schemas
+
+# Масовий імпорт та експорт технічних карт у форматах NDJSON і CSV.
+# Дані обробляються пачками в обох напрямках, тому пам'ять
+# не залежить від розміру файлу.
+
+CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 1000))
+MAX_REPORTED_ERRORS = int(os.getenv("BULK_MAX_REPORTED_ERRORS", 1000))
+# Довший рядок (або тіло без переносів) відхиляється, щоб не накопичувати його в пам'яті
+MAX_LINE_LENGTH = int(os.getenv("BULK_MAX_LINE_LENGTH", 64 * 1024))
+
+CSV_COLUMNS = ("detail_name", "processing_type", "processing_duration")
+
+def detect_format(content_type: str):
+    """Формат імпорту за заголовком Content-Type"""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json"):
+        return "ndjson"
+    return None
+
+class LineTooLong(ValueError):
+    """Рядок імпорту довший за BULK_MAX_LINE_LENGTH"""
+
+    def __init__(self, line: int, max_length: int):
+        super().__init__(f"Рядок {line} довший за {max_length} символів")
+        self.line = line
+
+async def iter_lines(stream, max_length: int = MAX_LINE_LENGTH):
+    """Рядки тексту з потоку байтів (UTF-8) без зчитування всього тіла"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    # Частини незавершеного рядка: перенос шукається лише в нових даних
+    parts, length = [], 0
+    line_number = 0
+    async for data in stream:
+        text = decoder.decode(data)
+        start = 0
+        while (end := text.find("\n", start)) != -1:
+            line_number += 1
+            if length + end - start > max_length:
+                raise LineTooLong(line_number, max_length)
+            parts.append(text[start:end])
+            yield "".join(parts).rstrip("\r")
+            parts, length = [], 0
+            start = end + 1
+        if start < len(text):
+            length += len(text) - start
+            if length > max_length:
+                raise LineTooLong(line_number + 1, max_length)
+            parts.append(text[start:])
+    parts.append(decoder.decode(b"", final=True))
+    tail = "".join(parts)
+    if tail:
+        yield tail.rstrip("\r")
+
+async def iter_ndjson_records(stream):
+    """(номер рядка, об'єкт або помилка) для NDJSON"""
+    line_number = 0
+    async for line in iter_lines(stream):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, None, f"Некоректний JSON: {e}"
+
+async def iter_csv_records(stream):
+    """(номер рядка, словник або помилка) для CSV із заголовком"""
+    header = None
+    record = ""
+    line_number = 0
+    record_line = 0
+
+    async for line in iter_lines(stream):
+        line_number += 1
+        if not record:
+            record_line = line_number
+            if not line.strip():
+                continue
+        record = f"{record}\n{line}" if record else line
+        if len(record) > MAX_LINE_LENGTH:
+            # Незакрите поле в лапках не повинно накопичувати решту тіла
+            raise LineTooLong(record_line, MAX_LINE_LENGTH)
+
+        # Непарна кількість лапок — поле в лапках продовжується на наступному рядку
+        if record.count('"') % 2:
+            continue
+
+        values = next(csv.reader([record]))
+        record = ""
+
+        if header is None:
+            header = [value.strip() for value in values]
+            missing = [column for column in CSV_COLUMNS if column not in header]
+            if missing:
+                yield record_line, None, f"У заголовку CSV бракує колонок: {', '.join(missing)}"
+                return
+            continue
+
+        if len(values) != len(header):
+            yield record_line, None, f"Очікувалось {len(header)} значень, отримано {len(values)}"
+            continue
+        yield record_line, dict(zip(header, values)), None
+
+    if record:
+        yield record_line, None, "Незакрите поле в лапках"
+
+def validate(data):
+    """Валідація одного запису схемою TechnicalCardCreate"""
+    try:
+        return schemas.TechnicalCardCreate.model_validate(data), None
+    except ValidationError as e:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in e.errors()
+        ]
+
+async def iter_chunks(records, chunk_size: int = CHUNK_SIZE):
+    """Пачки (номери рядків, валідні карти, помилки рядків) розміром до chunk_size записів"""
+    lines, cards, errors = [], [], []
+    async for line_number, data, error in records:
+        if error is None:
+            card, messages = validate(data)
+        else:
+            card, messages = None, [error]
+
+        if card is not None:
+            lines.append(line_number)
+            cards.append(card)
+        else:
+            errors.append(schemas.BulkImportError(line=line_number, errors=messages))
+
+        if len(cards) + len(errors) >= chunk_size:
+            yield lines, cards, errors
+            lines, cards, errors = [], [], []
+
+    if cards or errors:
+        yield lines, cards, errors
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+def _export_value(value):
+    """Значення колонки у форматі відповіді API"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+def export_ndjson(columns, partitions):
+    """Байти NDJSON, по одному блоку на пачку рядків"""
+    for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_export_value, row))), ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+
+def export_csv(columns, partitions):
+    """Байти CSV із заголовком, по одному блоку на пачку рядків"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    # Заголовок надсилається до виконання запиту: partitions читає БД лише при ітерації
+    yield buffer.getvalue().encode()
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([[_export_value(value) for value in row] for row in rows])
+        yield buffer.getvalue().encode()
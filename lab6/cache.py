@@ -0,0 +1,182 @@
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextvars import ContextVar
+from email.utils import formatdate
+
+from fastapi import Request, Response
+
+# Кеш серіалізованих відповідей читаючих endpoints.
+# Ключ містить номер покоління даних, який функції запису crud збільшують після commit,
+# тому старі записи стають недосяжними й витісняються LRU. ETag залежить лише від ключа,
+# отже відповідь 304 формується без запиту до БД і без серіалізації.
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() == "true"
+CACHE_TTL = float(os.getenv("CACHE_TTL", 60))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+GENERATION = "cards"
+
+# Не читати й не записувати кеш у поточному запиті (див. routing.py)
+bypass = ContextVar("cache_bypass", default=False)
+
+class CacheBackend(ABC):
+    """Інтерфейс сховища кешу (можна підключити спільне сховище через CACHE_BACKEND)"""
+
+    # Ідентифікатор сховища; входить в ETag, щоб різні процеси з власними
+    # лічильниками поколінь не видавали однакові ETag для різних даних
+    token = ""
+
+    @abstractmethod
+    def get(self, key: str):
+        """Значення за ключем або None"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float):
+        """Зберегти значення на ttl секунд"""
+
+    @abstractmethod
+    def get_counter(self, name: str) -> int:
+        """Поточне значення лічильника (0, якщо його ще немає)"""
+
+    @abstractmethod
+    def incr_counter(self, name: str) -> int:
+        """Збільшити лічильник на 1 і повернути нове значення"""
+
+    @abstractmethod
+    def clear(self):
+        """Видалити всі записи"""
+
+class MemoryCache(CacheBackend):
+    """LRU кеш у пам'яті процесу з TTL та обмеженням за кількістю і розміром"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.token = uuid.uuid4().hex[:8]
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._size += len(value)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+    def get_counter(self, name):
+        return self._counters.get(name, 0)
+
+    def incr_counter(self, name):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+def _load_backend():
+    """Сховище з CACHE_BACKEND ("module:Class") або кеш у пам'яті"""
+    path = os.getenv("CACHE_BACKEND")
+    if not path:
+        return MemoryCache()
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+backend = _load_backend()
+_last_modified = time.time()
+
+def disable():
+    """Вимкнути кеш і ETag/304 (наприклад, для кількох процесів без спільного сховища)"""
+    global CACHE_ENABLED
+    CACHE_ENABLED = False
+
+def set_backend(new_backend: CacheBackend):
+    """Замінити сховище кешу"""
+    global backend
+    backend = new_backend
+
+def invalidate():
+    """Нове покоління даних: усі закешовані відповіді за картами стають застарілими"""
+    global _last_modified
+    backend.incr_counter(GENERATION)
+    _last_modified = time.time()
+
+def make_key(name: str, **params) -> str:
+    """Ключ кешу з назви endpoint, нормалізованих параметрів і покоління даних"""
+    normalized = json.dumps(
+        {key: value for key, value in params.items() if value is not None},
+        sort_keys=True,
+        default=str
+    )
+    generation = backend.get_counter(GENERATION)
+    return f"{name}:{generation}:{normalized}"
+
+def _etag(key: str) -> str:
+    digest = hashlib.sha1(f"{backend.token}:{key}".encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+def _headers(etag: str):
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(_last_modified, usegmt=True),
+        "Cache-Control": "no-cache"
+    }
+
+def lookup(request: Request, key: str):
+    """Готова відповідь (304 або 200 з кешу) чи None, якщо її треба сформувати"""
+    if not CACHE_ENABLED or bypass.get():
+        return None
+
+    etag = _etag(key)
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=_headers(etag))
+
+    value = backend.get(key)
+    if value is None:
+        return None
+    # Запис кешу: JSON додаткових заголовків, перенос рядка, тіло відповіді
+    extra, _, body = value.partition(b"\n")
+    headers = {**json.loads(extra), **_headers(etag)} if extra != b"{}" else _headers(etag)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def store(key: str, body: bytes, headers: dict = None) -> Response:
+    """Зберегти серіалізовану відповідь (і додаткові заголовки) у кеші та повернути її"""
+    headers = headers or {}
+    if not CACHE_ENABLED:
+        # Без кешу ETag не перевіряється, тож і не видається
+        return Response(content=body, media_type="application/json", headers=headers)
+    if not bypass.get():
+        backend.set(key, json.dumps(headers).encode() + b"\n" + body, CACHE_TTL)
+    return Response(content=body, media_type="application/json", headers={**headers, **_headers(_etag(key))})
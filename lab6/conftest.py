@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+import pytest
+
+# Модулі застосунку читають налаштування БД під час імпорту, тому тимчасова база
+# задається до першого імпорту database
+_workdir = tempfile.mkdtemp(prefix="lab6-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ["DB_INIT_ON_STARTUP"] = "False"
+os.environ["CACHE_ENABLED"] = "False"
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(scope="session")
+def schema():
+    import manage
+    manage.init_db()
+
+@pytest.fixture(scope="session")
+def app(schema):
+    import main
+    return main.app
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def db(schema):
+    """Сесія з порожньою таблицею карт та узгодженими зведеннями"""
+    import models
+    import rollups
+    import stats
+    from database import SessionLocal
+
+    session = SessionLocal()
+    session.query(models.TechnicalCard).delete()
+    stats.rebuild(session)
+    rollups.rebuild(session)
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
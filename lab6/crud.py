@@ -1,59 +1,361 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, case, tuple_, literal, insert, select, update, delete, func
 from typing import List, Optional
+from datetime import datetime, timedelta
+import base64
+import json
+import math
+import operator
+import os
+import cache
+import events
 import models
+import rollups
 import schemas
+import search
+import stats
 
 def get_technical_card(db: Session, card_id: int):
     """Отримати технічну карту за ID"""
     return db.query(models.TechnicalCard).filter(models.TechnicalCard.id == card_id).first()
 
+SORT_FIELDS = ("id", "processing_duration", "created_at")
+
+def _filter_conditions(filters: Optional[schemas.TechnicalCardFilter]):
+    """Умови WHERE для фільтра технічних карт"""
+    conditions = []
+    if not filters:
+        return conditions
+    
+    if filters.processing_type:
+        conditions.append(models.TechnicalCard.processing_type == filters.processing_type)
+    
+    if filters.min_duration is not None:
+        conditions.append(models.TechnicalCard.processing_duration >= filters.min_duration)
+    
+    if filters.max_duration is not None:
+        conditions.append(models.TechnicalCard.processing_duration <= filters.max_duration)
+    
+    if filters.detail_name_contains:
+        conditions.append(search.name_condition(filters.detail_name_contains))
+    
+    return conditions
+
+def _order_by(sort_by: str, order: str):
+    """Сортування за ключем з id як унікальним доповненням"""
+    columns = [getattr(models.TechnicalCard, sort_by)]
+    if sort_by != "id":
+        columns.append(models.TechnicalCard.id)
+    return [column.desc() if order == "desc" else column.asc() for column in columns]
+
+def encode_cursor(card: models.TechnicalCard, sort_by: str, order: str) -> str:
+    """Непрозорий курсор з останнього (ключ сортування, id) сторінки"""
+    key = getattr(card, sort_by)
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    payload = json.dumps([sort_by, order, key, card.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_by: str, order: str):
+    """Розібрати курсор; ValueError, якщо він пошкоджений або з іншого сортування"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort_by, cursor_order, key, card_id = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Некоректний курсор") from e
+    
+    if (cursor_sort_by, cursor_order) != (sort_by, order):
+        raise ValueError("Курсор не відповідає параметрам сортування")
+    
+    # bool — підклас int, але не може бути ключем курсору
+    if not _is_int(card_id) or not _valid_cursor_key(sort_by, key):
+        raise ValueError("Некоректний курсор")
+    
+    if sort_by == "created_at":
+        try:
+            key = datetime.fromisoformat(key)
+        except ValueError as e:
+            raise ValueError("Некоректний курсор") from e
+    return key, card_id
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _valid_cursor_key(sort_by: str, key) -> bool:
+    """Тип ключа курсору відповідає полю сортування"""
+    if sort_by == "id":
+        return _is_int(key)
+    if sort_by == "processing_duration":
+        return _is_int(key) or (isinstance(key, float) and math.isfinite(key))
+    return isinstance(key, str)
+
+def _select_cards(
+    query,
+    filters: Optional[schemas.TechnicalCardFilter],
+    sort_by: str,
+    order: str,
+    cursor: Optional[str] = None
+):
+    """Фільтри, курсор і сортування для ORM-запиту або Core select"""
+    conditions = _filter_conditions(filters)
+    
+    if cursor:
+        key, last_id = decode_cursor(cursor, sort_by, order)
+        column = getattr(models.TechnicalCard, sort_by)
+        id_column = models.TechnicalCard.id
+        after = operator.lt if order == "desc" else operator.gt
+        if sort_by == "id":
+            conditions.append(after(id_column, last_id))
+        else:
+            # Порівняння кортежів (row values) дозволяє БД почати одразу з позиції в індексі
+            conditions.append(after(tuple_(column, id_column), tuple_(literal(key, column.type), last_id)))
+    
+    if conditions:
+        query = query.filter(and_(*conditions))
+    
+    if sort_by == "relevance":
+        # Найрелевантніші збіги пошуку за назвою першими, далі за id
+        if filters and filters.detail_name_contains:
+            query = search.order_by_relevance(query, filters.detail_name_contains)
+        sort_by = "id"
+    
+    return query.order_by(*_order_by(sort_by, order))
+
+def _page(cards, limit: int, sort_by: str, order: str):
+    """Обрізати зайвий рядок і сформувати курсор наступної сторінки"""
+    next_cursor = None
+    if len(cards) > limit:
+        cards = cards[:limit]
+        next_cursor = encode_cursor(cards[-1], sort_by, order)
+    return cards, next_cursor
+
 def get_technical_cards(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
-    filters: Optional[schemas.TechnicalCardFilter] = None
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
 ):
     """Отримати список технічних карт з фільтрацією"""
-    query = db.query(models.TechnicalCard)
+    query = _select_cards(db.query(models.TechnicalCard), filters, sort_by, order)
+    return query.offset(skip).limit(limit).all()
+
+def get_technical_cards_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
+):
+    """Курсорна (keyset) пагінація: повертає карти сторінки та курсор наступної.
     
-    if filters:
-        conditions = []
-        
-        if filters.processing_type:
-            conditions.append(models.TechnicalCard.processing_type == filters.processing_type)
-        
-        if filters.min_duration is not None:
-            conditions.append(models.TechnicalCard.processing_duration >= filters.min_duration)
-        
-        if filters.max_duration is not None:
-            conditions.append(models.TechnicalCard.processing_duration <= filters.max_duration)
-        
-        if filters.detail_name_contains:
-            conditions.append(models.TechnicalCard.detail_name.contains(filters.detail_name_contains))
-        
-        if conditions:
-            query = query.filter(and_(*conditions))
+    Замість OFFSET продовжуємо з останнього (ключ сортування, id), тому
+    будь-яка сторінка читається з композитного індексу за однаковий час.
+    """
+    if sort_by not in SORT_FIELDS:
+        raise ValueError("Курсорна пагінація не підтримує сортування за релевантністю")
     
-    return query.offset(skip).limit(limit).all()
+    # Зайвий рядок показує, чи є наступна сторінка
+    query = _select_cards(db.query(models.TechnicalCard), filters, sort_by, order, cursor)
+    return _page(query.limit(limit + 1).all(), limit, sort_by, order)
+
+# Швидкий шлях лише для читання: Core select потрібних стовпців без ORM-об'єктів,
+# identity map і Pydantic-валідації; рядки стають компактними записами для orjson
+
+def _select_records():
+    return select(*[getattr(models.TechnicalCard, name) for name in schemas.TECHNICAL_CARD_FIELDS])
+
+def get_technical_card_records(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
+):
+    """Список карт як записи TechnicalCardRecord (ті самі параметри, що get_technical_cards)"""
+    query = _select_cards(_select_records(), filters, sort_by, order).offset(skip).limit(limit)
+    record = schemas.TechnicalCardRecord
+    return [record(*row) for row in db.execute(query)]
+
+def get_technical_card_records_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
+):
+    """Курсорна пагінація з записами TechnicalCardRecord"""
+    if sort_by not in SORT_FIELDS:
+        raise ValueError("Курсорна пагінація не підтримує сортування за релевантністю")
+    
+    query = _select_cards(_select_records(), filters, sort_by, order, cursor).limit(limit + 1)
+    record = schemas.TechnicalCardRecord
+    return _page([record(*row) for row in db.execute(query)], limit, sort_by, order)
+
+# Загальна кількість карт для фільтра (X-Total-Count / envelope).
+# Без фільтра або лише за видом обробки — зі зведеної таблиці. Інакше точний COUNT,
+# обмежений COUNT_EXACT_LIMIT рядками; якщо збігів більше, кількість оцінюється
+# планувальником (PostgreSQL) або вибіркою діапазонів id (SQLite).
+COUNT_EXACT_LIMIT = int(os.getenv("COUNT_EXACT_LIMIT", 50000))
+COUNT_SAMPLE_SIZE = int(os.getenv("COUNT_SAMPLE_SIZE", 5000))
+COUNT_SAMPLE_WINDOWS = 20
+
+def count_technical_cards(db: Session, filters: Optional[schemas.TechnicalCardFilter] = None):
+    """Кількість карт за фільтром: (кількість, чи точна вона)"""
+    criteria = filters.model_dump(exclude_none=True) if filters else {}
+    if set(criteria) <= {"processing_type"}:
+        summary = {row[0]: row[1] for row in stats.read_summary(db)}
+        if "processing_type" in criteria:
+            return summary.get(filters.processing_type, 0), True
+        return sum(summary.values()), True
+    
+    conditions = _filter_conditions(filters)
+    limited = (
+        select(literal(1))
+        .select_from(models.TechnicalCard.__table__)
+        .where(and_(*conditions))
+        .limit(COUNT_EXACT_LIMIT + 1)
+        .subquery()
+    )
+    count = db.execute(select(func.count()).select_from(limited)).scalar()
+    if count <= COUNT_EXACT_LIMIT:
+        return count, True
+    
+    if db.get_bind().dialect.name == "postgresql":
+        estimate = _estimate_count_from_plan(db, conditions)
+    else:
+        estimate = _estimate_count_from_sample(db, conditions)
+    # Відомо, що збігів більше за ліміт точного підрахунку
+    return max(estimate, COUNT_EXACT_LIMIT + 1), False
+
+def _estimate_count_from_plan(db: Session, conditions):
+    """Оцінка кількості рядків з EXPLAIN PostgreSQL"""
+    query = select(models.TechnicalCard.id).where(and_(*conditions))
+    sql = str(query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def _estimate_count_from_sample(db: Session, conditions):
+    """Оцінка кількості за часткою збігів у рівномірно розподілених діапазонах id"""
+    id_column = models.TechnicalCard.id
+    low, high = db.execute(select(func.min(id_column), func.max(id_column))).one()
+    if low is None:
+        return 0
+    
+    span = high - low + 1
+    width = max(1, COUNT_SAMPLE_SIZE // COUNT_SAMPLE_WINDOWS)
+    step = max(width, span // COUNT_SAMPLE_WINDOWS)
+    windows = [id_column.between(start, start + width - 1) for start in range(low, high + 1, step)]
+    
+    # Діапазони первинного ключа читаються пошуком в індексі, а не скануванням таблиці
+    sampled, matched = db.execute(
+        select(func.count(), func.sum(case((and_(*conditions), 1), else_=0))).where(or_(*windows))
+    ).one()
+    if not sampled:
+        return 0
+    
+    total = sum(row[1] for row in stats.read_summary(db))
+    return round(total * (matched or 0) / sampled)
+
+EXPORT_COLUMNS = ("id", "detail_name", "processing_type", "processing_duration", "created_at", "updated_at")
+
+def iter_technical_card_rows(
+    db: Session,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    batch_size: int = 1000
+):
+    """Потоково читати карти пачками рядків (Core select, без ORM-об'єктів)"""
+    table = models.TechnicalCard.__table__
+    query = select(*[table.c[name] for name in EXPORT_COLUMNS]).order_by(table.c.id)
+    
+    conditions = _filter_conditions(filters)
+    if conditions:
+        query = query.where(and_(*conditions))
+    
+    # yield_per вмикає серверний курсор (stream_results), де драйвер це підтримує
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    yield from result.partitions()
 
 def create_technical_card(db: Session, card: schemas.TechnicalCardCreate):
     """Створити нову технічну карту"""
     db_card = models.TechnicalCard(**card.model_dump())
     db.add(db_card)
+    # INSERT ... RETURNING заповнює created_at (server default) для щоденного rollup
+    db.flush()
+    stats.record_added(db, *_stats_delta(db_card))
+    rollups.record(db, added=rollups.card_counts([_rollup_row(db_card)]))
+    # Знімок статистики для події читається в тій самій транзакції, що й запис
+    summary = get_general_stats(db)
     db.commit()
+    cache.invalidate()
     db.refresh(db_card)
+    events.publish("card-created", {"card": _card_payload(db_card), "stats": summary})
     return db_card
 
+def create_technical_cards_bulk(db: Session, cards: List[schemas.TechnicalCardCreate]):
+    """Створити пачку технічних карт одним INSERT (executemany) в одній транзакції"""
+    if not cards:
+        return 0
+    
+    rows = [card.model_dump() for card in cards]
+    # RETURNING повертає created_at (server default) для щоденного rollup
+    created = db.execute(
+        insert(models.TechnicalCard).returning(
+            models.TechnicalCard.processing_type,
+            models.TechnicalCard.processing_duration,
+            models.TechnicalCard.created_at
+        ),
+        rows
+    ).all()
+    
+    # Зведена статистика оновлюється одним кроком на вид обробки
+    deltas = {}
+    for row in rows:
+        processing_type, duration = row["processing_type"], row["processing_duration"]
+        count, total, min_duration, max_duration = deltas.get(processing_type, (0, 0, duration, duration))
+        deltas[processing_type] = (count + 1, total + duration, min(min_duration, duration), max(max_duration, duration))
+    for processing_type, delta in deltas.items():
+        stats.record_added(db, processing_type, *delta)
+    rollups.record(db, added=rollups.card_counts(created))
+    
+    summary = get_general_stats(db)
+    db.commit()
+    cache.invalidate()
+    events.publish("cards-imported", {"count": len(rows), "stats": summary})
+    return len(rows)
+
 def update_technical_card(db: Session, card_id: int, card_update: schemas.TechnicalCardUpdate):
     """Оновити технічну карту"""
     db_card = get_technical_card(db, card_id)
     if db_card:
+        old_delta = _stats_delta(db_card)
+        old_row = _rollup_row(db_card)
         update_data = card_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_card, field, value)
+        
+        # Переносимо карту між групами зведеної статистики, якщо змінився вид або тривалість
+        new_delta = _stats_delta(db_card)
+        if new_delta != old_delta:
+            db.flush()
+            stats.record_removed(db, *old_delta)
+            stats.record_added(db, *new_delta)
+            rollups.record(
+                db,
+                added=rollups.card_counts([_rollup_row(db_card)]),
+                removed=rollups.card_counts([old_row])
+            )
+        summary = get_general_stats(db)
         db.commit()
+        cache.invalidate()
         db.refresh(db_card)
+        events.publish("card-updated", {"card": _card_payload(db_card), "stats": summary})
     return db_card
 
 def delete_technical_card(db: Session, card_id: int):
@@ -61,38 +363,135 @@ def delete_technical_card(db: Session, card_id: int):
     db_card = get_technical_card(db, card_id)
     if db_card:
         db.delete(db_card)
+        db.flush()
+        stats.record_removed(db, *_stats_delta(db_card))
+        rollups.record(db, removed=rollups.card_counts([_rollup_row(db_card)]))
+        summary = get_general_stats(db)
         db.commit()
+        cache.invalidate()
+        events.publish("card-deleted", {"id": card_id, "stats": summary})
     return db_card
 
-def get_processing_stats(db: Session):
-    """Отримати статистику по видах обробки"""
-    stats = []
+def _selection_conditions(selection: schemas.TechnicalCardSelection):
+    """Умови WHERE для вибору карт пакетної операції"""
+    if selection.ids is not None:
+        return [models.TechnicalCard.id.in_(selection.ids)]
+    return _filter_conditions(selection.filter)
+
+def _aggregate_by_type(db: Session, conditions):
+    """Внесок вибраних карт у зведену статистику: (вид, count, total, min, max)"""
+    duration = models.TechnicalCard.processing_duration
+    return db.execute(
+        select(
+            models.TechnicalCard.processing_type,
+            func.count(),
+            func.sum(duration),
+            func.min(duration),
+            func.max(duration)
+        )
+        .where(and_(*conditions))
+        .group_by(models.TechnicalCard.processing_type)
+    ).all()
+
+def update_technical_cards(
+    db: Session,
+    selection: schemas.TechnicalCardSelection,
+    changes: schemas.TechnicalCardUpdate
+):
+    """Оновити вибрані карти одним UPDATE; повертає кількість змінених карт"""
+    values = changes.model_dump(exclude_none=True)
+    conditions = _selection_conditions(selection)
+    # Лише карти, у яких щось змінюється: як і при поштучному оновленні,
+    # updated_at і статистика не торкаються карт без фактичних змін
+    conditions.append(or_(*[getattr(models.TechnicalCard, field) != value for field, value in values.items()]))
     
-    # Отримуємо всі типи обробки
-    for processing_type in models.ProcessingType:
-        cards = db.query(models.TechnicalCard).filter(
-            models.TechnicalCard.processing_type == processing_type
-        ).all()
+    moves_stats = "processing_type" in values or "processing_duration" in values
+    old_groups = _aggregate_by_type(db, conditions) if moves_stats else []
+    old_counts = rollups.selection_counts(db, conditions) if moves_stats else None
+    
+    # Core UPDATE виставляє updated_at через onupdate стовпця
+    result = db.execute(update(models.TechnicalCard.__table__).where(and_(*conditions)).values(**values))
+    
+    # Зведення: прибрати старі групи (вже після UPDATE, для перерахунку меж) і додати нові
+    new_groups = {}
+    for processing_type, count, total_duration, min_duration, max_duration in old_groups:
+        stats.record_removed(db, processing_type, count, total_duration, min_duration, max_duration)
         
-        if cards:
-            count = len(cards)
-            total_duration = sum(card.processing_duration for card in cards)
-            avg_duration = total_duration / count
-            
-            stats.append({
-                "processing_type": processing_type,
-                "count": count,
-                "total_duration": total_duration,
-                "average_duration": round(avg_duration, 2)
-            })
-    
-    return stats
+        new_type = values.get("processing_type", processing_type)
+        if "processing_duration" in values:
+            duration = values["processing_duration"]
+            total_duration, min_duration, max_duration = count * duration, duration, duration
+        if new_type in new_groups:
+            merged = new_groups[new_type]
+            count, total_duration = merged[0] + count, merged[1] + total_duration
+            min_duration, max_duration = min(merged[2], min_duration), max(merged[3], max_duration)
+        new_groups[new_type] = (count, total_duration, min_duration, max_duration)
+    for processing_type, delta in new_groups.items():
+        stats.record_added(db, processing_type, *delta)
+    if old_counts:
+        new_counts = rollups.moved_counts(
+            old_counts, values.get("processing_type"), values.get("processing_duration")
+        )
+        rollups.record(db, added=new_counts, removed=old_counts)
+    
+    summary = get_general_stats(db)
+    db.commit()
+    cache.invalidate()
+    events.publish("cards-updated", {"count": result.rowcount, "stats": summary})
+    return result.rowcount
+
+def delete_technical_cards(db: Session, selection: schemas.TechnicalCardSelection):
+    """Видалити вибрані карти одним DELETE; повертає кількість видалених карт"""
+    conditions = _selection_conditions(selection)
+    groups = _aggregate_by_type(db, conditions)
+    counts = rollups.selection_counts(db, conditions)
+    
+    result = db.execute(delete(models.TechnicalCard.__table__).where(and_(*conditions)))
+    for group in groups:
+        stats.record_removed(db, *group)
+    rollups.record(db, removed=counts)
+    
+    summary = get_general_stats(db)
+    db.commit()
+    cache.invalidate()
+    events.publish("cards-deleted", {"count": result.rowcount, "stats": summary})
+    return result.rowcount
+
+def _card_payload(db_card: models.TechnicalCard):
+    """Карта у форматі відповіді API для подій"""
+    return schemas.TechnicalCard.model_validate(db_card).model_dump(mode="json")
+
+def _stats_delta(db_card: models.TechnicalCard):
+    """Внесок однієї карти у зведену статистику"""
+    duration = db_card.processing_duration
+    return (db_card.processing_type, 1, duration, duration, duration)
+
+def _rollup_row(db_card: models.TechnicalCard):
+    """Внесок однієї карти в rollup-таблиці графіків"""
+    return (db_card.processing_type, db_card.processing_duration, db_card.created_at)
+
+def _processing_stats_from_rows(rows):
+    """Формування статистики по видах обробки з агрегованих рядків"""
+    return [
+        {
+            "processing_type": processing_type,
+            "count": count,
+            "total_duration": total_duration,
+            "average_duration": round(total_duration / count, 2)
+        }
+        for processing_type, count, total_duration, *_ in rows
+        if count
+    ]
+
+def get_processing_stats(db: Session):
+    """Отримати статистику по видах обробки"""
+    return _processing_stats_from_rows(stats.read_summary(db))
 
 def get_general_stats(db: Session):
     """Отримати загальну статистику"""
-    all_cards = db.query(models.TechnicalCard).all()
+    processing_stats = get_processing_stats(db)
     
-    if not all_cards:
+    if not processing_stats:
         return {
             "total_cards": 0,
             "total_processing_time": 0,
@@ -100,13 +499,86 @@ def get_general_stats(db: Session):
             "processing_stats": []
         }
     
-    total_cards = len(all_cards)
-    total_time = sum(card.processing_duration for card in all_cards)
+    # Загальні показники складаються з агрегатів по видах обробки
+    total_cards = sum(stat["count"] for stat in processing_stats)
+    total_time = sum(stat["total_duration"] for stat in processing_stats)
     avg_time = total_time / total_cards
     
     return {
         "total_cards": total_cards,
         "total_processing_time": total_time,
         "average_processing_time": round(avg_time, 2),
-        "processing_stats": get_processing_stats(db)
-    }
\ No newline at end of file
+        "processing_stats": processing_stats
+    }
+
+# Графіки: гістограма тривалостей і динаміка створення карт з rollup-таблиць
+
+TIMESERIES_MAX_POINTS = 5000
+
+def get_duration_histograms(
+    db: Session,
+    processing_type: Optional[models.ProcessingType] = None,
+    bucket_width: int = 30
+):
+    """Гістограми тривалостей по видах обробки з інтервалами ширини bucket_width хвилин"""
+    if bucket_width % rollups.HISTOGRAM_BUCKET_MINUTES:
+        raise ValueError(f"bucket_width має бути кратним {rollups.HISTOGRAM_BUCKET_MINUTES} хв")
+    factor = bucket_width // rollups.HISTOGRAM_BUCKET_MINUTES
+    
+    counts = {}
+    for row_type, bucket, count in rollups.read_histogram(db, processing_type):
+        type_counts = counts.setdefault(row_type, {})
+        type_counts[bucket // factor] = type_counts.get(bucket // factor, 0) + count
+    
+    histograms = []
+    for row_type in models.ProcessingType:
+        type_counts = counts.get(row_type)
+        if not type_counts:
+            continue
+        # Порожні інтервали між першим і останнім заповненим теж повертаються
+        histograms.append({
+            "processing_type": row_type,
+            "total": sum(type_counts.values()),
+            "buckets": [
+                {"start": index * bucket_width, "end": (index + 1) * bucket_width, "count": type_counts.get(index, 0)}
+                for index in range(min(type_counts), max(type_counts) + 1)
+            ]
+        })
+    return histograms
+
+def get_creation_timeseries(
+    db: Session,
+    interval: str = "day",
+    processing_type: Optional[models.ProcessingType] = None,
+    date_from=None,
+    date_to=None
+):
+    """Кількість створених карт по днях або тижнях (з понеділка), з нулями для порожніх періодів"""
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("date_from не може бути пізніше за date_to")
+    
+    step = timedelta(days=7 if interval == "week" else 1)
+    period = rollups.week_start if interval == "week" else (lambda day: day)
+    
+    counts = {}
+    for day, count in rollups.read_daily(db, processing_type, date_from, date_to):
+        key = period(day)
+        counts[key] = counts.get(key, 0) + count
+    
+    first = period(date_from) if date_from else min(counts, default=None)
+    last = period(date_to) if date_to else max(counts, default=None)
+    points = []
+    if first is not None and last is not None and first <= last:
+        if (last - first) // step >= TIMESERIES_MAX_POINTS:
+            raise ValueError(f"Задано більше {TIMESERIES_MAX_POINTS} періодів, звузьте діапазон дат")
+        current = first
+        while current <= last:
+            points.append({"period_start": current, "count": counts.get(current, 0)})
+            current += step
+    
+    return {
+        "interval": interval,
+        "processing_type": processing_type,
+        "total": sum(counts.values()),
+        "points": points
+    }
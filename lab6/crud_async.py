@@ -0,0 +1,89 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import models
+import schemas
+import crud
+
+# Асинхронні версії CRUD операцій.
+# Логіка (фільтри, пагінація, зведена статистика) живе в crud: AsyncSession.run_sync
+# виконує ті самі функції в greenlet, а очікування драйвера БД не блокує event loop.
+
+async def get_technical_card(db: AsyncSession, card_id: int):
+    """Отримати технічну карту за ID"""
+    return await db.get(models.TechnicalCard, card_id)
+
+async def get_technical_cards(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
+):
+    """Отримати список технічних карт з фільтрацією"""
+    return await db.run_sync(
+        crud.get_technical_cards, skip=skip, limit=limit, filters=filters, sort_by=sort_by, order=order
+    )
+
+async def get_technical_cards_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
+):
+    """Курсорна (keyset) пагінація технічних карт"""
+    return await db.run_sync(
+        crud.get_technical_cards_page, cursor=cursor, limit=limit, filters=filters, sort_by=sort_by, order=order
+    )
+
+async def get_technical_card_records(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
+):
+    """Список технічних карт як легкі записи (без ORM-об'єктів)"""
+    return await db.run_sync(
+        crud.get_technical_card_records, skip=skip, limit=limit, filters=filters, sort_by=sort_by, order=order
+    )
+
+async def get_technical_card_records_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    filters: Optional[schemas.TechnicalCardFilter] = None,
+    sort_by: str = "id",
+    order: str = "asc"
+):
+    """Курсорна пагінація з легкими записами"""
+    return await db.run_sync(
+        crud.get_technical_card_records_page, cursor=cursor, limit=limit, filters=filters, sort_by=sort_by, order=order
+    )
+
+async def count_technical_cards(db: AsyncSession, filters: Optional[schemas.TechnicalCardFilter] = None):
+    """Кількість карт за фільтром: (кількість, чи точна вона)"""
+    return await db.run_sync(crud.count_technical_cards, filters=filters)
+
+async def create_technical_card(db: AsyncSession, card: schemas.TechnicalCardCreate):
+    """Створити нову технічну карту"""
+    return await db.run_sync(crud.create_technical_card, card)
+
+async def update_technical_card(db: AsyncSession, card_id: int, card_update: schemas.TechnicalCardUpdate):
+    """Оновити технічну карту"""
+    return await db.run_sync(crud.update_technical_card, card_id, card_update)
+
+async def delete_technical_card(db: AsyncSession, card_id: int):
+    """Видалити технічну карту"""
+    return await db.run_sync(crud.delete_technical_card, card_id)
+
+async def get_processing_stats(db: AsyncSession):
+    """Отримати статистику по видах обробки"""
+    return await db.run_sync(crud.get_processing_stats)
+
+async def get_general_stats(db: AsyncSession):
+    """Отримати загальну статистику"""
+    return await db.run_sync(crud.get_general_stats)
@@ -1,25 +1,360 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+from contextvars import ContextVar
 from dotenv import load_dotenv
+import itertools
+import logging
 import os
+import threading
+import time
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./technical_cards.db")
 
-# Створення движка бази даних
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") in ("sqlite:", "sqlite:/"))
+
+# Параметри пулу з'єднань
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+
+# Репліки для читання (через кому); після власного запису клієнт читає з основної БД
+# протягом REPLICA_STICKY_SECONDS (cookie, див. routing.py)
+DATABASE_READ_URLS = [url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",") if url.strip()]
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", 5))
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", 10))
+REPLICA_READMIT_CHECKS = int(os.getenv("REPLICA_READMIT_CHECKS", 2))
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
+# Налаштування SQLite: WAL дозволяє читати паралельно із записом,
+# synchronous=NORMAL у WAL не робить fsync на кожен commit
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", 4))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -20000)),  # від'ємне значення — КіБ
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 134217728)),
+    "temp_store": "MEMORY",
+}
+
+class TimedQueuePool(QueuePool):
+    """QueuePool, що накопичує час очікування вільного з'єднання"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._wait_lock:
+                self.checkouts += 1
+                self.wait_time_total += elapsed
+                self.wait_time_max = max(self.wait_time_max, elapsed)
+
+def _apply_sqlite_pragmas(dbapi_connection, query_only=False):
+    """Прагми SQLite для кожного нового з'єднання"""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    if query_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+def _create_engines():
+    """Движок для запису та движок для читання"""
+    if IS_SQLITE_MEMORY:
+        # База в пам'яті існує лише в межах одного з'єднання: спільне з'єднання для всіх потоків
+        memory_engine = create_engine(DATABASE_URL, poolclass=StaticPool, connect_args={"check_same_thread": False})
+        return memory_engine, memory_engine
+
+    if IS_SQLITE:
+        connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        # SQLite допускає лише одного записувача: запити на запис стають у чергу пулу,
+        # а не отримують "database is locked"
+        write_engine = create_engine(
+            DATABASE_URL,
+            poolclass=TimedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=POOL_TIMEOUT,
+            connect_args=connect_args
+        )
+        read_engine = create_engine(
+            DATABASE_URL,
+            poolclass=TimedQueuePool,
+            pool_size=SQLITE_READ_POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            connect_args=connect_args
+        )
+        event.listen(write_engine, "connect", lambda connection, record: _apply_sqlite_pragmas(connection))
+        event.listen(read_engine, "connect", lambda connection, record: _apply_sqlite_pragmas(connection, query_only=True))
+        return write_engine, read_engine
+
+    server_engine = _create_server_engine(DATABASE_URL)
+    return server_engine, server_engine
+
+def _create_server_engine(url: str):
+    """Движок з пулом з'єднань для серверної БД"""
+    return create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING
+    )
+
+def _create_replica_engine(url: str):
+    """Движок репліки для читання"""
+    if not url.startswith("sqlite"):
+        return _create_server_engine(url)
+    replica_engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=SQLITE_READ_POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    )
+    event.listen(replica_engine, "connect", lambda connection, record: _apply_sqlite_pragmas(connection, query_only=True))
+    return replica_engine
+
+# Створення движків бази даних: engine — для запису, read_engine — для читання
+engine, read_engine = _create_engines()
+
+logger = logging.getLogger("lab6.replicas")
+
+# Затримка репліки PostgreSQL у секундах; 0, якщо всі отримані зміни вже застосовані
+_PG_REPLICA_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
 )
 
-# Створення локальної сесії
+def _error_text(error) -> str:
+    """Перший рядок повідомлення про помилку для журналу та /health"""
+    message = str(error).strip()
+    return message.splitlines()[0][:200] if message else type(error).__name__
+
+class ReplicaSet:
+    """Репліки для читання: round-robin серед справних, виключення при помилках і повернення після перевірок"""
+
+    def __init__(self, urls, fallback):
+        self.fallback = fallback
+        self.engines = [_create_replica_engine(url) for url in urls]
+        self.names = {replica: f"replica-{index}" for index, replica in enumerate(self.engines, 1)}
+        self._healthy = {replica: True for replica in self.engines}
+        self._successes = {replica: 0 for replica in self.engines}
+        self._lag = {replica: None for replica in self.engines}
+        self._errors = {replica: None for replica in self.engines}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._checker = None
+        self._stopped = threading.Event()
+
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._on_error(replica))
+
+    def __bool__(self):
+        return bool(self.engines)
+
+    def choose(self):
+        """Наступна справна репліка або рушій читання основної БД, якщо справних немає"""
+        healthy = [replica for replica in self.engines if self._healthy[replica]]
+        if not healthy:
+            return self.fallback
+        return healthy[next(self._counter) % len(healthy)]
+
+    def eject(self, replica, reason: str):
+        """Виключити репліку з ротації до успішних перевірок"""
+        with self._lock:
+            was_healthy = self._healthy[replica]
+            self._healthy[replica] = False
+            self._successes[replica] = 0
+            self._errors[replica] = reason
+        if was_healthy:
+            logger.warning("Replica %s ejected: %s", self.names[replica], reason)
+
+    def _on_error(self, replica):
+        def handle_error(context):
+            # Невдале підключення або втрачене з'єднання — ознака недоступної репліки;
+            # помилки SQL ротацію не змінюють
+            if context.is_disconnect or context.connection is None:
+                self.eject(replica, _error_text(context.original_exception))
+        return handle_error
+
+    def check(self):
+        """Перевірити всі репліки: доступність і затримка реплікації"""
+        for replica in self.engines:
+            try:
+                with replica.connect() as connection:
+                    if replica.dialect.name == "postgresql":
+                        lag = float(connection.execute(_PG_REPLICA_LAG).scalar() or 0)
+                    else:
+                        connection.execute(text("SELECT 1"))
+                        lag = 0.0
+            except Exception as e:
+                self._lag[replica] = None
+                self.eject(replica, _error_text(e))
+                continue
+
+            self._lag[replica] = lag
+            if lag > REPLICA_MAX_LAG:
+                self.eject(replica, f"replication lag {lag:.1f}s > {REPLICA_MAX_LAG:g}s")
+                continue
+
+            with self._lock:
+                if self._healthy[replica]:
+                    continue
+                self._successes[replica] += 1
+                readmit = self._successes[replica] >= REPLICA_READMIT_CHECKS
+                if readmit:
+                    self._healthy[replica] = True
+                    self._errors[replica] = None
+            if readmit:
+                logger.warning("Replica %s readmitted", self.names[replica])
+
+    def start(self, interval: float = REPLICA_CHECK_INTERVAL):
+        """Запустити фонову перевірку реплік"""
+        if not self.engines or self._checker is not None:
+            return
+        self._stopped.clear()
+
+        def run():
+            while not self._stopped.wait(interval):
+                self.check()
+
+        self._checker = threading.Thread(target=run, name="replica-health-check", daemon=True)
+        self._checker.start()
+
+    def stop(self):
+        """Зупинити фонову перевірку реплік"""
+        self._stopped.set()
+        if self._checker is not None:
+            self._checker.join(timeout=REPLICA_CHECK_INTERVAL)
+            self._checker = None
+
+    def status(self):
+        """Стан реплік для /health"""
+        return [
+            {
+                "name": self.names[replica],
+                "healthy": self._healthy[replica],
+                "lag_seconds": self._lag[replica],
+                "error": self._errors[replica],
+                **pool_status(replica)
+            }
+            for replica in self.engines
+        ]
+
+replicas = ReplicaSet(DATABASE_READ_URLS, fallback=read_engine)
+
+# Читання з основної БД для поточного запиту (встановлює routing.ReadYourWritesMiddleware)
+read_from_primary = ContextVar("read_from_primary", default=False)
+
+class RoutingSession(Session):
+    """Сесія читання: запити йдуть на одну репліку на сесію, записи — на основну БД"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._read_bind = read_engine if read_from_primary.get() else None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            return engine
+        if self._read_bind is None:
+            self._read_bind = replicas.choose()
+        return self._read_bind
+
+# Створення локальних сесій
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+def pool_status(target_engine):
+    """Метрики пулу з'єднань для /health"""
+    pool = target_engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0)
+        })
+    if isinstance(pool, TimedQueuePool):
+        status.update({
+            "checkouts": pool.checkouts,
+            "wait_time_total_ms": round(pool.wait_time_total * 1000, 2),
+            "wait_time_max_ms": round(pool.wait_time_max * 1000, 2)
+        })
+    return status
+
+# Асинхронний доступ до БД (aiosqlite / asyncpg) вмикається змінною DB_ASYNC
+DB_ASYNC = os.getenv("DB_ASYNC", "False").lower() == "true"
+
+def _async_database_url(url: str) -> str:
+    """URL з асинхронним драйвером для того самого сервера БД"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:") or url.startswith("postgres:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(DATABASE_URL))
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    
+    if IS_SQLITE:
+        async_engine = create_async_engine(ASYNC_DATABASE_URL)
+        if not IS_SQLITE_MEMORY:
+            event.listen(async_engine.sync_engine, "connect", lambda connection, record: _apply_sqlite_pragmas(connection))
+    else:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=POOL_PRE_PING
+        )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
 
 # Базовий клас для моделей
 Base = declarative_base()
 
+def init_db():
+    """Створення таблиць та індексів, яких ще немає в базі даних"""
+    Base.metadata.create_all(bind=engine)
+    
+    # create_all не додає нові індекси до вже наявних таблиць
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def dispose_engines():
+    """Закрити з'єднання синхронних пулів, наприклад перед fork процесів-обробників"""
+    for target_engine in {engine, read_engine, *replicas.engines}:
+        target_engine.dispose()
+
 # Функція для отримання сесії БД
 def get_db():
     """Dependency для отримання сесії бази даних"""
@@ -27,4 +362,17 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    """Dependency для сесії, що лише читає (репліка або пул читання основної БД)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Dependency для отримання асинхронної сесії бази даних"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import threading
+import uuid
+from collections import deque
+
+import orjson
+
+# Стрічка змін для Server-Sent Events (GET /events).
+# Функції запису crud публікують події після commit; кожен підписник має власну
+# asyncio.Queue, куди події передаються через call_soon_threadsafe (запис може
+# виконуватися в потоці threadpool). Останні EVENTS_BUFFER_SIZE подій зберігаються
+# в кільцевому буфері, тож клієнт після перепідключення отримує пропущені події
+# за Last-Event-ID. Якщо їх уже витіснено або процес перезапущено, клієнт отримує
+# подію reset і перезавантажує дані повністю.
+
+EVENTS_BUFFER_SIZE = int(os.getenv("EVENTS_BUFFER_SIZE", 1000))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 1000))
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", 15))
+RETRY_MS = 3000
+
+# Стрічка вимикається, якщо записи обробляють інші процеси (serve.py з кількома обробниками):
+# підписник бачив би лише зміни свого процесу
+EVENTS_ENABLED = True
+
+class _Subscriber:
+    __slots__ = ("loop", "queue", "overflowed")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, frame):
+        # Виконується в циклі подій підписника
+        if self.overflowed:
+            return
+        if self.queue.full():
+            # Клієнт не встигає читати: замість пропуску подій просимо перезавантаження
+            self.overflowed = True
+            return
+        self.queue.put_nowait(frame)
+
+class EventBus:
+    """Pub/sub у межах процесу з кільцевим буфером для відновлення за Last-Event-ID"""
+
+    def __init__(self, buffer_size: int = EVENTS_BUFFER_SIZE):
+        # Токен запуску в id подій відрізняє id цього процесу від id попереднього запуску
+        self.token = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data):
+        """Опублікувати подію всім підписникам (можна викликати з будь-якого потоку)"""
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            frame = _frame(event, orjson.dumps(data), f"{self.token}:{sequence}")
+            self._buffer.append((sequence, frame))
+            # Доставки плануються під блокуванням: черга call_soon_threadsafe впорядкована,
+            # тож підписник отримує кадри в порядку id навіть за одночасних записів
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.deliver, frame)
+                except RuntimeError:
+                    # Цикл подій уже закрито
+                    self._subscribers.discard(subscriber)
+
+    def _backlog(self, last_event_id):
+        """Пропущені події після last_event_id або None, якщо відновлення неможливе"""
+        token, _, sequence = (last_event_id or "").partition(":")
+        if token != self.token or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self._sequence:
+            return None
+        if self._buffer and sequence < self._buffer[0][0] - 1:
+            return None
+        return [frame for frame_sequence, frame in self._buffer if frame_sequence > sequence]
+
+    async def stream(self, last_event_id: str = None):
+        """Кадри SSE для одного клієнта: пропущені події, далі нові та heartbeat"""
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+            backlog = self._backlog(last_event_id) if last_event_id else []
+
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            if backlog is None:
+                yield _frame("reset", b"{}")
+            else:
+                for frame in backlog:
+                    yield frame
+
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield frame
+                if subscriber.overflowed and subscriber.queue.empty():
+                    subscriber.overflowed = False
+                    yield _frame("reset", b"{}")
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+def _frame(event: str, data: bytes, event_id: str = None) -> bytes:
+    """Кадр SSE; JSON з orjson не містить переносів рядків"""
+    head = f"id: {event_id}\nevent: {event}\n" if event_id else f"event: {event}\n"
+    return head.encode() + b"data: " + data + b"\n\n"
+
+bus = EventBus()
+
+def disable():
+    """Вимкнути стрічку змін: GET /events відповідає 204, і клієнт не перепідключається"""
+    global EVENTS_ENABLED
+    EVENTS_ENABLED = False
+
+def publish(event: str, data):
+    """Опублікувати подію в спільну шину процесу"""
+    bus.publish(event, data)
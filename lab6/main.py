@@ -1,51 +1,120 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional, Literal, Union
+from contextlib import asynccontextmanager
+from datetime import date
 import uvicorn
-from dotenv import load_dotenv
 import os
+import orjson
 
 import models
 import schemas
 import crud
-from database import engine, get_db
+import bulk
+import cache
+import precomputed
+import metrics
+import events
+import routing
+import search
+from database import (
+    init_db, get_db, get_read_db, ReadSessionLocal, DB_ASYNC, engine, read_engine, async_engine, replicas, pool_status
+)
 
-# Завантаження змінних середовища
-load_dotenv()
+# Створення таблиць та індексів в БД. У production схему оновлює окремий крок
+# (python manage.py migrate або serve.py), а процеси-обробники лише імпортують застосунок
+if os.getenv("DB_INIT_ON_STARTUP", "True").lower() == "true":
+    init_db()
 
-# Створення таблиць в БД
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Фонова перевірка реплік для читання працює, поки запущено застосунок"""
+    replicas.start()
+    # Наявність пошукового індексу визначається до першого запиту, щоб async-маршрути
+    # не відкривали синхронне з'єднання в циклі подій
+    await run_in_threadpool(search.is_enabled)
+    yield
+    replicas.stop()
 
 # Створення FastAPI додатку
 app = FastAPI(
     title="Technical Cards Management System",
     description="API для управління технічними картами виробництва",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Метрики продуктивності: час запитів і SQL-запити кожного рушія
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine, "writer")
+if read_engine is not engine:
+    metrics.instrument_engine(read_engine, "reader")
+if async_engine is not None:
+    metrics.instrument_engine(async_engine.sync_engine, "async")
+for replica in replicas.engines:
+    metrics.instrument_engine(replica, replicas.names[replica])
+
+# Читання з реплік (DATABASE_READ_URLS) і повернення клієнта на основну БД після його запису
+app.add_middleware(routing.ReadYourWritesMiddleware)
+
+# Асинхронні версії основних endpoints мають пріоритет над синхронними
+if DB_ASYNC:
+    import api_async
+    app.include_router(api_async.router)
+
 # Підключення статичних файлів
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Головна сторінка
+# Відповіді, що не залежать від БД, формуються один раз під час запуску
+PROCESSING_TYPE_LABELS = {
+    "TURNING": "Токарна",
+    "MILLING": "Фрезерна",
+    "DRILLING": "Свердлільна",
+    "GRINDING": "Шліфувальна",
+    "WELDING": "Зварювальна",
+    "ASSEMBLY": "Складальна",
+    "PAINTING": "Фарбування",
+    "THERMAL": "Термічна"
+}
+
+def _processing_types_body():
+    return orjson.dumps([
+        {"value": pt.value, "label": PROCESSING_TYPE_LABELS[pt.value]} for pt in models.ProcessingType
+    ])
+
+index_page = precomputed.PrecomputedResponse(
+    precomputed.read_file("static/index.html"), "text/html; charset=utf-8", path="static/index.html"
+)
+processing_types = precomputed.PrecomputedResponse(_processing_types_body, "application/json")
+
+# Головна сторінка (async: готові байти віддаються без переходу в threadpool)
 @app.get("/", response_class=HTMLResponse)
-def read_root():
+async def read_root(request: Request):
     """Повертає HTML інтерфейс"""
-    with open("static/index.html", "r", encoding="utf-8") as f:
-        return f.read()
+    return index_page.response(request)
 
 # CRUD операції для технічних карт
 
-@app.get("/technical-cards", response_model=List[schemas.TechnicalCard])
+@app.get("/technical-cards", response_model=Union[List[schemas.TechnicalCard], schemas.TechnicalCardPage])
 def read_technical_cards(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     processing_type: Optional[models.ProcessingType] = None,
     min_duration: Optional[int] = Query(None, ge=0),
     max_duration: Optional[int] = Query(None, ge=0),
     detail_name_contains: Optional[str] = None,
-    db: Session = Depends(get_db)
+    sort_by: Literal["id", "processing_duration", "created_at", "relevance"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    envelope: bool = False,
+    db: Session = Depends(get_read_db)
 ):
     """
     Отримати список технічних карт з можливістю фільтрації.
@@ -55,7 +124,14 @@ def read_technical_cards(
     - **processing_type**: фільтр за типом обробки
     - **min_duration**: мінімальна тривалість обробки
     - **max_duration**: максимальна тривалість обробки
-    - **detail_name_contains**: пошук за назвою деталі
+    - **detail_name_contains**: пошук за назвою деталі (слова за префіксом, без урахування регістру)
+    - **sort_by**: поле сортування (id, processing_duration, created_at, relevance)
+    - **order**: напрям сортування (asc, desc)
+    - **cursor**: курсорний режим пагінації; порожнє значення — перша сторінка,
+      далі — `next_cursor` з попередньої відповіді (`skip` ігнорується)
+    - **with_total**: додати заголовки `X-Total-Count` та `X-Total-Count-Exact`
+      (точна кількість або оцінка для великих нешвидких вибірок)
+    - **envelope**: відповідь-об'єкт `{items, next_cursor, total, total_exact}` замість списку
     """
     filters = schemas.TechnicalCardFilter(
         processing_type=processing_type,
@@ -63,16 +139,47 @@ def read_technical_cards(
         max_duration=max_duration,
         detail_name_contains=detail_name_contains
     )
-    cards = crud.get_technical_cards(db, skip=skip, limit=limit, filters=filters)
-    return cards
+    
+    key = cache.make_key(
+        "technical-cards", **filters.model_dump(),
+        skip=skip, limit=limit, sort_by=sort_by, order=order, cursor=cursor,
+        with_total=with_total or None, envelope=envelope or None
+    )
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+    
+    if cursor is not None:
+        try:
+            cards, next_cursor = crud.get_technical_card_records_page(
+                db, cursor=cursor, limit=limit, filters=filters, sort_by=sort_by, order=order
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        cards = crud.get_technical_card_records(
+            db, skip=skip, limit=limit, filters=filters, sort_by=sort_by, order=order
+        )
+        next_cursor = None
+    
+    total = None
+    if with_total or envelope:
+        total = crud.count_technical_cards(db, filters=filters)
+    
+    if cursor is not None or envelope:
+        body = schemas.dump_technical_card_records_page(cards, next_cursor, total)
+    else:
+        body = schemas.dump_technical_card_records(cards)
+    return cache.store(key, body, schemas.total_headers(total))
 
 @app.get("/technical-cards/filter", response_model=List[schemas.TechnicalCard])
 def filter_technical_cards(
+    request: Request,
     processing_type: Optional[models.ProcessingType] = None,
     min_duration: Optional[int] = Query(None, ge=0),
     max_duration: Optional[int] = Query(None, ge=0),
     detail_name_contains: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Фільтрація технічних карт за різними критеріями.
@@ -83,11 +190,52 @@ def filter_technical_cards(
         max_duration=max_duration,
         detail_name_contains=detail_name_contains
     )
-    cards = crud.get_technical_cards(db, filters=filters)
-    return cards
+    key = cache.make_key("technical-cards/filter", **filters.model_dump())
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+    
+    cards = crud.get_technical_card_records(db, filters=filters)
+    return cache.store(key, schemas.dump_technical_card_records(cards))
+
+@app.get("/technical-cards/export")
+def export_technical_cards(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    processing_type: Optional[models.ProcessingType] = None,
+    min_duration: Optional[int] = Query(None, ge=0),
+    max_duration: Optional[int] = Query(None, ge=0),
+    detail_name_contains: Optional[str] = None
+):
+    """
+    Потоковий експорт усіх технічних карт, що відповідають фільтрам, у NDJSON або CSV.
+    """
+    filters = schemas.TechnicalCardFilter(
+        processing_type=processing_type,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        detail_name_contains=detail_name_contains
+    )
+    
+    def content():
+        # Власна сесія живе, доки відповідь не буде надіслана повністю
+        db = ReadSessionLocal()
+        try:
+            partitions = crud.iter_technical_card_rows(db, filters=filters)
+            if format == "csv":
+                yield from bulk.export_csv(crud.EXPORT_COLUMNS, partitions)
+            else:
+                yield from bulk.export_ndjson(crud.EXPORT_COLUMNS, partitions)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        content(),
+        media_type=bulk.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="technical_cards.{format}"'}
+    )
 
 @app.get("/technical-cards/{card_id}", response_model=schemas.TechnicalCard)
-def read_technical_card(card_id: int, db: Session = Depends(get_db)):
+def read_technical_card(card_id: int, db: Session = Depends(get_read_db)):
     """Отримати технічну карту за ID"""
     db_card = crud.get_technical_card(db, card_id=card_id)
     if db_card is None:
@@ -102,6 +250,53 @@ def create_technical_card(
     """Створити нову технічну карту"""
     return crud.create_technical_card(db=db, card=card)
 
+@app.post("/technical-cards/bulk", response_model=schemas.BulkImportResult)
+async def bulk_import_technical_cards(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Масовий імпорт технічних карт з потоку NDJSON або CSV.
+    
+    Формат визначається параметром **format** або заголовком Content-Type
+    (`application/x-ndjson`, `text/csv`). CSV має містити заголовок з колонками
+    `detail_name`, `processing_type`, `processing_duration`. Рядки вставляються
+    пачками; некоректні рядки пропускаються і повертаються у звіті про помилки.
+    """
+    import_format = format or bulk.detect_format(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(status_code=415, detail="Очікується NDJSON або CSV")
+    
+    if import_format == "csv":
+        records = bulk.iter_csv_records(request.stream())
+    else:
+        records = bulk.iter_ndjson_records(request.stream())
+    
+    result = schemas.BulkImportResult(inserted=0, failed=0, errors=[])
+    
+    def report(errors):
+        result.failed += len(errors)
+        room = bulk.MAX_REPORTED_ERRORS - len(result.errors)
+        result.errors.extend(errors[:max(room, 0)])
+        result.errors_truncated = result.errors_truncated or len(errors) > room
+    
+    try:
+        async for lines, cards, errors in bulk.iter_chunks(records):
+            report(errors)
+            try:
+                result.inserted += await run_in_threadpool(crud.create_technical_cards_bulk, db, cards)
+            except SQLAlchemyError as e:
+                # Пачка відкочується цілком, решта імпорту продовжується
+                await run_in_threadpool(db.rollback)
+                message = f"Помилка збереження пачки: {e.__class__.__name__}"
+                report([schemas.BulkImportError(line=line, errors=[message]) for line in lines])
+    except bulk.LineTooLong as e:
+        # Попередні пачки вже збережено: клієнт дізнається, скільки карт імпортовано
+        raise HTTPException(status_code=413, detail=f"{e}; імпортовано карт: {result.inserted}")
+    
+    return result
+
 @app.put("/technical-cards/{card_id}", response_model=schemas.TechnicalCard)
 def update_technical_card(
     card_id: int,
@@ -122,39 +317,138 @@ def delete_technical_card(card_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Технічна карта не знайдена")
     return {"message": "Технічна карта успішно видалена"}
 
+# Пакетні операції
+
+@app.patch("/technical-cards", response_model=schemas.BatchResult)
+def update_technical_cards(batch: schemas.TechnicalCardBatchUpdate, db: Session = Depends(get_db)):
+    """
+    Пакетне оновлення технічних карт одним запитом до БД.
+    
+    Карти вибираються списком `ids` або фільтром `filter` (як у `/technical-cards`),
+    `changes` містить нові значення полів. Повертає кількість змінених карт.
+    """
+    return {"affected": crud.update_technical_cards(db, selection=batch, changes=batch.changes)}
+
+@app.delete("/technical-cards", response_model=schemas.BatchResult)
+def delete_technical_cards(selection: schemas.TechnicalCardSelection, db: Session = Depends(get_db)):
+    """
+    Пакетне видалення технічних карт за списком `ids` або фільтром `filter`.
+    Повертає кількість видалених карт.
+    """
+    return {"affected": crud.delete_technical_cards(db, selection=selection)}
+
 # Статистика
 
 @app.get("/stats", response_model=schemas.GeneralStats)
-def get_statistics(db: Session = Depends(get_db)):
+def get_statistics(request: Request, db: Session = Depends(get_read_db)):
     """Отримати загальну статистику по технічних картах"""
-    return crud.get_general_stats(db)
+    key = cache.make_key("stats")
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+    
+    stats = schemas.GeneralStats.model_validate(crud.get_general_stats(db))
+    return cache.store(key, stats.model_dump_json().encode())
 
 @app.get("/stats/processing-types", response_model=List[schemas.ProcessingStats])
-def get_processing_statistics(db: Session = Depends(get_db)):
+def get_processing_statistics(request: Request, db: Session = Depends(get_read_db)):
     """Отримати статистику по видах обробки"""
-    return crud.get_processing_stats(db)
+    key = cache.make_key("stats/processing-types")
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+    
+    stats = crud.get_processing_stats(db)
+    return cache.store(key, schemas.dump_processing_stats(stats))
+
+@app.get("/stats/histogram", response_model=List[schemas.DurationHistogram])
+def get_duration_histogram(
+    request: Request,
+    processing_type: Optional[models.ProcessingType] = None,
+    bucket_width: int = Query(30, ge=5, le=1440, description="Ширина інтервалу в хвилинах (кратна 5)"),
+    db: Session = Depends(get_read_db)
+):
+    """Гістограма тривалостей обробки по видах обробки (з rollup-таблиці)"""
+    key = cache.make_key("stats/histogram", processing_type=processing_type, bucket_width=bucket_width)
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+    
+    try:
+        histograms = crud.get_duration_histograms(db, processing_type=processing_type, bucket_width=bucket_width)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cache.store(key, schemas.dump_duration_histograms(histograms))
+
+@app.get("/stats/timeseries", response_model=schemas.CreationTimeseries)
+def get_creation_timeseries(
+    request: Request,
+    interval: Literal["day", "week"] = "day",
+    processing_type: Optional[models.ProcessingType] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Кількість створених карт по днях або тижнях (UTC, тиждень з понеділка).
+    Без `date_from`/`date_to` повертається весь період, за який є дані.
+    """
+    key = cache.make_key(
+        "stats/timeseries", interval=interval, processing_type=processing_type,
+        date_from=date_from, date_to=date_to
+    )
+    response = cache.lookup(request, key)
+    if response is not None:
+        return response
+    
+    try:
+        timeseries = crud.get_creation_timeseries(
+            db, interval=interval, processing_type=processing_type, date_from=date_from, date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cache.store(key, schemas.CreationTimeseries.model_validate(timeseries).model_dump_json().encode())
 
 # Допоміжні endpoints
 
 @app.get("/processing-types")
-def get_processing_types():
+async def get_processing_types(request: Request):
     """Отримати список доступних типів обробки"""
-    type_labels = {
-        "TURNING": "Токарна",
-        "MILLING": "Фрезерна",
-        "DRILLING": "Свердлільна", 
-        "GRINDING": "Шліфувальна",
-        "WELDING": "Зварювальна",
-        "ASSEMBLY": "Складальна",
-        "PAINTING": "Фарбування",
-        "THERMAL": "Термічна"
-    }
-    return [{"value": pt.value, "label": type_labels[pt.value]} for pt in models.ProcessingType]
+    return processing_types.response(request)
+
+@app.get("/events")
+async def stream_events(request: Request):
+    """
+    Стрічка змін (Server-Sent Events): створення, оновлення, видалення карт та
+    оновлена статистика. Після перепідключення пропущені події надсилаються
+    за заголовком `Last-Event-ID`. Якщо стрічку вимкнено, відповідь 204.
+    """
+    if not events.EVENTS_ENABLED:
+        # 204 зупиняє перепідключення EventSource; клієнт оновлює дані запитами
+        return Response(status_code=204)
+    return StreamingResponse(
+        events.bus.stream(request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Метрики продуктивності у форматі Prometheus"""
+    return metrics.metrics_response()
 
 @app.get("/health")
 def health_check():
     """Перевірка працездатності API"""
-    return {"status": "healthy", "service": "Technical Cards API"}
+    return {
+        "status": "healthy",
+        "service": "Technical Cards API",
+        "database": {
+            "writer": pool_status(engine),
+            "reader": pool_status(read_engine),
+            "replicas": replicas.status()
+        }
+    }
 
 if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
@@ -0,0 +1,126 @@
+import argparse
+import sys
+import time
+
+import models
+import rollups
+import search
+import stats
+from database import engine, init_db, SessionLocal
+
+def migrate(args):
+    """Створення таблиць, індексів і похідних таблиць, яких ще немає в базі даних"""
+    started = time.perf_counter()
+    init_db()
+    print(f"✅ Схему бази даних оновлено за {(time.perf_counter() - started) * 1000:.0f} мс")
+    return 0
+
+def check_stats(args):
+    """Перевірка узгодженості зведеної статистики з таблицею карт"""
+    db = SessionLocal()
+    try:
+        mismatches = stats.check(db)
+        if not mismatches:
+            print("✅ Зведена статистика узгоджена з технічними картами")
+            return 0
+
+        for mismatch in mismatches:
+            print(
+                f"❌ {mismatch['processing_type'].value}: "
+                f"очікувалось {mismatch['expected']}, у зведенні {mismatch['actual']}"
+            )
+
+        if args.fix:
+            stats.rebuild(db)
+            db.commit()
+            print("🔧 Зведену статистику перебудовано")
+            return 0
+        return 1
+    finally:
+        db.close()
+
+def rebuild_stats(args):
+    """Перебудова зведеної статистики з таблиці карт"""
+    db = SessionLocal()
+    try:
+        stats.rebuild(db)
+        db.commit()
+        print("🔧 Зведену статистику перебудовано")
+        return 0
+    finally:
+        db.close()
+
+def check_rollups(args):
+    """Перевірка узгодженості rollup-таблиць графіків з таблицею карт"""
+    db = SessionLocal()
+    try:
+        mismatches = rollups.check(db)
+        if not mismatches:
+            print("✅ Rollup-таблиці узгоджені з технічними картами")
+            return 0
+
+        for mismatch in mismatches:
+            key = ", ".join(str(getattr(part, "value", part)) for part in mismatch["key"])
+            print(f"❌ {mismatch['table']} ({key}): очікувалось {mismatch['expected']}, у rollup {mismatch['actual']}")
+
+        if args.fix:
+            rollups.rebuild(db)
+            db.commit()
+            print("🔧 Rollup-таблиці перебудовано")
+            return 0
+        return 1
+    finally:
+        db.close()
+
+def rebuild_rollups(args):
+    """Перебудова rollup-таблиць гістограми та щоденної динаміки"""
+    db = SessionLocal()
+    try:
+        rollups.rebuild(db)
+        db.commit()
+        print("🔧 Rollup-таблиці перебудовано")
+        return 0
+    finally:
+        db.close()
+
+def rebuild_search(args):
+    """Перебудова пошукового індексу за назвою деталі"""
+    with engine.begin() as connection:
+        search.rebuild(connection)
+    print("🔍 Пошуковий індекс перебудовано")
+    return 0
+
+def main(argv=None):
+    """Адміністративні команди сервісу технічних карт"""
+    parser = argparse.ArgumentParser(description="Адміністрування бази технічних карт")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="створити таблиці та індекси, яких ще немає")
+    migrate_parser.set_defaults(handler=migrate)
+
+    check_parser = commands.add_parser("check-stats", help="перевірити зведену статистику")
+    check_parser.add_argument("--fix", action="store_true", help="перебудувати зведення при розбіжностях")
+    check_parser.set_defaults(handler=check_stats)
+
+    rebuild_parser = commands.add_parser("rebuild-stats", help="перебудувати зведену статистику")
+    rebuild_parser.set_defaults(handler=rebuild_stats)
+
+    check_rollups_parser = commands.add_parser("check-rollups", help="перевірити rollup-таблиці графіків")
+    check_rollups_parser.add_argument("--fix", action="store_true", help="перебудувати rollup при розбіжностях")
+    check_rollups_parser.set_defaults(handler=check_rollups)
+
+    rollups_parser = commands.add_parser("rebuild-rollups", help="перебудувати rollup-таблиці графіків")
+    rollups_parser.set_defaults(handler=rebuild_rollups)
+
+    search_parser = commands.add_parser("rebuild-search", help="перебудувати пошуковий індекс")
+    search_parser.set_defaults(handler=rebuild_search)
+
+    args = parser.parse_args(argv)
+
+    # Таблиці зведення та rollup створюються (і заповнюються) для старих баз даних
+    if args.handler is not migrate:
+        init_db()
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from fastapi import Response
+from sqlalchemy import event
+
+# Метрики продуктивності: гістограми затримок по маршрутах, кількість SQL-запитів
+# і час БД на запит, журнал повільних запитів. Middleware створює для кожного
+# HTTP-запиту об'єкт RequestStats у ContextVar; слухачі подій рушія доповнюють його
+# (контекст копіюється в threadpool та greenlet AsyncSession, а об'єкт спільний).
+# Дані віддаються у форматі Prometheus через /metrics та в заголовку Server-Timing.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger("lab6.slow_query")
+
+class RequestStats:
+    """SQL-статистика одного HTTP-запиту"""
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+_current = ContextVar("request_stats", default=None)
+
+class Histogram:
+    """Кумулятивна гістограма у стилі Prometheus"""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6f}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+_lock = threading.Lock()
+_request_latency = {}    # (method, route) -> Histogram секунд
+_request_queries = {}    # (method, route) -> Histogram кількості SQL-запитів
+_request_db_time = {}    # (method, route) -> сумарний час БД, с
+_responses = {}          # (method, route, status) -> кількість
+_query_latency = {}      # engine -> Histogram секунд
+_slow_queries = {}       # engine -> кількість
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def _route_label(scope) -> str:
+    """Шаблон маршруту замість фактичного шляху, щоб мітки не розросталися"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None:
+        # Змонтований застосунок (наприклад, /static)
+        return scope.get("root_path", "") + "/{path}"
+    return "<unmatched>"
+
+def _record_request(method, route, status, duration, stats):
+    key = (method, route)
+    with _lock:
+        histogram = _request_latency.get(key)
+        if histogram is None:
+            histogram = _request_latency[key] = Histogram(LATENCY_BUCKETS)
+            _request_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+            _request_db_time[key] = 0.0
+        histogram.observe(duration)
+        _request_queries[key].observe(stats.queries)
+        _request_db_time[key] += stats.db_time
+        status_key = (method, route, status)
+        _responses[status_key] = _responses.get(status_key, 0) + 1
+
+class MetricsMiddleware:
+    """Чистий ASGI middleware: час запиту, SQL-статистика та заголовок Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'app;dur={app_ms:.2f}, '
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"'
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            _record_request(scope["method"], _route_label(scope), status, time.perf_counter() - started, stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(engine_name, conn, statement, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+    slow = elapsed * 1000 >= SLOW_QUERY_MS
+    with _lock:
+        histogram = _query_latency.get(engine_name)
+        if histogram is None:
+            histogram = _query_latency[engine_name] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(elapsed)
+        if slow:
+            _slow_queries[engine_name] = _slow_queries.get(engine_name, 0) + 1
+
+    if slow:
+        logger.warning(
+            "Slow query %.1f ms [%s]%s: %s",
+            elapsed * 1000,
+            engine_name,
+            " (executemany)" if executemany else "",
+            " ".join(statement.split())[:1000]
+        )
+
+def _handle_error(context):
+    # Запит з помилкою не доходить до after_cursor_execute
+    start_times = context.connection.info.get("query_start_time") if context.connection is not None else None
+    if start_times:
+        start_times.pop()
+
+def instrument_engine(target_engine, name: str):
+    """Підключити підрахунок SQL-запитів до рушія (sync_engine для асинхронного)"""
+    if not METRICS_ENABLED:
+        return
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _after_cursor_execute(name, conn, statement, executemany)
+
+    event.listen(target_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(target_engine, "handle_error", _handle_error)
+
+def reset():
+    """Очистити накопичені метрики (наприклад, після прогріву застосунку)"""
+    with _lock:
+        for values in (_request_latency, _request_queries, _request_db_time, _responses, _query_latency, _slow_queries):
+            values.clear()
+
+def render() -> str:
+    """Метрики у текстовому форматі Prometheus"""
+    lines = []
+    with _lock:
+        lines.append("# HELP http_request_duration_seconds HTTP request latency by route")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), histogram in sorted(_request_latency.items()):
+            lines.extend(histogram.lines("http_request_duration_seconds", f'method="{method}",route="{_label(route)}"'))
+
+        lines.append("# HELP http_requests_total HTTP responses by route and status")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route, status), count in sorted(_responses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+
+        lines.append("# HELP http_request_db_queries SQL statements executed per HTTP request")
+        lines.append("# TYPE http_request_db_queries histogram")
+        for (method, route), histogram in sorted(_request_queries.items()):
+            lines.extend(histogram.lines("http_request_db_queries", f'method="{method}",route="{_label(route)}"'))
+
+        lines.append("# HELP http_request_db_seconds_total Time spent in SQL statements by route")
+        lines.append("# TYPE http_request_db_seconds_total counter")
+        for (method, route), seconds in sorted(_request_db_time.items()):
+            lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_label(route)}"}} {seconds:.6f}')
+
+        lines.append("# HELP db_query_duration_seconds SQL statement latency by engine")
+        lines.append("# TYPE db_query_duration_seconds histogram")
+        for name, histogram in sorted(_query_latency.items()):
+            lines.extend(histogram.lines("db_query_duration_seconds", f'engine="{name}"'))
+
+        lines.append(f"# HELP db_slow_queries_total SQL statements slower than {SLOW_QUERY_MS:g} ms")
+        lines.append("# TYPE db_slow_queries_total counter")
+        for name, count in sorted(_slow_queries.items()):
+            lines.append(f'db_slow_queries_total{{engine="{name}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+def metrics_response() -> Response:
+    """Відповідь /metrics"""
+    return Response(content=render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,8 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Date, DateTime, Enum, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from database import Base
 import enum
 
+# SQLite записує CURRENT_TIMESTAMP без мікросекунд; параметри порівняння
+# (наприклад, курсор пагінації) мають бути в тому самому текстовому форматі
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
+
 class ProcessingType(str, enum.Enum):
     """Типи обробки деталей"""
     TURNING = "TURNING"
@@ -22,8 +30,52 @@ class TechnicalCard(Base):
     detail_name = Column(String, nullable=False, index=True)
     processing_type = Column(Enum(ProcessingType), nullable=False, index=True)
     processing_duration = Column(Integer, nullable=False)  # в хвилинах
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
+
+    __table_args__ = (
+        # min/max тривалості в межах виду обробки читаються з індексу
+        Index("ix_technical_cards_type_duration", "processing_type", "processing_duration"),
+        # Курсорна пагінація за (ключ сортування, id)
+        Index("ix_technical_cards_duration_id", "processing_duration", "id"),
+        Index("ix_technical_cards_created_at_id", "created_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<TechnicalCard(id={self.id}, detail_name='{self.detail_name}', processing_type='{self.processing_type}', duration={self.processing_duration}min)>"
+
+class ProcessingTypeStats(Base):
+    """Зведена статистика по виду обробки, що оновлюється при кожному записі"""
+    __tablename__ = "processing_type_stats"
+
+    processing_type = Column(Enum(ProcessingType), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Integer, nullable=False, default=0)  # в хвилинах
+    min_duration = Column(Integer, nullable=True)
+    max_duration = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<ProcessingTypeStats(processing_type='{self.processing_type}', count={self.count}, total={self.total_duration}min)>"
+
+class DurationHistogramBucket(Base):
+    """Кількість карт виду обробки в інтервалі тривалості (rollup для /stats/histogram)"""
+    __tablename__ = "duration_histogram"
+
+    processing_type = Column(Enum(ProcessingType), primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # processing_duration // HISTOGRAM_BUCKET_MINUTES
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DurationHistogramBucket(processing_type='{self.processing_type}', bucket={self.bucket}, count={self.count})>"
+
+
+class DailyCardCount(Base):
+    """Кількість створених карт за день (UTC) і вид обробки (rollup для /stats/timeseries)"""
+    __tablename__ = "card_creation_daily"
+
+    day = Column(Date, primary_key=True)
+    processing_type = Column(Enum(ProcessingType), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
     def __repr__(self):
-        return f"<TechnicalCard(id={self.id}, detail_name='{self.detail_name}', processing_type='{self.processing_type}', duration={self.processing_duration}min)>"
\ No newline at end of file
+        return f"<DailyCardCount(day='{self.day}', processing_type='{self.processing_type}', count={self.count})>"
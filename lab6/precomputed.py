@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # стиснення brotli необов'язкове
+    brotli = None
+
+# Відповіді, що не залежать від БД (головна сторінка, список видів обробки), формуються
+# один раз як байти разом зі стиснутими варіантами та ETag. Обробник лише вибирає
+# варіант за Accept-Encoding. З STATIC_RELOAD=true файл-джерело перечитується,
+# коли змінюється його mtime (зручно під час розробки).
+
+STATIC_RELOAD = os.getenv("STATIC_RELOAD", "False").lower() == "true"
+MIN_COMPRESS_SIZE = 512
+
+def _accepted_encodings(header: str):
+    """Кодування з Accept-Encoding, крім явно вимкнених (q=0)"""
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+class PrecomputedResponse:
+    """Готові байти відповіді з варіантами gzip/brotli та ETag"""
+
+    def __init__(self, build, media_type: str, path: str = None):
+        self.build = build
+        self.media_type = media_type
+        self.path = path
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Сформувати тіло та стиснуті варіанти"""
+        if self.path:
+            self._mtime = os.stat(self.path).st_mtime_ns
+        body = self.build()
+        variants = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variants["br"] = brotli.compress(body, quality=11)
+        # Слабкий ETag спільний для всіх варіантів кодування одного тіла
+        self.etag = f'W/"{hashlib.sha1(body).hexdigest()[:24]}"'
+        self.variants = variants
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self.load()
+
+    def response(self, request: Request) -> Response:
+        """304, якщо ETag збігається, інакше найкращий прийнятний варіант"""
+        if STATIC_RELOAD and self.path:
+            self._reload_if_changed()
+
+        variants, etag = self.variants, self.etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding in ("br", "gzip"):
+            if encoding in variants and encoding in accepted:
+                headers["Content-Encoding"] = encoding
+                return Response(content=variants[encoding], media_type=self.media_type, headers=headers)
+        return Response(content=variants["identity"], media_type=self.media_type, headers=headers)
+
+def read_file(path: str):
+    """Функція побудови відповіді з вмісту файлу"""
+    def build():
+        with open(path, "rb") as f:
+            return f.read()
+    return build
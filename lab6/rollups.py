@@ -0,0 +1,196 @@
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import select, insert, update, delete, func, cast, and_, Date, event
+from sqlalchemy.dialects import postgresql, sqlite
+import models
+
+# Rollup-таблиці для графіків: гістограма тривалостей (duration_histogram) і
+# кількість створених карт за день (card_creation_daily). Як і зведена статистика,
+# вони оновлюються функціями crud у транзакції запису, тому /stats/histogram та
+# /stats/timeseries читають сотні рядків незалежно від кількості карт.
+# Інтервали гістограми мають ширину HISTOGRAM_BUCKET_MINUTES; ширші інтервали
+# та тижні складаються з них під час запиту.
+
+HISTOGRAM_BUCKET_MINUTES = 5
+
+histogram = models.DurationHistogramBucket.__table__
+daily = models.DailyCardCount.__table__
+cards = models.TechnicalCard.__table__
+
+def bucket_of(duration: int) -> int:
+    """Номер базового інтервалу гістограми для тривалості"""
+    return duration // HISTOGRAM_BUCKET_MINUTES
+
+def day_of(created_at: datetime) -> date:
+    """День створення карти в UTC (SQLite повертає час без поясу, вже в UTC)"""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+def _dialect_name(bind) -> str:
+    """Назва діалекту для Session або Connection"""
+    return (bind.dialect if hasattr(bind, "dialect") else bind.get_bind().dialect).name
+
+def _day_expression(bind):
+    """SQL-вираз дня створення карти в UTC"""
+    if _dialect_name(bind) == "postgresql":
+        return cast(func.timezone("UTC", cards.c.created_at), Date)
+    return func.date(cards.c.created_at)
+
+def card_counts(rows, sign: int = 1):
+    """Лічильники rollup для карт (вид, тривалість, created_at): (histogram, daily)"""
+    histogram_counts, daily_counts = Counter(), Counter()
+    for processing_type, duration, created_at in rows:
+        histogram_counts[(processing_type, bucket_of(duration))] += sign
+        daily_counts[(day_of(created_at), processing_type)] += sign
+    return histogram_counts, daily_counts
+
+def selection_counts(bind, conditions):
+    """Внесок вибраних карт у rollup-таблиці, обчислений запитами GROUP BY"""
+    bucket = cards.c.processing_duration // HISTOGRAM_BUCKET_MINUTES
+    histogram_counts = Counter({
+        (processing_type, bucket_number): count
+        for processing_type, bucket_number, count in bind.execute(
+            select(cards.c.processing_type, bucket, func.count())
+            .where(*conditions)
+            .group_by(cards.c.processing_type, bucket)
+        )
+    })
+
+    day = _day_expression(bind)
+    daily_counts = Counter({
+        (_as_date(day_value), processing_type): count
+        for day_value, processing_type, count in bind.execute(
+            select(day, cards.c.processing_type, func.count())
+            .where(*conditions)
+            .group_by(day, cards.c.processing_type)
+        )
+    })
+    return histogram_counts, daily_counts
+
+def moved_counts(counts, processing_type=None, processing_duration=None):
+    """Лічильники тих самих карт після зміни виду та/або тривалості"""
+    histogram_counts, daily_counts = counts
+    new_histogram, new_daily = Counter(), Counter()
+    for (old_type, bucket), count in histogram_counts.items():
+        if processing_duration is not None:
+            bucket = bucket_of(processing_duration)
+        new_histogram[(processing_type or old_type, bucket)] += count
+    for (day, old_type), count in daily_counts.items():
+        new_daily[(day, processing_type or old_type)] += count
+    return new_histogram, new_daily
+
+def record(bind, added=None, removed=None):
+    """Застосувати різницю лічильників (histogram, daily) до rollup-таблиць"""
+    histogram_delta, daily_delta = Counter(), Counter()
+    if added:
+        histogram_delta.update(added[0])
+        daily_delta.update(added[1])
+    if removed:
+        histogram_delta.subtract(removed[0])
+        daily_delta.subtract(removed[1])
+
+    _apply(bind, histogram, ("processing_type", "bucket"), histogram_delta)
+    _apply(bind, daily, ("day", "processing_type"), daily_delta)
+
+def _apply(bind, table, key_columns, deltas):
+    """Додати дельти до лічильників; порожні рядки видаляються"""
+    rows = [dict(zip(key_columns, key), count=delta) for key, delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    dialect = _dialect_name(bind)
+    if dialect in ("sqlite", "postgresql"):
+        # Один executemany: INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count
+        upsert = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+        bind.execute(
+            upsert.on_conflict_do_update(
+                index_elements=list(key_columns),
+                set_={"count": table.c.count + upsert.excluded.count}
+            ),
+            rows
+        )
+    else:
+        for row in rows:
+            key = and_(*[table.c[column] == row[column] for column in key_columns])
+            result = bind.execute(update(table).where(key).values(count=table.c.count + row["count"]))
+            if result.rowcount == 0:
+                bind.execute(insert(table).values(**row))
+
+    if any(row["count"] < 0 for row in rows):
+        bind.execute(delete(table).where(table.c.count <= 0))
+
+def _as_date(value) -> date:
+    """SQLite повертає date() рядком 'YYYY-MM-DD'"""
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+def read_histogram(bind, processing_type=None):
+    """Рядки гістограми (вид, інтервал, кількість)"""
+    query = select(histogram.c.processing_type, histogram.c.bucket, histogram.c.count).where(histogram.c.count > 0)
+    if processing_type is not None:
+        query = query.where(histogram.c.processing_type == processing_type)
+    return bind.execute(query.order_by(histogram.c.processing_type, histogram.c.bucket)).all()
+
+def read_daily(bind, processing_type=None, date_from=None, date_to=None):
+    """Кількість створених карт по днях (день, кількість), сумарно по видах"""
+    query = select(daily.c.day, func.sum(daily.c.count)).where(daily.c.count > 0)
+    if processing_type is not None:
+        query = query.where(daily.c.processing_type == processing_type)
+    if date_from is not None:
+        query = query.where(daily.c.day >= date_from)
+    if date_to is not None:
+        query = query.where(daily.c.day <= date_to)
+    return bind.execute(query.group_by(daily.c.day).order_by(daily.c.day)).all()
+
+def week_start(day: date) -> date:
+    """Понеділок тижня, до якого належить день"""
+    return day - timedelta(days=day.weekday())
+
+def compute_from_cards(bind):
+    """Лічильники rollup, обчислені безпосередньо з таблиці карт"""
+    return selection_counts(bind, [])
+
+def rebuild(bind):
+    """Перебудувати rollup-таблиці з таблиці карт (агрегація виконується в БД)"""
+    bind.execute(delete(histogram))
+    bind.execute(delete(daily))
+
+    bucket = cards.c.processing_duration // HISTOGRAM_BUCKET_MINUTES
+    bind.execute(insert(histogram).from_select(
+        ["processing_type", "bucket", "count"],
+        select(cards.c.processing_type, bucket, func.count()).group_by(cards.c.processing_type, bucket)
+    ))
+
+    day = _day_expression(bind)
+    bind.execute(insert(daily).from_select(
+        ["day", "processing_type", "count"],
+        select(day, cards.c.processing_type, func.count()).group_by(day, cards.c.processing_type)
+    ))
+
+def check(bind):
+    """Порівняти rollup-таблиці з фактичними даними, повертає список розбіжностей"""
+    expected_histogram, expected_daily = compute_from_cards(bind)
+    actual_histogram = Counter({
+        (processing_type, bucket): count for processing_type, bucket, count in read_histogram(bind)
+    })
+    actual_daily = Counter({
+        (row.day, row.processing_type): row.count
+        for row in bind.execute(select(daily.c.day, daily.c.processing_type, daily.c.count).where(daily.c.count > 0))
+    })
+
+    mismatches = []
+    for table, expected, actual in (
+        (histogram.name, expected_histogram, actual_histogram),
+        (daily.name, expected_daily, actual_daily)
+    ):
+        for key in sorted(set(expected) | set(actual), key=str):
+            if expected[key] != actual[key]:
+                mismatches.append({"table": table, "key": key, "expected": expected[key], "actual": actual[key]})
+    return mismatches
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _populate_rollups(target, connection, tables=(), **kw):
+    """Заповнити щойно створені rollup-таблиці для вже наявних карт"""
+    if histogram in tables or daily in tables:
+        rebuild(connection)
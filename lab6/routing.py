@@ -0,0 +1,63 @@
+import time
+from http.cookies import SimpleCookie
+
+import cache
+from database import replicas, read_from_primary, REPLICA_STICKY_SECONDS
+
+# Читання власних записів при роботі з репліками (DATABASE_READ_URLS).
+# Після успішного запиту на запис клієнт отримує cookie з часом, до якого його
+# читання йдуть на основну БД: репліка може ще не отримати щойно записані зміни.
+# Ці ж запити не використовують кеш відповідей, а відповіді, сформовані з реплік
+# одразу після запису в цьому процесі, не кешуються, щоб застарілі дані не
+# потрапили в нове покоління кешу.
+
+STICKY_COOKIE = "db_primary_until"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_last_write = 0.0
+
+def _sticky_until(scope) -> float:
+    """Час (unix), до якого клієнт читає з основної БД, з cookie запиту"""
+    for name, value in scope.get("headers", ()):
+        if name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(STICKY_COOKIE)
+            if morsel is not None:
+                try:
+                    return float(morsel.value)
+                except ValueError:
+                    return 0.0
+    return 0.0
+
+class ReadYourWritesMiddleware:
+    """Чистий ASGI middleware: прив'язка читань клієнта до основної БД після його запису"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replicas:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in READ_METHODS:
+            sticky = _sticky_until(scope) > time.time()
+            recent_write = time.monotonic() - _last_write < REPLICA_STICKY_SECONDS
+            primary_token = read_from_primary.set(sticky)
+            cache_token = cache.bypass.set(sticky or recent_write)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                read_from_primary.reset(primary_token)
+                cache.bypass.reset(cache_token)
+            return
+
+        async def send_with_cookie(message):
+            global _last_write
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                _last_write = time.monotonic()
+                until = int(time.time() + REPLICA_STICKY_SECONDS) + 1
+                cookie = f"{STICKY_COOKIE}={until}; Max-Age={int(REPLICA_STICKY_SECONDS) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field, ConfigDict
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, model_validator
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Literal, Optional
+import orjson
 from models import ProcessingType
 
 class TechnicalCardBase(BaseModel):
@@ -34,6 +36,53 @@ class TechnicalCardFilter(BaseModel):
     max_duration: Optional[int] = Field(None, ge=0)
     detail_name_contains: Optional[str] = None
 
+class TechnicalCardSelection(BaseModel):
+    """Вибір карт для пакетної операції: список id або фільтр"""
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=10000, description="ID технічних карт")
+    filter: Optional[TechnicalCardFilter] = Field(None, description="Фільтр технічних карт")
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Вкажіть або ids, або filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            # Порожній фільтр вибрав би всі карти
+            raise ValueError("Фільтр має містити хоча б одну умову")
+        return self
+
+class TechnicalCardBatchUpdate(TechnicalCardSelection):
+    """Пакетне оновлення: вибір карт і зміни для них"""
+    changes: TechnicalCardUpdate
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.changes.model_dump(exclude_none=True):
+            raise ValueError("Не вказано жодної зміни")
+        return self
+
+class BatchResult(BaseModel):
+    """Результат пакетної операції"""
+    affected: int = Field(..., description="Кількість змінених або видалених карт")
+
+class TechnicalCardPage(BaseModel):
+    """Сторінка технічних карт (курсорний режим або envelope)"""
+    items: list[TechnicalCard]
+    next_cursor: Optional[str] = Field(None, description="Курсор наступної сторінки; null, якщо це остання")
+    total: Optional[int] = Field(None, description="Загальна кількість карт за фільтром (with_total або envelope)")
+    total_exact: Optional[bool] = Field(None, description="false, якщо total — оцінка")
+
+class BulkImportError(BaseModel):
+    """Помилка валідації або вставки одного рядка масового імпорту"""
+    line: int = Field(..., description="Номер рядка у файлі")
+    errors: list[str]
+
+class BulkImportResult(BaseModel):
+    """Результат масового імпорту технічних карт"""
+    inserted: int
+    failed: int
+    errors: list[BulkImportError]
+    errors_truncated: bool = Field(False, description="Показано не всі помилки")
+
 class ProcessingStats(BaseModel):
     """Схема для статистики по видах обробки"""
     processing_type: ProcessingType
@@ -46,4 +95,81 @@ class GeneralStats(BaseModel):
     total_cards: int
     total_processing_time: int
     average_processing_time: float
-    processing_stats: list[ProcessingStats]
\ No newline at end of file
+    processing_stats: list[ProcessingStats]
+
+class HistogramBucket(BaseModel):
+    """Інтервал гістограми тривалостей [start, end) у хвилинах"""
+    start: int
+    end: int
+    count: int
+
+class DurationHistogram(BaseModel):
+    """Гістограма тривалостей обробки для одного виду обробки"""
+    processing_type: ProcessingType
+    total: int
+    buckets: list[HistogramBucket]
+
+class TimeseriesPoint(BaseModel):
+    """Кількість створених карт за період (день або тиждень з понеділка)"""
+    period_start: date
+    count: int
+
+class CreationTimeseries(BaseModel):
+    """Динаміка створення технічних карт"""
+    interval: Literal["day", "week"]
+    processing_type: Optional[ProcessingType] = None
+    total: int
+    points: list[TimeseriesPoint]
+
+# Серіалізація списків у JSON-байти для кешованих відповідей
+_technical_card_list = TypeAdapter(list[TechnicalCard])
+_processing_stats_list = TypeAdapter(list[ProcessingStats])
+
+def dump_technical_cards(cards) -> bytes:
+    """JSON-байти списку карт (ORM-об'єкти або моделі)"""
+    return _technical_card_list.dump_json(_technical_card_list.validate_python(cards))
+
+def dump_processing_stats(stats) -> bytes:
+    """JSON-байти статистики по видах обробки"""
+    return _processing_stats_list.dump_json(_processing_stats_list.validate_python(stats))
+
+_duration_histogram_list = TypeAdapter(list[DurationHistogram])
+
+def dump_duration_histograms(histograms) -> bytes:
+    """JSON-байти гістограм тривалостей"""
+    return _duration_histogram_list.dump_json(_duration_histogram_list.validate_python(histograms))
+
+# Легкі записи для читання списків без ORM та Pydantic (crud.get_technical_card_records).
+# Поля й порядок ключів збігаються з TechnicalCard, тому JSON однаковий.
+TECHNICAL_CARD_FIELDS = tuple(TechnicalCard.model_fields)
+
+@dataclass(slots=True)
+class TechnicalCardRecord:
+    """Технічна карта, прочитана з рядка Core select"""
+    detail_name: str
+    processing_type: ProcessingType
+    processing_duration: int
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+# OPT_UTC_Z: UTC як "Z", так само як у Pydantic
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+def dump_technical_card_records(records) -> bytes:
+    """JSON-байти списку записів TechnicalCardRecord"""
+    return orjson.dumps(records, option=_ORJSON_OPTIONS)
+
+def dump_technical_card_records_page(records, next_cursor: Optional[str], total=None) -> bytes:
+    """JSON-байти сторінки (формат TechnicalCardPage); total — пара (кількість, точність)"""
+    page = {"items": records, "next_cursor": next_cursor}
+    if total is not None:
+        page["total"], page["total_exact"] = total
+    return orjson.dumps(page, option=_ORJSON_OPTIONS)
+
+def total_headers(total) -> dict:
+    """Заголовки X-Total-Count для пари (кількість, точність) або порожні"""
+    if total is None:
+        return {}
+    count, exact = total
+    return {"X-Total-Count": str(count), "X-Total-Count-Exact": "true" if exact else "false"}
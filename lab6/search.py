@@ -0,0 +1,151 @@
+import logging
+import re
+
+from sqlalchemy import Table, Column, Integer, String, MetaData, select, func, text, event
+from sqlalchemy.exc import OperationalError
+import models
+from database import engine, read_engine
+
+# Повнотекстовий пошук за назвою деталі.
+# SQLite: віртуальна таблиця FTS5 (external content), синхронізується тригерами.
+# PostgreSQL: GIN-індекси tsvector ('simple') та pg_trgm.
+# Пошук нечутливий до регістру (включно з кирилицею) і шукає слова за префіксом:
+# "вал прив" знаходить "Вал приводний".
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "technical_cards_fts"
+
+# Окрема MetaData, щоб create_all не намагався створити віртуальну таблицю як звичайну
+fts = Table(FTS_TABLE, MetaData(), Column("rowid", Integer), Column("detail_name", String))
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        detail_name,
+        content='technical_cards',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 0'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON technical_cards BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, detail_name) VALUES (new.id, new.detail_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON technical_cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, detail_name) VALUES ('delete', old.id, old.detail_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF detail_name ON technical_cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, detail_name) VALUES ('delete', old.id, old.detail_name);
+        INSERT INTO {FTS_TABLE}(rowid, detail_name) VALUES (new.id, new.detail_name);
+    END""",
+]
+
+POSTGRESQL_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS ix_technical_cards_detail_name_tsv
+        ON technical_cards USING gin (to_tsvector('simple', detail_name))""",
+    """CREATE INDEX IF NOT EXISTS ix_technical_cards_detail_name_trgm
+        ON technical_cards USING gin (lower(detail_name) gin_trgm_ops)""",
+]
+
+_WORD = re.compile(r"\w+")
+
+_enabled = None
+
+def _tokens(query: str):
+    """Слова пошукового запиту"""
+    return _WORD.findall(query)
+
+def is_enabled() -> bool:
+    """Чи доступний повнотекстовий індекс у поточній базі даних.
+
+    Перший виклик звертається до БД; застосунок робить його під час запуску (lifespan).
+    """
+    global _enabled
+    if _enabled is None:
+        if engine.dialect.name == "sqlite":
+            with read_engine.connect() as connection:
+                _enabled = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": FTS_TABLE}
+                ).first() is not None
+        else:
+            _enabled = engine.dialect.name == "postgresql"
+    return _enabled
+
+def name_condition(query: str):
+    """Умова пошуку карт за назвою деталі"""
+    tokens = _tokens(query)
+    column = models.TechnicalCard.detail_name
+
+    if not tokens or not is_enabled():
+        if engine.dialect.name == "postgresql":
+            return func.lower(column).contains(query.lower())
+        return column.contains(query)
+
+    if engine.dialect.name == "postgresql":
+        return func.to_tsvector("simple", column).op("@@")(_pg_tsquery(tokens))
+    return models.TechnicalCard.id.in_(
+        select(fts.c.rowid).where(fts.c.detail_name.op("MATCH")(_fts5_query(tokens)))
+    )
+
+def order_by_relevance(query, search_query: str):
+    """Впорядкувати запит (ORM або Core select) за релевантністю (кращі збіги першими)"""
+    tokens = _tokens(search_query)
+    if not tokens or not is_enabled():
+        return query
+
+    if engine.dialect.name == "postgresql":
+        column = models.TechnicalCard.detail_name
+        return query.order_by(func.ts_rank(func.to_tsvector("simple", column), _pg_tsquery(tokens)).desc())
+
+    # bm25 у FTS5 від'ємний: менше значення — кращий збіг
+    return (
+        query.join(fts, fts.c.rowid == models.TechnicalCard.id)
+        .filter(fts.c.detail_name.op("MATCH")(_fts5_query(tokens)))
+        .order_by(text(f"{FTS_TABLE}.rank"))
+    )
+
+def _fts5_query(tokens):
+    """Запит FTS5: усі слова за префіксом"""
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _pg_tsquery(tokens):
+    """tsquery PostgreSQL: усі слова за префіксом"""
+    return func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+
+def install(connection):
+    """Створити пошуковий індекс; для нової таблиці FTS5 — заповнити наявними картами"""
+    global _enabled
+    dialect = connection.dialect.name
+
+    if dialect == "sqlite":
+        existed = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+        try:
+            for statement in SQLITE_DDL:
+                connection.exec_driver_sql(statement)
+        except OperationalError as e:
+            logger.warning(f"FTS5 is not available, name search falls back to LIKE: {e}")
+            _enabled = False
+            return
+        if not existed:
+            rebuild(connection)
+    elif dialect == "postgresql":
+        for statement in POSTGRESQL_DDL:
+            connection.exec_driver_sql(statement)
+
+    _enabled = dialect in ("sqlite", "postgresql")
+
+def rebuild(connection):
+    """Перебудувати пошуковий індекс з таблиці карт"""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("REINDEX INDEX ix_technical_cards_detail_name_tsv")
+        connection.exec_driver_sql("REINDEX INDEX ix_technical_cards_detail_name_trgm")
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _install_search_index(target, connection, **kw):
+    """Пошуковий індекс створюється разом зі схемою"""
+    install(connection)
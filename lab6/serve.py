@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+# Production-запуск з кількома процесами-обробниками.
+# Схема БД оновлюється один раз (як manage.py migrate), потім батьківський процес
+# імпортує застосунок, прогріває його запитами через ASGI і створює обробники через fork.
+# Обробники успадковують імпортовані модулі, схему OpenAPI та кеш скомпільованих SQL-запитів,
+# тому не повторюють холодний старт, і приймають з'єднання зі спільного сокета.
+# Обробник, що аварійно завершився, перезапускається; SIGTERM/SIGINT зупиняє всі.
+#
+#   cd lab6
+#   python serve.py --workers 4
+#   python manage.py migrate && python serve.py --workers 4 --no-migrate
+#
+# Потрібен fork (Linux, macOS); для розробки — python main.py з автоперезавантаженням.
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", 30))
+
+# Запити прогріву: лише читання, кожен проходить власний шлях (ORM, Core, статичні відповіді)
+WARMUP_PATHS = ("/health", "/", "/processing-types", "/technical-cards?limit=1", "/stats")
+
+# Обробник, що завершився швидше, перезапускається із затримкою
+MIN_WORKER_UPTIME = 1.0
+
+logger = logging.getLogger("lab6.serve")
+
+def warm_up(app):
+    """Прогрів застосунку в батьківському процесі, повертає час кожного запиту в мс"""
+    import metrics
+    from database import async_engine, dispose_engines
+
+    app.openapi()
+    timings = {}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+            for path in WARMUP_PATHS:
+                started = time.perf_counter()
+                response = await client.get(path)
+                timings[path] = round((time.perf_counter() - started) * 1000, 2)
+                if response.status_code >= 400:
+                    logger.warning("Warm-up request %s returned %s", path, response.status_code)
+        # Асинхронні з'єднання прив'язані до циклу подій прогріву
+        if async_engine is not None:
+            await async_engine.dispose()
+
+    asyncio.run(run())
+    # З'єднання не можна ділити між процесами: кожен обробник відкриє власні
+    dispose_engines()
+    metrics.reset()
+    _wait_for_threads()
+    return timings
+
+def _wait_for_threads(timeout=5.0):
+    """Дочекатися завершення потоків threadpool прогріву: fork копіює лише поточний потік"""
+    deadline = time.monotonic() + timeout
+    while threading.active_count() > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if threading.active_count() > 1:
+        logger.warning("Forking with %d threads still running", threading.active_count() - 1)
+
+def _reset_process_state():
+    """Стан, унікальний для процесу, створюється в обробнику заново"""
+    import cache
+    import events
+
+    # Токени в ETag та id подій SSE мають відрізнятися між обробниками
+    events.bus = events.EventBus()
+    if isinstance(cache.backend, cache.MemoryCache):
+        cache.set_backend(cache.MemoryCache())
+
+def run_worker(config, sock):
+    """Тіло процесу-обробника після fork"""
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        _reset_process_state()
+        uvicorn.Server(config).run(sockets=[sock])
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        logger.exception("Worker %d failed", os.getpid())
+        code = 1
+    finally:
+        # Без виходу з інтерпретатора: код батьківського процесу після fork не виконується
+        logging.shutdown()
+        os._exit(code)
+
+class Supervisor:
+    """Створення процесів-обробників через fork, перезапуск і зупинка"""
+
+    def __init__(self, config, sock, workers):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.pids = {}  # pid -> час запуску
+        self.restarts = 0
+        self._stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.config, self.sock)
+        self.pids[pid] = time.monotonic()
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"👷 {self.workers} workers started: {', '.join(map(str, self.pids))}")
+
+        while not self._stopping:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            started = self.pids.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            logger.error("Worker %d exited with code %d, restarting", pid, code)
+            self.restarts += 1
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                time.sleep(MIN_WORKER_UPTIME)
+            if not self._stopping:
+                self.spawn()
+
+        self.shutdown()
+
+    def shutdown(self, timeout=GRACEFUL_TIMEOUT):
+        """SIGTERM обробникам; хто не завершив поточні запити за timeout секунд, отримує SIGKILL"""
+        print(f"🛑 Stopping {len(self.pids)} workers")
+        for pid in self.pids:
+            _signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while self.pids and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.pids.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in self.pids:
+            logger.warning("Worker %d did not stop in %gs, killing", pid, timeout)
+            _signal(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.pids.clear()
+
+def _signal(pid, signum):
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Production-запуск сервісу технічних карт")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="кількість процесів-обробників")
+    parser.add_argument("--no-migrate", action="store_true", help="не оновлювати схему БД (вже виконано manage.py migrate)")
+    parser.add_argument("--no-warmup", action="store_true", help="не прогрівати застосунок перед fork")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if not hasattr(os, "fork"):
+        print("❌ serve.py потребує fork; на цій платформі запускайте python main.py")
+        return 1
+
+    started = time.perf_counter()
+    # Обробники не оновлюють схему під час імпорту main
+    os.environ["DB_INIT_ON_STARTUP"] = "False"
+    import database
+    if database.IS_SQLITE_MEMORY:
+        print("❌ База SQLite в пам'яті не спільна між процесами: задайте DATABASE_URL з файлом або сервером БД")
+        return 1
+    if not args.no_migrate:
+        import manage
+        manage.migrate(args)
+
+    import cache
+    import events
+    import main as service
+    print(f"📦 Application imported in {(time.perf_counter() - started) * 1000:.0f} ms")
+    if args.workers > 1:
+        # Запис інвалідує кеш і публікує подію лише у своєму обробнику: без спільного
+        # лічильника поколінь інші обробники повертали б застарілі відповіді та 304
+        if cache.CACHE_ENABLED and isinstance(cache.backend, cache.MemoryCache):
+            cache.disable()
+            print("⚠️  Response cache and ETag/304 disabled: set CACHE_BACKEND to a shared store to enable them")
+        events.disable()
+        print("⚠️  /events disabled: change events are per worker")
+
+    config = uvicorn.Config(service.app, host=args.host, port=args.port, log_level=args.log_level)
+    config.load()
+    if not args.no_warmup:
+        timings = warm_up(service.app)
+        print(f"🔥 Warm-up: {', '.join(f'{path} {ms} ms' for path, ms in timings.items())}")
+    else:
+        database.dispose_engines()
+
+    sock = config.bind_socket()
+    print(f"🚀 Starting {args.workers} workers at http://{args.host}:{args.port} "
+          f"({(time.perf_counter() - started) * 1000:.0f} ms after launch)")
+    Supervisor(config, sock, args.workers).run()
+    sock.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,12 @@
 const API_URL = '';
+const PAGE_LIMIT = 100;
+
+// Поточний список і фільтри; зміни з /events застосовуються до них локально
+const state = {
+    cards: [],
+    filters: {},
+    eventsConnected: false
+};
 
 // Елементи DOM
 const elements = {
@@ -45,6 +53,7 @@ async function loadProcessingTypes() {
 
 // Завантаження технічних карт
 async function loadTechnicalCards(filters = {}) {
+    state.filters = filters;
     try {
         const params = new URLSearchParams();
         if (filters.processing_type) params.append('processing_type', filters.processing_type);
@@ -53,9 +62,9 @@ async function loadTechnicalCards(filters = {}) {
         if (filters.detail_name_contains) params.append('detail_name_contains', filters.detail_name_contains);
         
         const response = await fetch(`${API_URL}/technical-cards?${params}`);
-        const cards = await response.json();
+        state.cards = await response.json();
         
-        displayTechnicalCards(cards);
+        displayTechnicalCards(state.cards);
     } catch (error) {
         console.error('Error loading technical cards:', error);
         elements.cardsTableBody.innerHTML = '<tr><td colspan="6" class="empty-state">Помилка завантаження</td></tr>';
@@ -101,41 +110,44 @@ function displayTechnicalCards(cards) {
 async function loadStatistics() {
     try {
         const response = await fetch(`${API_URL}/stats`);
-        const stats = await response.json();
-        
-        elements.totalCards.textContent = stats.total_cards;
-        elements.totalTime.textContent = stats.total_processing_time;
-        elements.avgTime.textContent = stats.average_processing_time;
-        
-        // Статистика по видах обробки
-        if (stats.processing_stats.length > 0) {
-            const typeLabels = {
-                "TURNING": "Токарна",
-                "MILLING": "Фрезерна",
-                "DRILLING": "Свердлільна", 
-                "GRINDING": "Шліфувальна",
-                "WELDING": "Зварювальна",
-                "ASSEMBLY": "Складальна",
-                "PAINTING": "Фарбування",
-                "THERMAL": "Термічна"
-            };
-            
-            elements.processingStats.innerHTML = stats.processing_stats.map(stat => `
-                <div class="process-stat">
-                    <h4>${typeLabels[stat.processing_type] || stat.processing_type}</h4>
-                    <p>Кількість: ${stat.count}</p>
-                    <p>Загальний час: ${stat.total_duration} хв</p>
-                    <p>Середній час: ${stat.average_duration} хв</p>
-                </div>
-            `).join('');
-        } else {
-            elements.processingStats.innerHTML = '<p class="empty-state">Немає даних для статистики</p>';
-        }
+        displayStatistics(await response.json());
     } catch (error) {
         console.error('Error loading statistics:', error);
     }
 }
 
+// Відображення статистики
+function displayStatistics(stats) {
+    elements.totalCards.textContent = stats.total_cards;
+    elements.totalTime.textContent = stats.total_processing_time;
+    elements.avgTime.textContent = stats.average_processing_time;
+    
+    // Статистика по видах обробки
+    if (stats.processing_stats.length > 0) {
+        const typeLabels = {
+            "TURNING": "Токарна",
+            "MILLING": "Фрезерна",
+            "DRILLING": "Свердлільна", 
+            "GRINDING": "Шліфувальна",
+            "WELDING": "Зварювальна",
+            "ASSEMBLY": "Складальна",
+            "PAINTING": "Фарбування",
+            "THERMAL": "Термічна"
+        };
+        
+        elements.processingStats.innerHTML = stats.processing_stats.map(stat => `
+            <div class="process-stat">
+                <h4>${typeLabels[stat.processing_type] || stat.processing_type}</h4>
+                <p>Кількість: ${stat.count}</p>
+                <p>Загальний час: ${stat.total_duration} хв</p>
+                <p>Середній час: ${stat.average_duration} хв</p>
+            </div>
+        `).join('');
+    } else {
+        elements.processingStats.innerHTML = '<p class="empty-state">Немає даних для статистики</p>';
+    }
+}
+
 // Обробка форми
 elements.form.addEventListener('submit', async (e) => {
     e.preventDefault();
@@ -169,8 +181,7 @@ elements.form.addEventListener('submit', async (e) => {
         if (response.ok) {
             alert(cardId ? 'Технічна карта оновлена!' : 'Технічна карта створена!');
             resetForm();
-            loadTechnicalCards();
-            loadStatistics();
+            refreshIfDisconnected();
         } else {
             const error = await response.json();
             alert('Помилка: ' + (error.detail || 'Невідома помилка'));
@@ -214,8 +225,7 @@ async function deleteCard(id) {
         
         if (response.ok) {
             alert('Технічна карта видалена!');
-            loadTechnicalCards();
-            loadStatistics();
+            refreshIfDisconnected();
         } else {
             alert('Помилка видалення');
         }
@@ -255,6 +265,98 @@ elements.clearFilters.addEventListener('click', () => {
     loadTechnicalCards();
 });
 
+// Зміни в реальному часі (Server-Sent Events)
+
+// Без підключення до /events список і статистика оновлюються повним запитом
+function refreshIfDisconnected() {
+    if (!state.eventsConnected) {
+        loadTechnicalCards(state.filters);
+        loadStatistics();
+    }
+}
+
+// Приблизна перевірка фільтрів на клієнті (пошук за назвою — слова за префіксом)
+function matchesFilters(card, filters) {
+    if (filters.processing_type && card.processing_type !== filters.processing_type) return false;
+    if (filters.min_duration && card.processing_duration < Number(filters.min_duration)) return false;
+    if (filters.max_duration && card.processing_duration > Number(filters.max_duration)) return false;
+    if (filters.detail_name_contains) {
+        const words = card.detail_name.toLowerCase().match(/[\p{L}\p{N}']+/gu) || [];
+        const tokens = filters.detail_name_contains.toLowerCase().match(/[\p{L}\p{N}']+/gu) || [];
+        if (!tokens.every(token => words.some(word => word.startsWith(token)))) return false;
+    }
+    return true;
+}
+
+function upsertCard(card) {
+    const index = state.cards.findIndex(item => item.id === card.id);
+    const matches = matchesFilters(card, state.filters);
+    
+    if (index !== -1) {
+        if (matches) {
+            state.cards[index] = card;
+        } else {
+            removeCard(card.id);
+            return;
+        }
+    } else if (matches) {
+        // Список відсортований за id і обмежений першою сторінкою
+        const last = state.cards[state.cards.length - 1];
+        if (state.cards.length >= PAGE_LIMIT && last && card.id > last.id) return;
+        state.cards.push(card);
+        state.cards.sort((a, b) => a.id - b.id);
+        state.cards.length = Math.min(state.cards.length, PAGE_LIMIT);
+    }
+    displayTechnicalCards(state.cards);
+}
+
+function removeCard(id) {
+    const index = state.cards.findIndex(item => item.id === id);
+    if (index === -1) return;
+    
+    const wasFull = state.cards.length >= PAGE_LIMIT;
+    state.cards.splice(index, 1);
+    if (wasFull) {
+        // Сторінка була повною: наступна карта з сервера займе звільнене місце
+        scheduleReload();
+    } else {
+        displayTechnicalCards(state.cards);
+    }
+}
+
+let reloadTimer = null;
+
+function scheduleReload() {
+    clearTimeout(reloadTimer);
+    reloadTimer = setTimeout(() => loadTechnicalCards(state.filters), 300);
+}
+
+function connectEvents() {
+    if (!window.EventSource) return;
+    
+    // Після обриву EventSource перепідключається сам і надсилає Last-Event-ID
+    const source = new EventSource(`${API_URL}/events`);
+    source.onopen = () => { state.eventsConnected = true; };
+    source.onerror = () => { state.eventsConnected = false; };
+    
+    const handle = (type, apply) => source.addEventListener(type, event => {
+        const data = JSON.parse(event.data);
+        apply(data);
+        if (data.stats) displayStatistics(data.stats);
+    });
+    
+    handle('card-created', data => upsertCard(data.card));
+    handle('card-updated', data => upsertCard(data.card));
+    handle('card-deleted', data => removeCard(data.id));
+    handle('cards-imported', () => scheduleReload());
+    handle('cards-updated', () => scheduleReload());
+    handle('cards-deleted', () => scheduleReload());
+    handle('reset', () => {
+        loadTechnicalCards(state.filters);
+        loadStatistics();
+    });
+}
+
 // Утиліта для екранування HTML
 function escapeHtml(text) {
     const map = {
@@ -272,4 +374,5 @@ document.addEventListener('DOMContentLoaded', () => {
     loadProcessingTypes();
     loadTechnicalCards();
     loadStatistics();
+    connectEvents();
 });
\ No newline at end of file
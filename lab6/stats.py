@@ -0,0 +1,161 @@
+from sqlalchemy import select, insert, update, delete, func, case, or_, event
+import models
+
+# Зведена статистика по видах обробки (таблиця processing_type_stats).
+# Оновлюється функціями crud у тій самій транзакції, що й технічні карти,
+# тому /stats читає O(кількість видів обробки) рядків замість сканування карт.
+
+summary = models.ProcessingTypeStats.__table__
+cards = models.TechnicalCard.__table__
+
+def _type_order():
+    """Порядок видів обробки як у переліку ProcessingType"""
+    return {processing_type: index for index, processing_type in enumerate(models.ProcessingType)}
+
+def compute_from_cards(bind, processing_type=None):
+    """Агрегати по видах обробки, обчислені безпосередньо з таблиці карт"""
+    query = select(
+        cards.c.processing_type,
+        func.count(cards.c.id),
+        func.coalesce(func.sum(cards.c.processing_duration), 0),
+        func.min(cards.c.processing_duration),
+        func.max(cards.c.processing_duration)
+    ).group_by(cards.c.processing_type)
+
+    if processing_type is not None:
+        query = query.where(cards.c.processing_type == processing_type)
+
+    order = _type_order()
+    return sorted(bind.execute(query).all(), key=lambda row: order[row[0]])
+
+def read_summary(bind):
+    """Прочитати зведену статистику (count, total, min, max) по видах обробки"""
+    rows = bind.execute(select(
+        summary.c.processing_type,
+        summary.c.count,
+        summary.c.total_duration,
+        summary.c.min_duration,
+        summary.c.max_duration
+    )).all()
+
+    order = _type_order()
+    return sorted(rows, key=lambda row: order[row[0]])
+
+def record_added(bind, processing_type, count, total_duration, min_duration, max_duration):
+    """Додати до зведення групу карт одного виду обробки"""
+    if not count:
+        return
+
+    result = bind.execute(
+        update(summary)
+        .where(summary.c.processing_type == processing_type)
+        .values(
+            count=summary.c.count + count,
+            total_duration=summary.c.total_duration + total_duration,
+            min_duration=case(
+                (or_(summary.c.min_duration.is_(None), summary.c.min_duration > min_duration), min_duration),
+                else_=summary.c.min_duration
+            ),
+            max_duration=case(
+                (or_(summary.c.max_duration.is_(None), summary.c.max_duration < max_duration), max_duration),
+                else_=summary.c.max_duration
+            )
+        )
+    )
+
+    if result.rowcount == 0:
+        bind.execute(insert(summary).values(
+            processing_type=processing_type,
+            count=count,
+            total_duration=total_duration,
+            min_duration=min_duration,
+            max_duration=max_duration
+        ))
+
+def record_removed(bind, processing_type, count, total_duration, min_duration, max_duration):
+    """Відняти від зведення групу карт одного виду обробки.
+
+    Якщо видалені значення були межами (min/max), межі перераховуються
+    з індексу (processing_type, processing_duration). Видалення карт має
+    бути вже виконане (flush) у поточній транзакції.
+    """
+    if not count:
+        return
+
+    bind.execute(
+        update(summary)
+        .where(summary.c.processing_type == processing_type)
+        .values(
+            count=summary.c.count - count,
+            total_duration=summary.c.total_duration - total_duration
+        )
+    )
+
+    row = bind.execute(
+        select(summary.c.count, summary.c.min_duration, summary.c.max_duration)
+        .where(summary.c.processing_type == processing_type)
+    ).first()
+    if row is None:
+        return
+
+    if row.count <= 0:
+        bind.execute(
+            update(summary)
+            .where(summary.c.processing_type == processing_type)
+            .values(count=0, total_duration=0, min_duration=None, max_duration=None)
+        )
+    elif row.min_duration is None or min_duration <= row.min_duration or max_duration >= row.max_duration:
+        refresh_bounds(bind, processing_type)
+
+def refresh_bounds(bind, processing_type):
+    """Перерахувати min/max тривалості для одного виду обробки"""
+    bounds = bind.execute(
+        select(func.min(cards.c.processing_duration), func.max(cards.c.processing_duration))
+        .where(cards.c.processing_type == processing_type)
+    ).first()
+    bind.execute(
+        update(summary)
+        .where(summary.c.processing_type == processing_type)
+        .values(min_duration=bounds[0], max_duration=bounds[1])
+    )
+
+def rebuild(bind):
+    """Перебудувати зведену статистику з таблиці карт"""
+    aggregates = {row[0]: tuple(row[1:]) for row in compute_from_cards(bind)}
+
+    rows = []
+    for processing_type in models.ProcessingType:
+        count, total_duration, min_duration, max_duration = aggregates.get(processing_type, (0, 0, None, None))
+        rows.append({
+            "processing_type": processing_type,
+            "count": count,
+            "total_duration": total_duration,
+            "min_duration": min_duration,
+            "max_duration": max_duration
+        })
+
+    bind.execute(delete(summary))
+    bind.execute(insert(summary), rows)
+
+def check(bind):
+    """Порівняти зведення з фактичними даними, повертає список розбіжностей"""
+    expected = {row[0]: tuple(row[1:]) for row in compute_from_cards(bind)}
+    actual = {row[0]: tuple(row[1:]) for row in read_summary(bind)}
+
+    mismatches = []
+    for processing_type in models.ProcessingType:
+        expected_row = expected.get(processing_type, (0, 0, None, None))
+        actual_row = actual.get(processing_type, (0, 0, None, None))
+        if expected_row != actual_row:
+            mismatches.append({
+                "processing_type": processing_type,
+                "expected": expected_row,
+                "actual": actual_row
+            })
+    return mismatches
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _populate_summary(target, connection, tables=(), **kw):
+    """Заповнити щойно створену таблицю зведення для вже наявних карт"""
+    if summary in tables:
+        rebuild(connection)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import bulk
+import crud
+
+async def _stream(chunks, pulled=None):
+    for chunk in chunks:
+        if pulled is not None:
+            pulled.append(chunk)
+        yield chunk
+
+async def _lines(chunks, **kwargs):
+    return [line async for line in bulk.iter_lines(_stream(chunks), **kwargs)]
+
+def test_lines_split_across_chunks():
+    body = "\ufeffперший\r\nдругий\n\nтретій".encode()
+    chunks = [body[index:index + 3] for index in range(0, len(body), 3)]
+    assert asyncio.run(_lines(chunks)) == ["перший", "другий", "", "третій"]
+
+def test_long_line_is_rejected_without_reading_rest_of_body():
+    pulled = []
+
+    async def scenario():
+        async for _ in bulk.iter_lines(_stream([b"ok\n"] + [b"x" * 10] * 100, pulled), max_length=25):
+            pass
+
+    with pytest.raises(bulk.LineTooLong) as error:
+        asyncio.run(scenario())
+    assert error.value.line == 2
+    assert len(pulled) == 4
+
+def test_unclosed_csv_quote_is_capped(monkeypatch):
+    monkeypatch.setattr(bulk, "MAX_LINE_LENGTH", 50)
+
+    async def scenario():
+        body = [b"detail_name,processing_type,processing_duration\n", b'"\n'] + [b"abc\n"] * 100
+        return [record async for record in bulk.iter_csv_records(_stream(body))]
+
+    with pytest.raises(bulk.LineTooLong) as error:
+        asyncio.run(scenario())
+    assert error.value.line == 2
+
+def test_import_rejects_too_long_line(client, db):
+    card = '{"detail_name": "Вал", "processing_type": "MILLING", "processing_duration": 30}'
+    body = f"{card}\n{'x' * (bulk.MAX_LINE_LENGTH + 1)}\n{card}\n"
+    response = client.post("/technical-cards/bulk", params={"format": "ndjson"}, content=body.encode())
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("Рядок 2 ")
+
+def _partitions(pulled):
+    pulled.append(True)
+    yield [(1, "Вал", None, 30, None, None)]
+
+def test_csv_header_is_sent_before_query():
+    pulled = []
+    chunks = bulk.export_csv(crud.EXPORT_COLUMNS, _partitions(pulled))
+    assert next(chunks).decode().strip() == ",".join(crud.EXPORT_COLUMNS)
+    assert not pulled
+    assert next(chunks).decode().startswith("1,Вал,")
+
+def test_export_streams_all_cards(client, db):
+    client.post("/technical-cards", json={"detail_name": "Вал", "processing_type": "MILLING", "processing_duration": 30})
+    response = client.get("/technical-cards/export", params={"format": "csv"})
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    assert lines[0] == ",".join(crud.EXPORT_COLUMNS)
+    assert len(lines) == 2
+
+def test_ndjson_export_streams_all_cards(client, db):
+    client.post("/technical-cards", json={"detail_name": "Вал", "processing_type": "MILLING", "processing_duration": 30})
+    response = client.get("/technical-cards/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    assert len(lines) == 1
+    assert '"detail_name": "Вал"' in lines[0]
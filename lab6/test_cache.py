@@ -0,0 +1,28 @@
+import pytest
+
+import cache
+
+def test_incomplete_backend_fails_on_creation():
+    class NoCounters(cache.CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl):
+            pass
+
+    with pytest.raises(TypeError):
+        NoCounters()
+
+def test_memory_cache_evicts_least_recently_used_by_size():
+    backend = cache.MemoryCache(max_entries=10, max_bytes=10)
+    backend.set("a", b"12345", 60)
+    backend.set("b", b"12345", 60)
+    backend.get("a")
+    backend.set("c", b"12345", 60)
+    assert backend.get("b") is None
+    assert backend.get("a") == b"12345"
+
+def test_invalidate_changes_key():
+    key = cache.make_key("stats", processing_type=None)
+    cache.invalidate()
+    assert cache.make_key("stats") != key
@@ -0,0 +1,149 @@
+import base64
+import json
+import random
+
+import pytest
+
+import crud
+import models
+import schemas
+import stats
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def _create_cards(db, durations):
+    types = list(models.ProcessingType)
+    for index, duration in enumerate(durations):
+        crud.create_technical_card(db, schemas.TechnicalCardCreate(
+            detail_name=f"Деталь {index}",
+            processing_type=types[index % len(types)],
+            processing_duration=duration
+        ))
+
+@pytest.mark.parametrize("sort_by", crud.SORT_FIELDS)
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_cover_all_cards_once(db, sort_by, order):
+    # Однакові тривалості перевіряють межу сторінки всередині групи рівних ключів
+    _create_cards(db, [30, 10, 30, 20, 10, 30, 40])
+    expected = [card.id for card in crud.get_technical_cards(db, limit=100, sort_by=sort_by, order=order)]
+
+    seen, cursor = [], None
+    while True:
+        cards, cursor = crud.get_technical_cards_page(db, cursor=cursor, limit=3, sort_by=sort_by, order=order)
+        seen.extend(card.id for card in cards)
+        if cursor is None:
+            break
+    assert seen == expected
+
+def test_cursor_round_trip(db):
+    _create_cards(db, [10])
+    card = db.query(models.TechnicalCard).one()
+    for sort_by in crud.SORT_FIELDS:
+        key, card_id = crud.decode_cursor(crud.encode_cursor(card, sort_by, "asc"), sort_by, "asc")
+        assert card_id == card.id
+        assert key == getattr(card, sort_by)
+
+@pytest.mark.parametrize("sort_by, key", [
+    ("created_at", 123),
+    ("created_at", "not a date"),
+    ("created_at", None),
+    ("processing_duration", "abc"),
+    ("processing_duration", True),
+    ("processing_duration", float("nan")),
+    ("id", "5"),
+    ("id", 1.5),
+])
+def test_tampered_cursor_key_is_rejected(sort_by, key):
+    with pytest.raises(ValueError):
+        crud.decode_cursor(_cursor([sort_by, "asc", key, 1]), sort_by, "asc")
+
+@pytest.mark.parametrize("cursor", [
+    "%%%",
+    _cursor(["id", "asc", 1]),
+    _cursor(["id", "asc", 1, "1"]),
+    _cursor(["id", "desc", 1, 1]),
+    _cursor({"sort_by": "id"}),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        crud.decode_cursor(cursor, "id", "asc")
+
+def test_tampered_cursor_returns_400(client, db):
+    cursor = _cursor(["created_at", "asc", 123, 1])
+    response = client.get("/technical-cards", params={"cursor": cursor, "sort_by": "created_at"})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("sort_by", crud.SORT_FIELDS)
+def test_fast_path_matches_orm_serialization(db, sort_by):
+    _create_cards(db, [30, 10, 30, 20])
+    filters = schemas.TechnicalCardFilter(min_duration=15)
+    cards = crud.get_technical_cards(db, limit=100, filters=filters, sort_by=sort_by, order="desc")
+    records = crud.get_technical_card_records(db, limit=100, filters=filters, sort_by=sort_by, order="desc")
+    assert len(records) == 3
+    assert schemas.dump_technical_card_records(records) == schemas.dump_technical_cards(cards)
+
+def test_fast_path_page_matches_orm_page(db):
+    _create_cards(db, [30, 10, 30, 20, 10])
+    cursor = None
+    while True:
+        cards, orm_cursor = crud.get_technical_cards_page(db, cursor=cursor, limit=2, sort_by="processing_duration")
+        records, cursor = crud.get_technical_card_records_page(db, cursor=cursor, limit=2, sort_by="processing_duration")
+        assert schemas.dump_technical_card_records(records) == schemas.dump_technical_cards(cards)
+        assert cursor == orm_cursor
+        if cursor is None:
+            break
+
+def test_batch_update_counts_only_changed_cards(db):
+    _create_cards(db, [30, 10, 30, 20])
+    ids = [card.id for card in crud.get_technical_cards(db, limit=100, sort_by="id")]
+    before = {card.id: card.updated_at for card in db.query(models.TechnicalCard)}
+
+    selection = schemas.TechnicalCardSelection(ids=ids[:3])
+    assert crud.update_technical_cards(db, selection, schemas.TechnicalCardUpdate(processing_duration=30)) == 1
+
+    db.expire_all()
+    cards = {card.id: card for card in db.query(models.TechnicalCard)}
+    assert [cards[card_id].processing_duration for card_id in ids] == [30, 30, 30, 20]
+    # Карти без фактичних змін не торкаються
+    assert cards[ids[0]].updated_at == before[ids[0]]
+    assert stats.check(db) == []
+
+def test_batch_delete_by_filter(db):
+    _create_cards(db, [30, 10, 30, 20, 10])
+    processing_type = list(models.ProcessingType)[0]
+    expected = db.query(models.TechnicalCard).filter_by(processing_type=processing_type).count()
+
+    selection = schemas.TechnicalCardSelection(filter=schemas.TechnicalCardFilter(processing_type=processing_type))
+    assert crud.delete_technical_cards(db, selection) == expected
+    assert db.query(models.TechnicalCard).filter_by(processing_type=processing_type).count() == 0
+    assert stats.check(db) == []
+
+def test_random_batch_writes_keep_summary_consistent(db):
+    rng = random.Random(15)
+    types = list(models.ProcessingType)
+    _create_cards(db, [rng.randint(1, 480) for _ in range(200)])
+    for _ in range(50):
+        ids = [card_id for (card_id,) in db.query(models.TechnicalCard.id)]
+        if not ids:
+            break
+        if rng.random() < 0.4:
+            selection = schemas.TechnicalCardSelection(ids=rng.sample(ids, min(len(ids), rng.randint(1, 20))))
+        else:
+            selection = schemas.TechnicalCardSelection(filter=schemas.TechnicalCardFilter(
+                processing_type=rng.choice(types), max_duration=rng.randint(1, 480)
+            ))
+        if rng.random() < 0.8:
+            changes = rng.choice([
+                {"processing_type": rng.choice(types)},
+                {"processing_duration": rng.randint(1, 480)},
+                {"processing_type": rng.choice(types), "processing_duration": rng.randint(1, 480)},
+            ])
+            crud.update_technical_cards(db, selection, schemas.TechnicalCardUpdate(**changes))
+        else:
+            crud.delete_technical_cards(db, selection)
+        assert stats.check(db) == []
+
+def test_batch_api_rejects_empty_filter(client, db):
+    response = client.request("DELETE", "/technical-cards", json={"filter": {}})
+    assert response.status_code == 422
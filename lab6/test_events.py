@@ -0,0 +1,42 @@
+import asyncio
+import sys
+import threading
+
+from events import EventBus
+
+def test_concurrent_publishers_reach_subscriber_in_id_order():
+    # Разом менше за EVENTS_QUEUE_SIZE, щоб підписник не переповнився
+    publishers, events_each = 8, 100
+
+    async def scenario():
+        bus = EventBus(buffer_size=10)
+        stream = bus.stream()
+        assert (await stream.__anext__()).startswith(b"retry:")
+
+        def publish():
+            for index in range(events_each):
+                bus.publish("card-updated", {"id": index})
+
+        threads = [threading.Thread(target=publish) for _ in range(publishers)]
+        for thread in threads:
+            thread.start()
+
+        sequences = []
+        while len(sequences) < publishers * events_each:
+            frame = await stream.__anext__()
+            event_id = frame.split(b"\n", 1)[0].decode()
+            sequences.append(int(event_id.rpartition(":")[2]))
+
+        for thread in threads:
+            thread.join()
+        await stream.aclose()
+        return sequences
+
+    # Часте перемикання потоків відтворює гонку між призначенням id і доставкою
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        sequences = asyncio.run(scenario())
+    finally:
+        sys.setswitchinterval(interval)
+    assert sequences == list(range(1, len(sequences) + 1))
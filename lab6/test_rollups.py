@@ -0,0 +1,55 @@
+import random
+
+import crud
+import models
+import rollups
+import schemas
+
+def _create(db, durations, processing_type):
+    crud.create_technical_cards_bulk(db, [
+        schemas.TechnicalCardCreate(detail_name="Вал", processing_type=processing_type, processing_duration=duration)
+        for duration in durations
+    ])
+
+def test_rollups_match_cards_after_random_writes(db):
+    rng = random.Random(17)
+    types = list(models.ProcessingType)
+    for _ in range(200):
+        ids = [card_id for (card_id,) in db.query(models.TechnicalCard.id)]
+        action = rng.random()
+        if action < 0.4 or not ids:
+            _create(db, [rng.randint(1, 480) for _ in range(rng.randint(1, 5))], rng.choice(types))
+        elif action < 0.6:
+            crud.update_technical_card(db, rng.choice(ids), schemas.TechnicalCardUpdate(
+                processing_type=rng.choice(types), processing_duration=rng.randint(1, 480)
+            ))
+        elif action < 0.7:
+            crud.delete_technical_card(db, rng.choice(ids))
+        elif action < 0.9:
+            selection = schemas.TechnicalCardSelection(ids=rng.sample(ids, min(len(ids), 10)))
+            crud.update_technical_cards(db, selection, schemas.TechnicalCardUpdate(processing_duration=rng.randint(1, 480)))
+        else:
+            filters = schemas.TechnicalCardFilter(processing_type=rng.choice(types), min_duration=rng.randint(1, 480))
+            crud.delete_technical_cards(db, schemas.TechnicalCardSelection(filter=filters))
+
+    assert db.query(models.TechnicalCard).count() > 0
+    assert rollups.check(db) == []
+
+def test_histogram_merges_buckets_and_fills_gaps(db):
+    processing_type = list(models.ProcessingType)[0]
+    _create(db, [1, 4, 29, 30, 95], processing_type)
+
+    [histogram] = crud.get_duration_histograms(db, bucket_width=30)
+    assert histogram["processing_type"] == processing_type
+    assert histogram["total"] == 5
+    assert [(bucket["start"], bucket["count"]) for bucket in histogram["buckets"]] == \
+        [(0, 3), (30, 1), (60, 0), (90, 1)]
+
+def test_histogram_rejects_unaligned_bucket_width(client, db):
+    response = client.get("/stats/histogram", params={"bucket_width": 7})
+    assert response.status_code == 400
+
+def test_timeseries_counts_cards_created_today(client, db):
+    _create(db, [10, 20], list(models.ProcessingType)[0])
+    points = client.get("/stats/timeseries").json()["points"]
+    assert sum(point["count"] for point in points) == 2
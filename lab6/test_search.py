@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+
+import search
+
+def test_search_index_is_detected_on_startup(app, monkeypatch):
+    monkeypatch.setattr(search, "_enabled", None)
+    with TestClient(app):
+        # Перевірка виконана під час запуску, а не в першому запиті
+        assert search._enabled is True
+
+def test_name_search_matches_word_prefixes(client, db):
+    for name in ("Вал приводний", "Вал", "Шестерня приводна"):
+        client.post("/technical-cards", json={"detail_name": name, "processing_type": "MILLING", "processing_duration": 30})
+
+    response = client.get("/technical-cards", params={"detail_name_contains": "вал прив"})
+    assert [card["detail_name"] for card in response.json()] == ["Вал приводний"]
+    response = client.get("/technical-cards", params={"detail_name_contains": "привод"})
+    assert len(response.json()) == 2
@@ -0,0 +1,48 @@
+import random
+
+import crud
+import models
+import schemas
+import stats
+
+def _random_card(rng):
+    return schemas.TechnicalCardCreate(
+        detail_name=f"Деталь {rng.randint(1, 1000)}",
+        processing_type=rng.choice(list(models.ProcessingType)),
+        processing_duration=rng.randint(1, 480)
+    )
+
+def _random_writes(db, rng, operations):
+    """Змішані поодинокі записи через crud"""
+    for _ in range(operations):
+        ids = [card_id for (card_id,) in db.query(models.TechnicalCard.id)]
+        action = rng.random()
+        if action < 0.4 or not ids:
+            crud.create_technical_card(db, _random_card(rng))
+        elif action < 0.5:
+            crud.create_technical_cards_bulk(db, [_random_card(rng) for _ in range(rng.randint(1, 20))])
+        elif action < 0.8:
+            changes = {}
+            if rng.random() < 0.5:
+                changes["processing_type"] = rng.choice(list(models.ProcessingType))
+            if rng.random() < 0.5:
+                changes["processing_duration"] = rng.randint(1, 480)
+            crud.update_technical_card(db, rng.choice(ids), schemas.TechnicalCardUpdate(**changes))
+        else:
+            crud.delete_technical_card(db, rng.choice(ids))
+
+def test_summary_matches_cards_after_random_writes(db):
+    _random_writes(db, random.Random(42), 300)
+
+    assert db.query(models.TechnicalCard).count() > 0
+    assert stats.check(db) == []
+    assert [tuple(row) for row in stats.read_summary(db) if row[1]] == \
+        [tuple(row) for row in stats.compute_from_cards(db)]
+
+def test_stats_endpoint_matches_rebuild(client, db):
+    _random_writes(db, random.Random(7), 50)
+    before = client.get("/stats").json()
+
+    stats.rebuild(db)
+    db.commit()
+    assert client.get("/stats").json() == before